@@ -1,6 +1,6 @@
 import pandas as pd
-import requests
-import xml.etree.ElementTree as ET
+import CBRClient
+from RateStore import RateStore
 
 class ProcessCurrencies:
     """
@@ -39,68 +39,34 @@ class ProcessCurrencies:
         self.currencies_to_convert = result
         return result
 
-    def generate_currency(self, start_date: str, finish_date: str) -> None:
+    def generate_currency(self, start_date: str, finish_date: str, store_name: str = 'rates_store.sqlite') -> None:
         """
-        Создаёт CSV-файл с курсами валют за необходимый период
+        Создаёт CSV-файл с курсами валют за необходимый период. Курсы берутся из хранилища RateStore,
+        из API ЦБ загружаются только месяцы, которых в хранилище еще нет
 
         :param start_date: Начало периода
         :type start_date: str
 
         :param finish_date: Конец периода
         :type finish_date: str
+
+        :param store_name: Имя файла хранилища курсов
+        :type store_name: str
         """
-        first_year = int(start_date[:4])
-        first_month = int(start_date[5:7])
-        last_year = int(finish_date[:4])
-        last_month = int(finish_date[5:7])
-        df = pd.DataFrame(columns=['date'] + self.currencies_to_convert)
-        for year in range(first_year, last_year + 1):
-            for month in range(1, 13):
-                if (year == first_year and month < first_month) or (year == last_year and month > last_month):
-                    continue
-                row = self.__get_row(month, year)
-                if row is None:
-                    continue
-                df.loc[len(df.index)] = row
+        months = CBRClient.get_months(start_date, finish_date)
+        keys = [f'{year}-{month:02d}' for year, month in months]
+        with RateStore(store_name) as store:
+            missing = set(store.get_missing_months(keys, self.currencies_to_convert))
+            months = [(year, month) for (year, month), key in zip(months, keys) if key in missing]
+            with CBRClient.CBRClient() as client:
+                contents = client.fetch_months(months, day=2)
+            rates = CBRClient.parse_many_rates(contents, self.currencies_to_convert)
+            rows = [[f'{year}-{month:02d}'] + row for (year, month), row in zip(months, rates) if row is not None]
+            store.save_rows(rows, self.currencies_to_convert)
+            df = store.get_frame(self.currencies_to_convert, keys)
         self.__currencies_data = df
         df.to_csv('dataframe.csv', index=False)
 
-    def __get_row(self, month: str, year: str) -> list or None:
-        """
-        Формирует список с курсами валют за указанный месяц
-
-        :param month: Месяц, по которому будет проходить запрос
-        :type month: str
-
-        :param year: Год, по которому будет проходить запрос
-        :type year: str
-
-        :return: Список с курсами валют
-        :rtype: list or None
-        """
-        try:
-            format_month = ('0' + str(month))[-2:]
-            url = f'https://www.cbr.ru/scripts/XML_daily.asp?date_req=02/{format_month}/{year}'
-            res = requests.get(url)
-            tree = ET.fromstring(res.content)
-            row = [f'{year}-{format_month}']
-            for value in self.currencies_to_convert:
-                if value == 'RUR':
-                    row.append(1)
-                    continue
-                found = False
-                for valute in tree:
-                    if valute[1].text == value:
-                        row.append(round(float(valute[4].text.replace(',', '.'))
-                                         / float(valute[2].text.replace(',', '.')), 6))
-                        found = True
-                        break
-                if not found:
-                    row.append(None)
-            return row
-        except Exception:
-            return None
-
 
 a = ProcessCurrencies('vacancies_dif_currencies.csv')
 a.get_currencies_to_convert()
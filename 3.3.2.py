@@ -1,6 +1,7 @@
 import pandas as pd
-import requests
-import xml.etree.ElementTree as ET
+import CurrencyRates
+import CBRClient
+from RateStore import RateStore
 
 class ProcessCurrencies:
     """
@@ -53,51 +54,57 @@ class ProcessCurrencies:
         """
         try:
             format_month = ('0' + str(month))[-2:]
-            url = f'https://www.cbr.ru/scripts/XML_daily.asp?date_req=02/{format_month}/{year}'
-            res = requests.get(url)
-            tree = ET.fromstring(res.content)
-            row = [f'{year}-{format_month}']
-            for value in self.currencies_to_convert:
-                if value == 'RUR':
-                    row.append(1)
-                    continue
-                found = False
-                for valute in tree:
-                    if valute[1].text == value:
-                        row.append(round(float(valute[4].text.replace(',', '.')) / float(valute[2].text.replace(',', '.')), 6))
-                        found = True
-                        break
-                if not found:
-                    row.append(None)
-            return row
-
+            with CBRClient.CBRClient() as client:
+                return self.parse_row(client.fetch(f'02/{format_month}/{year}'), month, year)
         except Exception:
             return None
 
-    def generate_currency(self, start_date: str, finish_date: str) -> None:
+    def parse_row(self, content: bytes, month: str, year: str) -> list or None:
+        """
+        Формирует список с курсами валют за указанный месяц из ответа API ЦБ
+
+        :param content: XML с курсами валют
+        :type content: bytes
+
+        :param month: Месяц, за который получен ответ
+        :type month: str
+
+        :param year: Год, за который получен ответ
+        :type year: str
+
+        :return: Список с курсами валют
+        :rtype: list or None
+        """
+        rates = CBRClient.parse_many_rates([content], self.currencies_to_convert)[0]
+        if rates is None:
+            return None
+        return [f"{year}-{('0' + str(month))[-2:]}"] + rates
+
+    def generate_currency(self, start_date: str, finish_date: str, store_name: str = 'rates_store.sqlite') -> None:
         """
-        Создаёт CSV-файл с курсами валют за необходимый период
+        Создаёт CSV-файл с курсами валют за необходимый период. Курсы берутся из хранилища RateStore,
+        из API ЦБ загружаются только месяцы, которых в хранилище еще нет
 
         :param start_date: Начало периода
         :type start_date: str
 
         :param finish_date: Конец периода
         :type finish_date: str
+
+        :param store_name: Имя файла хранилища курсов
+        :type store_name: str
         """
-        first_year = int(start_date[:4])
-        first_month = int(start_date[5:7])
-        last_year = int(finish_date[:4])
-        last_month = int(finish_date[5:7])
-
-        dataframe = pd.DataFrame(columns=['date'] + self.currencies_to_convert)
-        for year in range(first_year, last_year + 1):
-            for month in range(1, 13):
-                if (year == first_year and month < first_month) or (year == last_year and month > last_month):
-                    continue
-                row = self.get_row(month, year)
-                if row is None:
-                    continue
-                dataframe.loc[len(dataframe.index)] = row
+        months = CBRClient.get_months(start_date, finish_date)
+        keys = [f'{year}-{month:02d}' for year, month in months]
+        with RateStore(store_name) as store:
+            missing = set(store.get_missing_months(keys, self.currencies_to_convert))
+            months = [(year, month) for (year, month), key in zip(months, keys) if key in missing]
+            with CBRClient.CBRClient() as client:
+                contents = client.fetch_months(months, day=2)
+            rates = CBRClient.parse_many_rates(contents, self.currencies_to_convert)
+            rows = [[f'{year}-{month:02d}'] + row for (year, month), row in zip(months, rates) if row is not None]
+            store.save_rows(rows, self.currencies_to_convert)
+            dataframe = store.get_frame(self.currencies_to_convert, keys)
 
         self.currencies_data = dataframe
         dataframe.to_csv('dataframe.csv')
@@ -114,10 +121,19 @@ class ProcessSalaries:
         self.currencies = pd.read_csv('dataframe.csv')
         self.available_currencies = list(self.currencies.keys()[2:])
 
-    def process_salaries(self) -> None:
+    def process_salaries(self, vectorized: bool = False, daily_rates: CurrencyRates.AsOfRates = None) -> None:
         """
         Обрабатывает зарплаты, переводя в рубли в соответствии с нужным курсом. Сохраняет в формате CSV
+
+        :param vectorized: Переводить все зарплаты сразу соединением с таблицей курсов вместо обхода строк
+        :type vectorized: bool
+
+        :param daily_rates: Дневные курсы: если заданы, зарплаты переводятся векторно по курсу на дату публикации
+        :type daily_rates: CurrencyRates.AsOfRates
         """
+        if vectorized or daily_rates is not None:
+            self.process_salaries_vectorized(daily_rates)
+            return
         salaries = []
         to_delete = []
         df = pd.read_csv(self.file_name)
@@ -155,8 +171,29 @@ class ProcessSalaries:
         df['salary'] = salaries
         df.head(100).to_csv('currency_conversion.csv')
 
+    def process_salaries_vectorized(self, daily_rates: CurrencyRates.AsOfRates = None) -> None:
+        """
+        Переводит все зарплаты в рубли векторно: курсы переводятся в вид (месяц, валюта, курс)
+        и соединяются с вакансиями. Удаляются те же строки, что и при обходе строк:
+        без обеих границ оклада и с валютой не из списка доступных
+
+        :param daily_rates: Дневные курсы: если заданы, берется последний курс на дату публикации вместо курса за месяц
+        :type daily_rates: CurrencyRates.AsOfRates
+        """
+        df = pd.read_csv(self.file_name)
+        salaries = CurrencyRates.get_salary_sums(df)
+        keep = salaries.notna() & df['salary_currency'].isin(self.available_currencies)
+        if daily_rates is None:
+            rates = CurrencyRates.join_rates(df, CurrencyRates.melt_rate_frame(self.currencies))
+        else:
+            rates = pd.Series(daily_rates.get_rates(df['salary_currency'], df['published_at']), index=df.index)
+        salaries = salaries.where(df['salary_currency'] == 'RUR', salaries * rates)
+        df = df.loc[keep].drop(labels=['salary_to', 'salary_from', 'salary_currency'], axis=1)
+        df['salary'] = salaries[keep]
+        df.head(100).to_csv('currency_conversion.csv')
+
 file_name = "vacancies_dif_currencies.csv"
 process_cur = ProcessCurrencies(file_name)
 process_cur.get_currencies_to_convert()
 process_cur.generate_currency(process_cur.min_date, process_cur.max_date)
-ProcessSalaries(file_name).process_salaries()
+ProcessSalaries(file_name).process_salaries(vectorized=True)
@@ -1,27 +1,29 @@
 import csv
 import os
-import pathlib
+import sys
 from typing import List, Dict
 import re
 import numpy as np
 import pandas as pd
 import openpyxl
-import requests
 from matplotlib import pyplot as plt
 from openpyxl.styles import Border, Side, Alignment, Font
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
-from requests.adapters import HTTPAdapter
-from urllib3 import Retry
 from xlsx2html import xlsx2html
-import time
-import concurrent.futures
+import ParallelCSV
+import CurrencyRates
+import CBRClient
+from CurrencyConverter import CurrencyConverter
+from PartialStats import PartialStats
+
+converter = CurrencyConverter.historical("valutes.csv")
 
 class Salary:
     """
-    Класс для представления зарплат
+    Класс для представления зарплат. Зарплата в рублях считается один раз при создании
     """
     def __init__(self, salary_from: str or int or float, salary_to: str or int or float, salary_currency: str, published_at: str):
         """
@@ -42,6 +44,8 @@ class Salary:
         self.salary_currency = salary_currency
         self.published_at = published_at
         self.month_year = f"{self.published_at[5:7]}/{self.published_at[:4]}"
+        self.salary_in_rur = round(converter.middle_to_rub(self.salary_from, self.salary_to, self.salary_currency,
+                                                           self.published_at), 4)
 
     @staticmethod
     def __check_void_value(value: str or int or float) -> float:
@@ -49,23 +53,6 @@ class Salary:
             return 0
         return float(value)
 
-    def get_average_salary(self):
-        return round(((self.salary_from + self.salary_to) * ProcessValutes(self.month_year, self.salary_currency).get_currency_valute()) / 2, 4)
-
-class ProcessValutes:
-    def __init__(self, date, salary_currency):
-        self.date = date
-        self.salary_currency = salary_currency
-
-    def get_currency_valute(self):
-        if self.salary_currency == "RUR":
-            return 1
-        valutes = pd.read_csv("valutes.csv")
-        valute = valutes.loc[valutes["date"] == self.date]
-        if valute.__contains__(self.salary_currency):
-            return float(valute[self.salary_currency])
-        return 0
-
 class Vacancy:
     """
     Класс для представления вакансий
@@ -85,7 +72,7 @@ class Vacancy:
         self.year = self.published_at[:4]
 
     def get_array_vacancy(self) -> List[str]:
-        return [self.name, self.salary.get_average_salary(), self.area_name, self.published_at]
+        return [self.name, self.salary.salary_in_rur, self.area_name, self.published_at]
 
 class SplitCsvFileByYear:
     """
@@ -131,7 +118,7 @@ class SplitCsvFileByYear:
         os.mkdir(self.dir_name)
         vacancies_cur_year = []
         for vacancy in vacancies:
-            if (len(vacancy) == len(headlines)) and ((all([v != "" for v in vacancy])) or (vacancy[1] == "" and vacancy[2] != "") or (vacancy[1] != "" and vacancy[2] == "")):
+            if is_correct_vacancy(headlines, vacancy):
                 vacancy = [" ".join(re.sub("<.*?>", "", value).replace('\n', '; ').split()) for value in vacancy]
                 if len(self.first_vacancy) == 0:
                     self.first_vacancy = vacancy
@@ -231,7 +218,7 @@ class YearSalary:
         :type Salary
         """
         self.param = param
-        self.salary = salary.get_average_salary()
+        self.salary = salary.salary_in_rur
         self.count_vacancies = 1
 
     def add_salary(self, new_salary: Salary):
@@ -242,7 +229,7 @@ class YearSalary:
         :type Salary
         """
         self.count_vacancies += 1
-        self.salary = self.salary + new_salary.get_average_salary()
+        self.salary = self.salary + new_salary.salary_in_rur
         return self
 
 class Report:
@@ -543,6 +530,34 @@ class Statistic:
         professions_year_salary, professions_year_vacancies = self.__convert_from_param_salary_to_dict(professions_year_salary)
         return year_salary, year_vacancy, professions_year_salary, professions_year_vacancies
 
+    def process_pipeline(self, file_name: str, workers: int = None) -> tuple:
+        """
+        Обработка всего csv-файла конвейером: файл читается одним процессом, пачки вакансий
+        обрабатываются в процессах-обработчиках одновременно с чтением, без файлов по годам
+
+        :param file_name: Название файла
+        :type str
+
+        :param workers: Количество обработчиков (по умолчанию - количество ядер)
+        :type int
+
+        :return: Статистика по заданному файлу
+        :rtype: tuple
+        """
+        headlines, partials, summary = ParallelCSV.run_pipeline(file_name, count_vacancies_batch, self.profession,
+                                                                workers=workers,
+                                                                initializer=CurrencyRates.load_rate_table,
+                                                                initargs=("valutes.csv",))
+        ParallelCSV.print_pipeline_summary(summary)
+        stats = PartialStats.merge_all(partials)
+        years = dict(sorted(stats.table("year").groups.items()))
+        professions = stats.table("profession_year").groups
+        needed = {year: professions.get((self.profession, year), [0, 0]) for year in years}
+        return {year: 0 if v[0] == 0 else int(v[1] / v[0]) for year, v in years.items()}, \
+               {year: v[0] for year, v in years.items()}, \
+               {year: 0 if v[0] == 0 else int(v[1] / v[0]) for year, v in needed.items()}, \
+               {year: v[0] for year, v in needed.items()}
+
     def convert_to_param_salary(self, vacancies: List[Vacancy]) -> list:
         """
         Конвертирует список вакансий по параметру сравнения в список класса ParamSalary
@@ -596,6 +611,52 @@ class Statistic:
                 param_salary[int(y) - int(years[0])].count_vacancies = 0
         return param_salary
 
+def is_correct_vacancy(headlines: List[str], vacancy: List[str]) -> bool:
+    """
+    Проверяет, что вакансия заполнена (допускается пустая одна из границ оклада)
+
+    :param headlines: Названия загаловков
+    :type list
+
+    :param vacancy: Вакансия
+    :type list
+
+    :return: Подходит ли вакансия для статистики
+    :rtype: bool
+    """
+    return (len(vacancy) == len(headlines)) and ((all([v != "" for v in vacancy])) or (vacancy[1] == "" and vacancy[2] != "") or (vacancy[1] != "" and vacancy[2] == ""))
+
+def count_vacancies_batch(partial: PartialStats or None, headlines: List[str], vacancies: List[List[str]],
+                          profession: str) -> PartialStats:
+    """
+    Добавляет к частичной статистике пачку вакансий. Выполняется в процессе-обработчике конвейера
+
+    :param partial: Частичная статистика с таблицами year и profession_year (ключ - профессия и год)
+    :type PartialStats or None
+
+    :param headlines: Названия загаловков
+    :type list
+
+    :param vacancies: Пачка вакансий
+    :type list
+
+    :param profession: Название профессии
+    :type str
+
+    :return: Частичная статистика
+    :rtype: PartialStats
+    """
+    stats = partial or PartialStats()
+    years, profession_years = stats.table("year"), stats.table("profession_year")
+    vacancies = [Vacancy({x: y for x, y in zip(headlines, [" ".join(re.sub("<.*?>", "", value).replace('\n', '; ').split()) for value in vacancy])})
+                 for vacancy in vacancies if is_correct_vacancy(headlines, vacancy)]
+    for vacancy in vacancies:
+        salary = vacancy.salary.salary_in_rur
+        years.add_value(int(vacancy.year), salary)
+        if profession in vacancy.name:
+            profession_years.add_value((profession, int(vacancy.year)), salary)
+    return stats
+
 class CreateStatisticFiles:
     """
     Класс для создания итоговых файлов
@@ -689,25 +750,29 @@ class InputConnect:
         self.profession = input_data[1]
 
 class GetValutesValues:
-    def __init__(self, valutes):
+    def __init__(self, valutes, client: CBRClient.CBRClient = None):
         self.valutes = valutes
+        self.client = client or CBRClient.CBRClient()
 
     def get_valutes(self, date) -> list:
-        session = requests.Session()
-        retry = Retry(connect=3, backoff_factor=0.5)
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount('http://', adapter)
-        session.mount('https://', adapter)
-        url = f"https://www.cbr.ru/scripts/XML_daily.asp?date_req=01/{date}d=1"
-        res = session.get(url)
-        cur_df = pd.read_xml(res.text)
-        values = []
-        for valute in self.valutes:
-            if valute in cur_df["CharCode"].values:
-                values.append(round(float(cur_df.loc[cur_df["CharCode"] == valute]["Value"].values[0].replace(',', ".")) / float(cur_df.loc[cur_df["CharCode"] == valute]["Nominal"]), 4))
-            else:
-                values.append(0)
-        return [date] + values
+        return self.parse_valutes(date, self.client.fetch(f"01/{date}d=1"))
+
+    def get_all_valutes(self, dates: List[str]) -> List[list]:
+        """
+        Загружает курсы за все месяцы одновременно (не более client.max_workers запросов сразу)
+
+        :param dates: Месяцы в формате "MM/YYYY"
+        :type list
+
+        :return: Строки курсов в порядке dates
+        :rtype: list
+        """
+        contents = self.client.fetch_many([f"01/{date}d=1" for date in dates])
+        rows = CBRClient.parse_many_rates(contents, self.valutes, digits=4, missing=0, base=None)
+        return [[date] + row for date, row in zip(dates, rows) if row is not None]
+
+    def parse_valutes(self, date, content: bytes) -> list:
+        return [date] + CBRClient.parse_rates(content, self.valutes, digits=4, missing=0, base=None)
 
     @staticmethod
     def get_date(first_date, second_date) -> list:
@@ -727,16 +792,23 @@ class GetValutesValues:
 
 
 directory = 'vacancies_by_year'
-if __name__ == "__main__":
-    year_salary, year_vacancy, professions_year_salary, professions_year_vacancies = {}, {}, {}, {}
+
+
+def create_statistic(save_years: bool = False) -> None:
+    """
+    Запрашивает файл и профессию, считает статистику конвейером и создает файлы отчета
+
+    :param save_years: Дополнительно сохранить очищенные вакансии по файлам годов в папку directory
+        (из командной строки - флаг --save-years)
+    :type bool
+    """
     inp = InputConnect()
-    spl = SplitCsvFileByYear(inp.csv_file, directory)
-    start = time.time()
-    files = [str(file) for file in pathlib.Path(f"./{directory}").iterdir()]
+    if save_years:
+        SplitCsvFileByYear(inp.csv_file, directory)
     stats = Statistic(inp.profession)
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        r = list(executor.map(stats.process_data, files))
-        for el in r:
-            for i, value in zip(range(4), [year_salary, year_vacancy, professions_year_salary, professions_year_vacancies]):
-                value.update(el[i])
-    CreateStatisticFiles(year_salary, year_vacancy, professions_year_salary, professions_year_vacancies, inp.profession).create_files()
\ No newline at end of file
+    year_salary, year_vacancy, professions_year_salary, professions_year_vacancies = stats.process_pipeline(inp.csv_file)
+    CreateStatisticFiles(year_salary, year_vacancy, professions_year_salary, professions_year_vacancies, inp.profession).create_files()
+
+
+if __name__ == "__main__":
+    create_statistic("--save-years" in sys.argv[1:])
@@ -6,6 +6,7 @@ from matplotlib import pyplot as plt
 import pdfkit
 from jinja2 import Environment, FileSystemLoader
 from openpyxl import Workbook
+from SalaryCube import SalaryCube, get_salary_cube
 
 class Statistics:
     def __init__(self, vacancy_name: str, area_name: str):
@@ -34,6 +35,43 @@ class Statistics:
             .astype({'salary': np.int, 'count': np.int, 'prof_salary': np.int, 'prof_count': np.int})
         self.cities_percent_df = pd.read_sql(self.get_sql_requests['cities_percent'], connect, index_col='area_name').fillna(0)
 
+    def get_cubes(self, db_name: str = 'vacancies_database.db') -> tuple:
+        connect = sqlite3.connect(db_name)
+
+        def build(condition: str = '') -> SalaryCube:
+            df = pd.read_sql(f'SELECT published_at, area_name, Salary as salary FROM vacancies {condition}', connect)
+            return SalaryCube.from_columns({'year': df['published_at'].str[:4].astype(int),
+                                            'month': df['published_at'].str[5:7].astype(int),
+                                            'area_name': df['area_name']}, df['salary'].to_numpy(dtype=float))
+
+        cube = get_salary_cube(db_name, build, 'sql')
+        prof_cube = get_salary_cube(db_name, lambda: build(self.get_prof_condition), 'sql',
+                                    f'{self.vacancy_name}|{self.area_name}')
+        return cube, prof_cube
+
+    def get_cube_statistics(self, cube: SalaryCube, prof_cube: SalaryCube) -> None:
+        self.vacancies_count = cube.total('count')
+        years_df = self.get_cube_dataframe(cube.roll_up('year'), 'year', 'salary', 'count')
+        prof_years_df = self.get_cube_dataframe(prof_cube.roll_up('year'), 'year', 'prof_salary', 'prof_count')
+        self.years_df = years_df.sort_index().join(prof_years_df).fillna(0) \
+            .astype({'salary': int, 'count': int, 'prof_salary': int, 'prof_count': int})
+        cities_df = self.get_cube_dataframe(cube.roll_up('area_name'), 'area_name', 'salary', 'count')
+        self.cities_salary_df = cities_df[['salary']].sort_values(by='salary', ascending=False, kind='stable')\
+            .head(10).fillna(0).astype({'salary': int})
+        percent = cities_df['count'] * 100.0 / self.vacancies_count
+        self.cities_percent_df = percent[percent > 1].sort_values(ascending=False, kind='stable').head(10)\
+            .to_frame('percent')
+
+    @staticmethod
+    def get_cube_dataframe(cube: SalaryCube, index: str, salary: str, count: str) -> pd.DataFrame:
+        keys = cube.get_keys()
+        return pd.DataFrame({salary: np.trunc(list(cube.mean().values())), count: list(cube.count().values())},
+                            index=pd.Index(keys, name=index))
+
+    @property
+    def get_prof_condition(self) -> str:
+        return f'WHERE name LIKE ("%{self.vacancy_name}%") AND area_name LIKE ("%{self.area_name}%") '
+
     @property
     def get_sql_requests(self) -> dict:
         return {
@@ -45,8 +83,7 @@ class Statistics:
                           'CAST(AVG(Salary) as INTEGER) as prof_salary, '
                           'CAST(COUNT("index") as INTEGER) as prof_count '
                           'FROM vacancies '
-                          f'WHERE name LIKE ("%{self.vacancy_name}%") '
-                          f'AND area_name LIKE ("%{self.area_name}%") '
+                          f'{self.get_prof_condition}'
                           'GROUP BY year',
             'count': 'SELECT COUNT(*) FROM vacancies',
             'cities_salary': 'SELECT area_name, '
@@ -213,8 +250,11 @@ class PdfCreator:
         return html
 
 class Report:
-    def __init__(self, vacancy_name: str, area_name: str):
+    def __init__(self, vacancy_name: str, area_name: str, use_cube: bool = False):
         self.statistics = Statistics(vacancy_name, area_name)
-        self.statistics.get_statistics()
+        if use_cube:
+            self.statistics.get_cube_statistics(*self.statistics.get_cubes())
+        else:
+            self.statistics.get_statistics()
         GraphsCreator(self.statistics)
         PdfCreator(vacancy_name, area_name, ExcelCreator(self.statistics).workbook, len(self.statistics.years_df.index))
\ No newline at end of file
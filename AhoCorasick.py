@@ -0,0 +1,94 @@
+from collections import deque
+from typing import List
+
+
+class AhoCorasick:
+    """
+    Автомат Ахо-Корасик для поиска сразу всех ключевых слов (например, названий профессий)
+    в строке за один проход по ее символам, независимо от количества слов.
+
+    :param patterns: Ключевые слова
+    :type patterns: list
+
+    :param goto: Переходы по символам для каждого состояния
+    :type goto: list
+
+    :param fail: Суффиксные ссылки состояний
+    :type fail: list
+
+    :param outputs: Номера слов, найденных при попадании в состояние (с учетом суффиксных ссылок)
+    :type outputs: list
+
+    >>> automaton = AhoCorasick(["аналитик", "программист", "тик"])
+    >>> automaton.find("Ведущий аналитик-программист")
+    [0, 1, 2]
+    >>> automaton.find_patterns("Системный аналитик")
+    ['аналитик', 'тик']
+    >>> AhoCorasick(["", "java"]).find("Python")
+    [0]
+    """
+    def __init__(self, patterns: List[str]):
+        """
+        Строит бор ключевых слов и суффиксные ссылки обходом в ширину.
+
+        :param patterns: Ключевые слова
+        :type patterns: list
+        """
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [set()]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = self.goto[state][char] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(set())
+                state = next_state
+            self.outputs[state].add(index)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                self.outputs[next_state] |= self.outputs[self.fail[next_state]]
+
+    def find(self, text: str) -> List[int]:
+        """
+        Находит все ключевые слова, входящие в строку.
+
+        :param text: Строка (например, название вакансии)
+        :type text: str
+
+        :return: Номера найденных слов по возрастанию
+        :rtype: list
+        """
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set(outputs[0])
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return sorted(found)
+
+    def find_patterns(self, text: str) -> List[str]:
+        """
+        Находит все ключевые слова, входящие в строку.
+
+        :param text: Строка
+        :type text: str
+
+        :return: Найденные слова в порядке patterns
+        :rtype: list
+        """
+        return [self.patterns[index] for index in self.find(text)]
@@ -0,0 +1,18 @@
+from unittest import TestCase
+from AhoCorasick import *
+
+class AhoCorasickUnitTests(TestCase):
+    def test_find_overlapping_patterns(self):
+        self.assertEqual(AhoCorasick(["he", "she", "his", "hers"]).find("ushers"), [0, 1, 3])
+
+    def test_find_nothing(self):
+        self.assertEqual(AhoCorasick(["аналитик"]).find("Программист"), [])
+
+    def test_empty_pattern_is_found_everywhere(self):
+        self.assertEqual(AhoCorasick([""]).find(""), [0])
+
+    def test_find_same_as_substring_check(self):
+        patterns = ["ab", "b", "bab", "abc", "c", "ca", "aaa"]
+        automaton = AhoCorasick(patterns)
+        for text in ["", "abcabab", "aaaa", "cab", "bbbb", "abca"]:
+            self.assertEqual(automaton.find(text), [i for i, pattern in enumerate(patterns) if pattern in text])
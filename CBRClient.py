@@ -0,0 +1,256 @@
+import concurrent.futures
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+CBR_URL = "https://www.cbr.ru/scripts/XML_daily.asp"
+PARSE_CHUNK_SIZE = 1 << 14
+
+
+def parse_valutes(content: bytes or Iterable[bytes], chunk_size: int = PARSE_CHUNK_SIZE) -> Dict[str, tuple]:
+    """
+    Разбирает ответ XML_daily.asp в словарь CharCode/(Nominal, Value) потоковым парсером (XMLPullParser).
+    Ответ подается парсеру частями по chunk_size байт (или готовыми частями, например
+    response.iter_content()), после каждой части забираются готовые элементы Valute и сразу очищаются,
+    поэтому дерево всего ответа не строится.
+
+    :param content: XML с курсами валют или его части
+    :type content: bytes or Iterable[bytes]
+
+    :param chunk_size: Размер части, на которые делится content в байтах
+    :type chunk_size: int
+
+    :return: Словарь код валюты/(номинал, курс за номинал)
+    :rtype: dict
+
+    >>> parse_valutes(b'<ValCurs><Valute><CharCode>KZT</CharCode><Nominal>100</Nominal><Value>20,39</Value></Valute></ValCurs>')
+    {'KZT': (100.0, 20.39)}
+    >>> xml = b'<ValCurs><Valute><CharCode>USD</CharCode><Nominal>1</Nominal><Value>31,78</Value></Valute></ValCurs>'
+    >>> parse_valutes(xml, chunk_size=7), parse_valutes([xml[:30], xml[30:]])
+    ({'USD': (1.0, 31.78)}, {'USD': (1.0, 31.78)})
+    """
+    chunks = content
+    if isinstance(content, (bytes, bytearray)):
+        chunks = (content[start:start + chunk_size] for start in range(0, len(content), chunk_size))
+    parser = ET.XMLPullParser(events=("end",))
+    valutes = {}
+    fields = {}
+
+    def read_events() -> None:
+        nonlocal fields
+        for event, element in parser.read_events():
+            if element.tag == "Valute":
+                valutes[fields["CharCode"]] = (float(fields["Nominal"].replace(',', '.')),
+                                               float(fields["Value"].replace(',', '.')))
+                fields = {}
+                element.clear()
+            else:
+                fields[element.tag] = element.text
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        read_events()
+    parser.close()
+    read_events()
+    return valutes
+
+
+def parse_rates(content: bytes, currencies: List[str], digits: int = 6, missing=None, base: str = "RUR") -> list:
+    """
+    Курсы к рублю (курс за номинал / номинал) для всех запрошенных валют по одному разбору ответа.
+
+    :param content: XML с курсами валют
+    :type content: bytes
+
+    :param currencies: Валюты
+    :type currencies: list
+
+    :param digits: Количество знаков после запятой
+    :type digits: int
+
+    :param missing: Значение для валют, которых нет в ответе
+    :param base: Валюта, курс которой всегда равен 1 (None - без такой валюты)
+    :type base: str
+
+    :return: Курсы в порядке currencies
+    :rtype: list
+
+    >>> xml = b'<ValCurs><Valute><CharCode>KZT</CharCode><Nominal>100</Nominal><Value>20,3925</Value></Valute></ValCurs>'
+    >>> parse_rates(xml, ["RUR", "KZT", "EUR"])
+    [1, 0.203925, None]
+    """
+    valutes = parse_valutes(content)
+    rates = []
+    for currency in currencies:
+        if currency == base:
+            rates.append(1)
+        elif currency in valutes:
+            nominal, value = valutes[currency]
+            rates.append(round(value / nominal, digits))
+        else:
+            rates.append(missing)
+    return rates
+
+
+def parse_many_rates(contents: List[bytes or None], currencies: List[str], digits: int = 6, missing=None,
+                     base: str = "RUR") -> List[list or None]:
+    """
+    Разбирает ответы за много дней одним вызовом (например, результат CBRClient.fetch_many)
+    без создания DataFrame. Для незагруженных или испорченных ответов - None.
+
+    :param contents: Ответы XML_daily.asp
+    :type contents: list
+
+    :param currencies: Валюты
+    :type currencies: list
+
+    :param digits: Количество знаков после запятой
+    :type digits: int
+
+    :param missing: Значение для валют, которых нет в ответе
+    :param base: Валюта, курс которой всегда равен 1
+    :type base: str
+
+    :return: Курсы по дням в порядке contents
+    :rtype: list
+    """
+    result = []
+    for content in contents:
+        try:
+            result.append(None if content is None else parse_rates(content, currencies, digits, missing, base))
+        except (ET.ParseError, KeyError, AttributeError, ValueError):
+            result.append(None)
+    return result
+
+
+def get_months(start_date: str, finish_date: str) -> List[tuple]:
+    """
+    Список месяцев (год, месяц) от месяца start_date до месяца finish_date включительно.
+
+    :param start_date: Начало периода (дата, начинающаяся с "YYYY-MM")
+    :type start_date: str
+
+    :param finish_date: Конец периода (дата, начинающаяся с "YYYY-MM")
+    :type finish_date: str
+
+    :return: Список месяцев
+    :rtype: list
+
+    >>> get_months("2003-11-05", "2004-02-01")
+    [(2003, 11), (2003, 12), (2004, 1), (2004, 2)]
+    """
+    first_year, first_month = int(start_date[:4]), int(start_date[5:7])
+    last_year, last_month = int(finish_date[:4]), int(finish_date[5:7])
+    return [(year, month) for year in range(first_year, last_year + 1) for month in range(1, 13)
+            if not ((year == first_year and month < first_month) or (year == last_year and month > last_month))]
+
+
+class CBRClient:
+    """
+    Клиент API ЦБ (XML_daily.asp): одна сессия с пулом соединений и повторами запросов,
+    запросы за много дат выполняются одновременно, но не более max_workers сразу.
+
+    :param base_url: Адрес XML_daily.asp
+    :type base_url: str
+
+    :param max_workers: Наибольшее количество одновременных запросов
+    :type max_workers: int
+
+    :param timeout: Время ожидания ответа в секундах
+    :type timeout: float
+
+    :param session: Сессия requests
+    :type session: requests.Session
+    """
+    def __init__(self, base_url: str = CBR_URL, max_workers: int = 8, retries: int = 3,
+                 backoff_factor: float = 0.5, timeout: float = 10):
+        """
+        Инициализирует объект CBRClient.
+
+        :param base_url: Адрес XML_daily.asp
+        :type base_url: str
+
+        :param max_workers: Наибольшее количество одновременных запросов
+        :type max_workers: int
+
+        :param retries: Количество повторов запроса при ошибке соединения или ответе 5xx
+        :type retries: int
+
+        :param backoff_factor: Множитель паузы между повторами
+        :type backoff_factor: float
+
+        :param timeout: Время ожидания ответа в секундах
+        :type timeout: float
+        """
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff_factor,
+                      status_forcelist=(500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self) -> 'CBRClient':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Закрывает сессию и ее соединения.
+        """
+        self.session.close()
+
+    def fetch(self, date_req: str) -> bytes:
+        """
+        Загружает XML с курсами валют на дату.
+
+        :param date_req: Дата в формате "DD/MM/YYYY"
+        :type date_req: str
+
+        :return: Содержимое ответа
+        :rtype: bytes
+        """
+        response = self.session.get(f"{self.base_url}?date_req={date_req}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def fetch_many(self, dates: List[str]) -> List[bytes or None]:
+        """
+        Загружает XML за много дат одновременно. Результаты идут в порядке dates;
+        для дат, которые не удалось загрузить после всех повторов, - None.
+
+        :param dates: Даты в формате "DD/MM/YYYY"
+        :type dates: list
+
+        :return: Содержимое ответов
+        :rtype: list
+        """
+        def fetch_or_none(date_req: str) -> bytes or None:
+            try:
+                return self.fetch(date_req)
+            except requests.RequestException:
+                return None
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(fetch_or_none, dates))
+
+    def fetch_months(self, months: List[tuple], day: int = 1) -> List[bytes or None]:
+        """
+        Загружает XML за указанный день каждого месяца.
+
+        :param months: Список месяцев (год, месяц), см. get_months
+        :type months: list
+
+        :param day: День месяца
+        :type day: int
+
+        :return: Содержимое ответов в порядке months
+        :rtype: list
+        """
+        return self.fetch_many([f"{day:02d}/{month:02d}/{year}" for year, month in months])
@@ -0,0 +1,109 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from unittest import TestCase
+from CBRClient import *
+
+CANNED_XML = '''<?xml version="1.0" encoding="windows-1251"?>
+<ValCurs Date="{date}" name="Foreign Currency Market">
+<Valute ID="R01235"><NumCode>840</NumCode><CharCode>USD</CharCode><Nominal>1</Nominal><Name>Dollar</Name><Value>{value},5000</Value></Valute>
+<Valute ID="R01335"><NumCode>398</NumCode><CharCode>KZT</CharCode><Nominal>100</Nominal><Name>Tenge</Name><Value>20,3925</Value></Valute>
+</ValCurs>'''
+
+
+class CBRStandInHandler(BaseHTTPRequestHandler):
+    """
+    Заменитель XML_daily.asp: отдает заготовленный XML, считает одновременные запросы
+    и отвечает 503 на первый запрос за даты из fail_once.
+    """
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    requests_count = 0
+    fail_once = set()
+
+    def do_GET(self):
+        cls = CBRStandInHandler
+        date_req = parse_qs(urlparse(self.path).query)["date_req"][0]
+        with cls.lock:
+            cls.active += 1
+            cls.requests_count += 1
+            cls.max_active = max(cls.max_active, cls.active)
+            fail = date_req in cls.fail_once
+            cls.fail_once.discard(date_req)
+        time.sleep(0.02)
+        with cls.lock:
+            cls.active -= 1
+        if fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = CANNED_XML.format(date=date_req, value=int(date_req[3:5])).encode('windows-1251')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CBRClientUnitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CBRStandInHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/scripts/XML_daily.asp"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        CBRStandInHandler.max_active = 0
+        CBRStandInHandler.requests_count = 0
+        CBRStandInHandler.fail_once = set()
+
+    def test_get_months_inside_one_year(self):
+        self.assertEqual(get_months("2020-03", "2020-05"), [(2020, 3), (2020, 4), (2020, 5)])
+
+    def test_fetch_one_date(self):
+        with CBRClient(self.url, backoff_factor=0) as client:
+            self.assertIn(b'Date="02/07/2022"', client.fetch("02/07/2022"))
+
+    def test_fetch_months_keeps_order(self):
+        months = get_months("2021-01", "2022-12")
+        with CBRClient(self.url, max_workers=4, backoff_factor=0) as client:
+            contents = client.fetch_months(months, day=2)
+        self.assertEqual([f"<Value>{month},5000</Value>".encode() in content for (year, month), content
+                          in zip(months, contents)], [True] * len(months))
+
+    def test_fetch_many_bounded_concurrency(self):
+        with CBRClient(self.url, max_workers=3, backoff_factor=0) as client:
+            client.fetch_months(get_months("2021-01", "2021-12"))
+        self.assertLessEqual(CBRStandInHandler.max_active, 3)
+
+    def test_fetch_many_retries_server_error(self):
+        CBRStandInHandler.fail_once = {"01/05/2021"}
+        with CBRClient(self.url, backoff_factor=0) as client:
+            contents = client.fetch_months([(2021, 5)])
+        self.assertIn(b"<Value>5,5000</Value>", contents[0])
+        self.assertEqual(CBRStandInHandler.requests_count, 2)
+
+    def test_fetch_many_without_retries_gives_none(self):
+        CBRStandInHandler.fail_once = {"01/05/2021"}
+        with CBRClient(self.url, retries=0, backoff_factor=0) as client:
+            self.assertEqual(client.fetch_months([(2021, 5), (2021, 6)])[0], None)
+
+    def test_parse_rates_nominal_and_missing(self):
+        content = CANNED_XML.format(date="02/07/2022", value=70).encode('windows-1251')
+        self.assertEqual(parse_rates(content, ["RUR", "KZT", "USD", "EUR"]), [1, 0.203925, 70.5, None])
+
+    def test_parse_many_rates_without_base(self):
+        content = CANNED_XML.format(date="01/07/2022", value=70).encode('windows-1251')
+        self.assertEqual(parse_many_rates([content, None, b"<ValCurs>"], ["RUR", "KZT"], digits=4, missing=0, base=None),
+                         [[0, 0.2039], None, None])
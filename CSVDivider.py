@@ -1,5 +1,6 @@
 import csv
 import os
+import ParallelCSV
 
 class InputCorrect:
     """
@@ -55,12 +56,10 @@ class DataSetDivider:
 
     def csv_reader(self) -> None:
         """
-        Чтение файла и первичная фильтрация (пропуск невалидных строк).
+        Чтение заголовков файла.
         """
         with open(self.input_values.file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
-            file = csv.reader(csv_file)
-            self.start_line = next(file)
-            self.other_lines = [line for line in file if not ("" in line) and len(line) == len(self.start_line)]
+            self.start_line = next(csv.reader(csv_file))
             self.year_index = self.start_line.index("published_at")
 
     @staticmethod
@@ -76,36 +75,23 @@ class DataSetDivider:
         """
         return date[:4]
 
-    def save_file(self, current_year: str, lines: list) -> None:
-        """
-        Сохраняет CSV-файл с конкретными годами.
-
-        :param current_year: Текущий год
-        :type current_year: str
-
-        :param lines: Список вакансий этого года
-        :type lines: list
+    def csv_divide(self, batch_size: int = 5000) -> None:
         """
-        with open(f"{self.dir}/file_{current_year}.csv", "a", encoding='utf-8-sig', newline='') as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerows(lines)
+        Разделяет данные на csv-файлы по годам. Файл читается пачками строк, и каждая пачка
+        сразу дописывается в файлы своих годов, поэтому весь файл в памяти не хранится.
+        Невалидные строки пропускаются.
 
-    def csv_divide(self) -> None:
+        :param batch_size: Количество строк в пачке
+        :type batch_size: int
         """
-        Разделяет данные на csv-файлы по годам.
-        """
-        current_year = DataSetDivider.get_year(self.other_lines[0][self.year_index])
-        current_index = 0
-        data_years = [[]]
-        for line in self.other_lines:
-            line_year = DataSetDivider.get_year(line[self.year_index])
-            if line_year != current_year:
-                self.save_file(current_year, data_years[current_index])
-                current_year = line_year
-                current_index += 1
-                data_years.append([])
-            data_years[current_index].append(line)
-        self.save_file(current_year, data_years[current_index])
+        writer = ParallelCSV.YearFileWriter(self.dir, self.year_index)
+        with open(self.input_values.file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            file = csv.reader(csv_file)
+            next(file)
+            for batch in ParallelCSV.iter_row_batches(
+                    file, batch_size, lambda line: not ("" in line) and len(line) == len(self.start_line)):
+                writer.write(batch)
+        writer.close()
 
 def divide_csv_file(csv_dir: str) -> DataSetDivider:
     """
@@ -1,18 +1,47 @@
+import os
 import pandas as pd
 import sqlite3
+from RateStore import RateStore
 
-def createSqlFromCSV(file_name: str) -> None:
+def createSqlFromCSV(file_name: str, db_name: str = 'currencies_db') -> None:
     """
     Создаёт SQL-таблицу из CSV-файла
     :param file_name: Название файла относительно директории скрипта
+    :param db_name: Имя файла БД с таблицей currencies
     :return: None
     """
     df = pd.read_csv(file_name)
-    conn = sqlite3.connect('currencies_db')
+    conn = sqlite3.connect(db_name)
     c = conn.cursor()
     c.execute('CREATE TABLE IF NOT EXISTS currencies (date text, RUR number, USD number, KZT number, BYR number,'
               'UAH number, EUR number)')
     conn.commit()
     df.to_sql('currencies', conn, if_exists='replace', index=False)
+    conn.close()
 
-createSqlFromCSV('dataframe.csv')
+def createSqlFromStore(store_name: str = 'rates_store.sqlite', db_name: str = 'currencies_db.sqlite',
+                       csv_name: str = 'dataframe.csv') -> None:
+    """
+    Создаёт SQL-таблицу currencies (столбец на валюту) из хранилища курсов RateStore,
+    которое заполняет ProcessCurrencies.generate_currency, - у dataframe.csv и БД один источник.
+    Хранилище не создается: если его нет или в нем нет курсов, таблица строится из csv_name,
+    а без него остается как есть
+    :param store_name: Имя файла хранилища курсов
+    :param db_name: Имя файла БД с таблицей currencies
+    :param csv_name: CSV-файл курсов на случай пустого хранилища
+    :return: None
+    """
+    df = None
+    if os.path.exists(store_name):
+        with RateStore(store_name) as store:
+            df = store.get_frame()
+    if df is None or df.empty:
+        if os.path.exists(csv_name):
+            createSqlFromCSV(csv_name, db_name)
+        return
+    conn = sqlite3.connect(db_name)
+    df.to_sql('currencies', conn, if_exists='replace', index=False)
+    conn.close()
+
+if __name__ == '__main__':
+    createSqlFromStore()
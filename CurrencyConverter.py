@@ -0,0 +1,191 @@
+import math
+import numpy as np
+import pandas as pd
+import CurrencyRates
+
+CURRENCY_TO_RUB = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76,
+                   "KZT": 0.13, "RUR": 1, "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
+
+
+class CurrencyConverter:
+    """
+    Перевод окладов в рубли для всех отчетов. Статический режим - один курс на валюту из словаря,
+    исторический - курс за месяц публикации из таблицы курсов (RateTable) или последний курс
+    на дату публикации (AsOfRates).
+
+    :param rates: Словарь валюта/курс к рублю (статический режим)
+    :type rates: dict
+
+    :param rate_file: Файл таблицы курсов, загружаемой один раз на процесс (исторический режим)
+    :type rate_file: str
+
+    :param table: Готовая таблица курсов (исторический режим)
+    :type table: CurrencyRates.RateTable or CurrencyRates.AsOfRates
+
+    >>> CurrencyConverter().middle_to_rub("10.5", "20.9", "EUR", floor=True)
+    898.5
+    >>> table = CurrencyRates.RateTable(["07/2022"], ["USD"], np.array([[60.0]]))
+    >>> CurrencyConverter(table=table).middle_to_rub(100, 200, "USD", "2022-07-05T11:23:00+0300")
+    9000.0
+    """
+    def __init__(self, rates: dict = None, rate_file: str = None, table=None):
+        """
+        Инициализирует объект CurrencyConverter. Без параметров - статический режим с CURRENCY_TO_RUB.
+
+        :param rates: Словарь валюта/курс к рублю
+        :type rates: dict
+
+        :param rate_file: Файл таблицы курсов
+        :type rate_file: str
+
+        :param table: Готовая таблица курсов
+        :type table: CurrencyRates.RateTable or CurrencyRates.AsOfRates
+        """
+        self.rates = CURRENCY_TO_RUB if rates is None else rates
+        self.rate_file = rate_file
+        self.__table = table
+
+    @staticmethod
+    def historical(rate_file: str = "valutes.csv") -> 'CurrencyConverter':
+        """
+        Конвертер по курсам за месяц публикации. Файл курсов читается при первом переводе
+        (или заранее через CurrencyRates.load_rate_table в initializer пула процессов).
+
+        :param rate_file: Файл таблицы курсов
+        :type rate_file: str
+
+        :return: Исторический конвертер
+        :rtype: CurrencyConverter
+        """
+        return CurrencyConverter(rate_file=rate_file)
+
+    @property
+    def is_historical(self) -> bool:
+        return self.__table is not None or self.rate_file is not None
+
+    @property
+    def table(self):
+        """
+        Таблица курсов исторического режима.
+        """
+        if self.__table is not None:
+            return self.__table
+        return CurrencyRates.get_rate_table(self.rate_file)
+
+    def get_rate(self, currency: str, published_at: str = None) -> float:
+        """
+        Курс валюты к рублю; в историческом режиме - на дату публикации.
+
+        :param currency: Идентификатор валюты
+        :type currency: str
+
+        :param published_at: Дата публикации вакансии
+        :type published_at: str
+
+        :return: Курс к рублю
+        :rtype: float
+        """
+        if not self.is_historical:
+            return self.rates[currency]
+        table = self.table
+        if isinstance(table, CurrencyRates.AsOfRates):
+            return table.get_rate(currency, published_at)
+        return table.get_rate(currency, f"{published_at[5:7]}/{published_at[:4]}")
+
+    def to_rub(self, salary: float, currency: str, published_at: str = None) -> float:
+        """
+        Переводит значение оклада в рубли.
+
+        :param salary: Значение оклада
+        :type salary: float
+
+        :param currency: Идентификатор валюты
+        :type currency: str
+
+        :param published_at: Дата публикации вакансии
+        :type published_at: str
+
+        :return: Значение оклада в рублях
+        :rtype: float
+
+        >>> CurrencyConverter().to_rub(10 + 20, "AZN")
+        1070.4
+        """
+        return salary * self.get_rate(currency, published_at)
+
+    def middle_to_rub(self, salary_from, salary_to, currency: str, published_at: str = None,
+                      floor: bool = False) -> float:
+        """
+        Переводит среднее значение вилки оклада в рубли.
+
+        :param salary_from: Нижняя граница вилки оклада
+        :type salary_from: str or int or float
+
+        :param salary_to: Верхняя граница вилки оклада
+        :type salary_to: str or int or float
+
+        :param currency: Идентификатор валюты
+        :type currency: str
+
+        :param published_at: Дата публикации вакансии
+        :type published_at: str
+
+        :param floor: Округлять ли границы вилки вниз до целых
+        :type floor: bool
+
+        :return: Средний оклад в рублях
+        :rtype: float
+        """
+        salary_from, salary_to = float(salary_from), float(salary_to)
+        if floor:
+            salary_from, salary_to = math.floor(salary_from), math.floor(salary_to)
+        return (salary_from + salary_to) * self.get_rate(currency, published_at) / 2
+
+    def get_rates(self, currencies, published_at=None) -> np.ndarray:
+        """
+        Векторно находит курсы для столбца валют: в статическом режиме - один раз на валюту,
+        в историческом - один раз на пару (валюта, месяц) или поиском по дневным курсам.
+
+        :param currencies: Идентификаторы валют
+        :param published_at: Даты публикации (строки или datetime64)
+
+        :return: Курсы к рублю
+        :rtype: np.ndarray
+
+        >>> CurrencyConverter().get_rates(["USD", "RUR", "USD"]).tolist()
+        [60.66, 1.0, 60.66]
+        """
+        if not self.is_historical:
+            codes, uniques = pd.factorize(np.asarray(currencies, dtype=object))
+            return np.array([self.rates[currency] for currency in uniques], dtype=float)[codes]
+        table = self.table
+        if isinstance(table, CurrencyRates.AsOfRates):
+            return table.get_rates(currencies, published_at)
+        months, month_codes = np.unique(CurrencyRates.to_days(published_at).astype("datetime64[M]"),
+                                        return_inverse=True)
+        keys = np.array([f"{month[5:7]}/{month[:4]}" for month in np.datetime_as_string(months, unit="M")],
+                        dtype=object)
+        return table.get_rates(currencies, keys[month_codes])
+
+    def middle_to_rub_many(self, salary_from, salary_to, currencies, published_at=None,
+                           floor: bool = False) -> np.ndarray:
+        """
+        Векторно переводит средние значения вилок окладов в рубли - столбец считается один раз
+        при загрузке и дальше только читается.
+
+        :param salary_from: Нижние границы окладов
+        :param salary_to: Верхние границы окладов
+        :param currencies: Идентификаторы валют
+        :param published_at: Даты публикации
+
+        :param floor: Округлять ли границы вилки вниз до целых
+        :type floor: bool
+
+        :return: Средние оклады в рублях
+        :rtype: np.ndarray
+        """
+        salary_from = np.asarray(salary_from, dtype=float)
+        salary_to = np.asarray(salary_to, dtype=float)
+        if floor:
+            salary_from, salary_to = np.floor(salary_from), np.floor(salary_to)
+        return (salary_from + salary_to) * self.get_rates(currencies, published_at) / 2
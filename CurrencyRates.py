@@ -0,0 +1,347 @@
+import numpy as np
+import pandas as pd
+
+rate_tables = {}
+
+
+class RateTable:
+    """
+    Таблица курсов валют к рублю по месяцам (формат месяца - "MM/YYYY"), загружаемая один раз.
+
+    :param months: Номера строк таблицы по месяцам
+    :type months: dict
+
+    :param currencies: Номера столбцов таблицы по валютам
+    :type currencies: dict
+
+    :param values: Курсы: строка - месяц, столбец - валюта
+    :type values: np.ndarray
+
+    :param rates: Курсы по ключу (валюта, месяц)
+    :type rates: dict
+    """
+    def __init__(self, months: list, currencies: list, values: np.ndarray):
+        """
+        Инициализирует объект RateTable.
+
+        :param months: Месяцы в порядке строк таблицы
+        :type months: list
+
+        :param currencies: Валюты в порядке столбцов таблицы
+        :type currencies: list
+
+        :param values: Курсы: строка - месяц, столбец - валюта
+        :type values: np.ndarray
+
+        >>> table = RateTable(["01/2022", "02/2022"], ["USD"], np.array([[70.0], [75.5]]))
+        >>> table.get_rate("USD", "02/2022"), table.get_rate("RUR", "01/2022"), table.get_rate("KZT", "01/2022")
+        (75.5, 1, 0)
+        """
+        self.months = {month: i for i, month in enumerate(months)}
+        self.currencies = {currency: i for i, currency in enumerate(currencies)}
+        self.values = np.asarray(values, dtype=float)
+        self.rates = {(currency, month): float(self.values[i, j])
+                      for month, i in self.months.items() for currency, j in self.currencies.items()}
+
+    @staticmethod
+    def from_csv(file_name: str = "valutes.csv") -> 'RateTable':
+        """
+        Читает таблицу курсов из csv-файла со столбцом date и столбцами валют.
+
+        :param file_name: Название файла с курсами
+        :type file_name: str
+
+        :return: Таблица курсов
+        :rtype: RateTable
+        """
+        valutes = pd.read_csv(file_name, dtype={"date": str})
+        currencies = [column for column in valutes.columns if column != "date"]
+        return RateTable(valutes["date"].tolist(), currencies, valutes[currencies].to_numpy(dtype=float))
+
+    def get_rate(self, currency: str, month: str) -> float:
+        """
+        Курс валюты за месяц: для рубля - 1, для валюты без столбца в таблице - 0.
+
+        :param currency: Идентификатор валюты
+        :type currency: str
+
+        :param month: Месяц в формате "MM/YYYY"
+        :type month: str
+
+        :return: Курс к рублю
+        :rtype: float
+        """
+        if currency == "RUR":
+            return 1
+        if currency not in self.currencies:
+            return 0
+        try:
+            return self.rates[(currency, month)]
+        except KeyError:
+            raise KeyError(f"Нет курсов за {month}")
+
+    def get_rates(self, currencies, months) -> np.ndarray:
+        """
+        Векторно находит курсы для столбцов валют и месяцев с теми же правилами, что и get_rate.
+
+        :param currencies: Идентификаторы валют
+        :param months: Месяцы в формате "MM/YYYY"
+
+        :return: Курсы к рублю
+        :rtype: np.ndarray
+
+        >>> table = RateTable(["01/2022", "02/2022"], ["USD"], np.array([[70.0], [75.5]]))
+        >>> table.get_rates(["USD", "RUR", "KZT", "USD"], ["02/2022", "01/2022", "01/2022", "01/2022"]).tolist()
+        [75.5, 1.0, 0.0, 70.0]
+        """
+        currencies = np.asarray(currencies, dtype=object)
+        currency_codes = pd.Index(list(self.currencies)).get_indexer(currencies)
+        month_codes = pd.Index(list(self.months)).get_indexer(np.asarray(months, dtype=object))
+        known = (currency_codes != -1) & (currencies != "RUR")
+        if (month_codes[known] == -1).any():
+            raise KeyError(f"Нет курсов за {np.asarray(months, dtype=object)[known & (month_codes == -1)][0]}")
+        rates = np.zeros(len(currencies))
+        rates[known] = self.values[month_codes[known], currency_codes[known]]
+        rates[currencies == "RUR"] = 1
+        return rates
+
+    def convert_salaries(self, salary_from, salary_to, currencies, months) -> np.ndarray:
+        """
+        Векторно переводит средние значения вилок окладов в рубли с округлением до 4 знаков.
+        np.round в редких случаях расходится с round в последнем знаке, поэтому там, где нужен
+        результат, совпадающий с Salary.salary_in_rur, оклады переводятся через middle_to_rub.
+
+        :param salary_from: Нижние границы окладов
+        :param salary_to: Верхние границы окладов
+        :param currencies: Идентификаторы валют
+        :param months: Месяцы в формате "MM/YYYY"
+
+        :return: Средние оклады в рублях
+        :rtype: np.ndarray
+        """
+        salary_sum = np.asarray(salary_from, dtype=float) + np.asarray(salary_to, dtype=float)
+        return np.round(salary_sum * self.get_rates(currencies, months) / 2, 4)
+
+
+def to_days(dates) -> np.ndarray:
+    """
+    Переводит даты (строки, начинающиеся с "YYYY-MM-DD" или "YYYY-MM", или datetime64) в datetime64[D].
+    Месяц без дня означает первое число месяца, пустая дата - NaT.
+
+    :param dates: Даты
+
+    :return: Даты с точностью до дня
+    :rtype: np.ndarray
+
+    >>> to_days(["2022-07-05T11:23:00+0300", "2003-01", None]).tolist()
+    [datetime.date(2022, 7, 5), datetime.date(2003, 1, 1), None]
+    """
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype("datetime64[D]")
+    return np.asarray(pd.Series(dates, dtype=object).fillna("NaT"), dtype="U10").astype("datetime64[D]")
+
+
+class AsOfRates:
+    """
+    Дневные курсы валют для соединения "на дату": вакансия переводится по последнему курсу,
+    известному на дату публикации или раньше. Для каждой валюты хранятся отсортированные
+    массивы дат и курсов, поиск - np.searchsorted сразу по всем вакансиям с этой валютой.
+
+    :param rates: Массивы (даты, курсы) по валютам
+    :type rates: dict
+
+    >>> rates = AsOfRates({"USD": (["2022-07-01", "2022-07-05"], [60.0, 62.5])})
+    >>> rates.get_rates(["USD", "USD", "USD", "RUR", "EUR"],
+    ...                 ["2022-06-30", "2022-07-04T10:00:00+0300", "2022-07-05", "2022-06-30", "2022-07-05"]).tolist()
+    [nan, 60.0, 62.5, 1.0, nan]
+    """
+    def __init__(self, rates: dict, base: str = "RUR"):
+        """
+        Инициализирует объект AsOfRates. Пустые курсы (валюты не было в ответе ЦБ) пропускаются,
+        чтобы на такую дату брался предыдущий известный курс.
+
+        :param rates: Пары (даты, курсы) по валютам, даты в любом порядке
+        :type rates: dict
+
+        :param base: Валюта, курс которой всегда равен 1
+        :type base: str
+        """
+        self.base = base
+        self.rates = {}
+        for currency, (dates, values) in rates.items():
+            dates = to_days(dates)
+            values = np.asarray([np.nan if value is None else value for value in values], dtype=float)
+            known = ~np.isnan(values) & ~np.isnat(dates)
+            order = np.argsort(dates[known], kind="stable")
+            self.rates[currency] = (dates[known][order], values[known][order])
+
+    @staticmethod
+    def from_rows(rows: list, currencies: list, base: str = "RUR") -> 'AsOfRates':
+        """
+        Собирает курсы из строк вида [дата, курс первой валюты, ...] (как у RateStore.get_rows
+        или CBRClient.parse_many_rates с добавленной датой).
+
+        :param rows: Строки курсов
+        :type rows: list
+
+        :param currencies: Валюты в порядке столбцов строк
+        :type currencies: list
+
+        :param base: Валюта, курс которой всегда равен 1
+        :type base: str
+
+        :return: Курсы на дату
+        :rtype: AsOfRates
+        """
+        dates = [row[0] for row in rows]
+        return AsOfRates({currency: (dates, [row[i] for row in rows])
+                          for i, currency in enumerate(currencies, start=1) if currency != base}, base)
+
+    @staticmethod
+    def from_frame(frame: pd.DataFrame, base: str = "RUR") -> 'AsOfRates':
+        """
+        Собирает курсы из таблицы со столбцом date и столбцами валют (как dataframe.csv).
+
+        :param frame: Таблица курсов
+        :type frame: pd.DataFrame
+
+        :param base: Валюта, курс которой всегда равен 1
+        :type base: str
+
+        :return: Курсы на дату
+        :rtype: AsOfRates
+        """
+        return AsOfRates({currency: (frame["date"].to_numpy(), frame[currency].to_numpy())
+                          for currency in frame.columns if currency not in ("date", base)
+                          and not str(currency).startswith("Unnamed")}, base)
+
+    def get_rate(self, currency: str, date) -> float:
+        """
+        Последний курс валюты на дату или раньше; NaN, если такого курса нет.
+
+        :param currency: Идентификатор валюты
+        :type currency: str
+
+        :param date: Дата
+        :return: Курс к рублю
+        :rtype: float
+        """
+        return float(self.get_rates([currency], [date])[0])
+
+    def get_rates(self, currencies, dates, missing: float = np.nan) -> np.ndarray:
+        """
+        Векторно находит для каждой пары (валюта, дата) последний курс на эту дату или раньше.
+
+        :param currencies: Идентификаторы валют
+        :param dates: Даты публикации
+
+        :param missing: Значение, если курса нет (неизвестная валюта или дата раньше первого курса)
+        :type missing: float
+
+        :return: Курсы к рублю
+        :rtype: np.ndarray
+        """
+        codes, uniques = pd.factorize(np.asarray(currencies, dtype=object))
+        days = to_days(dates)
+        rates = np.full(len(codes), missing, dtype=float)
+        for code, currency in enumerate(uniques):
+            if currency == self.base:
+                rates[codes == code] = 1
+                continue
+            if currency not in self.rates:
+                continue
+            rate_days, values = self.rates[currency]
+            mask = codes == code
+            positions = np.searchsorted(rate_days, days[mask], side="right") - 1
+            found = (positions >= 0) & ~np.isnat(days[mask])
+            currency_rates = np.full(len(positions), missing, dtype=float)
+            currency_rates[found] = values[positions[found]]
+            rates[mask] = currency_rates
+        return rates
+
+
+def load_rate_table(file_name: str = "valutes.csv") -> RateTable:
+    """
+    Загружает таблицу курсов в текущем процессе. Подходит как initializer для ProcessPoolExecutor,
+    чтобы каждый обработчик читал файл курсов один раз.
+
+    :param file_name: Название файла с курсами
+    :type file_name: str
+
+    :return: Таблица курсов
+    :rtype: RateTable
+    """
+    rate_tables[file_name] = RateTable.from_csv(file_name)
+    return rate_tables[file_name]
+
+
+def get_rate_table(file_name: str = "valutes.csv") -> RateTable:
+    """
+    Возвращает таблицу курсов текущего процесса, загружая ее при первом обращении.
+
+    :param file_name: Название файла с курсами
+    :type file_name: str
+
+    :return: Таблица курсов
+    :rtype: RateTable
+    """
+    if file_name not in rate_tables:
+        return load_rate_table(file_name)
+    return rate_tables[file_name]
+
+
+def melt_rate_frame(currencies: pd.DataFrame) -> pd.DataFrame:
+    """
+    Переводит таблицу курсов со столбцом date (месяц "YYYY-MM") и столбцами валют
+    в длинный вид (month, currency, rate) для соединения с вакансиями.
+
+    :param currencies: Таблица курсов date/валюты
+    :type currencies: pd.DataFrame
+
+    :return: Таблица курсов month/currency/rate
+    :rtype: pd.DataFrame
+
+    >>> melt_rate_frame(pd.DataFrame({"date": ["2003-01"], "USD": [31.5], "EUR": [None]})).values.tolist()
+    [['2003-01', 'USD', 31.5], ['2003-01', 'EUR', nan]]
+    """
+    rates = currencies.melt(id_vars="date", var_name="currency", value_name="rate").rename(columns={"date": "month"})
+    rates["rate"] = rates["rate"].astype(float)
+    return rates.drop_duplicates(["month", "currency"])
+
+
+def get_salary_sums(vacancies: pd.DataFrame) -> pd.Series:
+    """
+    Векторно складывает границы вилки оклада: если одна из границ пустая - берется другая,
+    если пусты обе - NaN.
+
+    :param vacancies: Вакансии со столбцами salary_from и salary_to
+    :type vacancies: pd.DataFrame
+
+    :return: Суммы границ оклада
+    :rtype: pd.Series
+
+    >>> get_salary_sums(pd.DataFrame({"salary_from": [1.0, None, None], "salary_to": [2.0, 3.0, None]})).tolist()
+    [3.0, 3.0, nan]
+    """
+    return vacancies[["salary_from", "salary_to"]].sum(axis=1, min_count=1)
+
+
+def join_rates(vacancies: pd.DataFrame, rates: pd.DataFrame) -> pd.Series:
+    """
+    Находит курс валюты оклада за месяц публикации каждой вакансии одним соединением таблиц.
+    Если курса за месяц нет или он пустой - NaN.
+
+    :param vacancies: Вакансии со столбцами salary_currency и published_at
+    :type vacancies: pd.DataFrame
+
+    :param rates: Таблица курсов month/currency/rate (см. melt_rate_frame)
+    :type rates: pd.DataFrame
+
+    :return: Курсы в порядке вакансий
+    :rtype: pd.Series
+    """
+    keys = pd.DataFrame({"month": vacancies["published_at"].str[:7].to_numpy(),
+                         "currency": vacancies["salary_currency"].to_numpy()})
+    merged = keys.merge(rates, how="left", on=["month", "currency"])
+    return pd.Series(merged["rate"].to_numpy(dtype=float), index=vacancies.index)
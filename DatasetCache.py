@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable
+from VacancyFrame import VacancyFrame
+
+CACHE_VERSION = 1
+CONTENT_HASHES = {}
+
+
+class DatasetCache:
+    """
+    Двоичный кэш очищенного набора вакансий (или построенного по нему индекса) рядом с csv-файлом
+    (папка <файл>.cache). Запись кэша определяется путем, размером, временем изменения и хэшем
+    содержимого файла, поэтому при изменении файла кэш перестает использоваться и пересобирается.
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param kind: Вид очистки данных (разные способы разбора хранятся отдельно)
+    :type kind: str
+
+    :param loader: Функция загрузки записи из папки
+    :type loader: Callable
+
+    :param cache_dir: Папка кэша
+    :type cache_dir: str
+    """
+    def __init__(self, file_name: str, kind: str, loader: Callable[[str], object] = VacancyFrame.load):
+        """
+        Инициализирует объект DatasetCache.
+
+        :param file_name: Название csv-файла
+        :type file_name: str
+
+        :param kind: Вид очистки данных (разные способы разбора хранятся отдельно)
+        :type kind: str
+
+        :param loader: Функция загрузки записи из папки (по умолчанию - VacancyFrame.load);
+            сохраняемый объект должен иметь метод save(папка)
+        :type loader: Callable
+        """
+        self.file_name = file_name
+        self.kind = kind
+        self.loader = loader
+        self.cache_dir = f"{file_name}.cache"
+
+    @staticmethod
+    def get_content_hash(file_name: str, block_size: int = 1 << 20) -> str:
+        """
+        Считает хэш содержимого файла, читая его блоками.
+
+        :param file_name: Название файла
+        :type file_name: str
+
+        :param block_size: Размер блока чтения в байтах
+        :type block_size: int
+
+        :return: Хэш содержимого
+        :rtype: str
+        """
+        content_hash = hashlib.blake2b(digest_size=16)
+        with open(file_name, 'rb') as file:
+            for block in iter(lambda: file.read(block_size), b''):
+                content_hash.update(block)
+        return content_hash.hexdigest()
+
+    def get_fingerprint(self) -> dict:
+        """
+        Отпечаток csv-файла: путь, размер, время изменения и хэш содержимого.
+        Хэш неизменившегося файла считается один раз на процесс (кэш вакансий и индекс по нему
+        проверяются по одному чтению файла).
+
+        :return: Отпечаток файла
+        :rtype: dict
+        """
+        stat = os.stat(self.file_name)
+        path = os.path.abspath(self.file_name)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        if key not in CONTENT_HASHES:
+            CONTENT_HASHES[key] = self.get_content_hash(self.file_name)
+        return {"version": CACHE_VERSION, "kind": self.kind, "path": path,
+                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": CONTENT_HASHES[key]}
+
+    def get_entry_dir(self, fingerprint: dict) -> str:
+        """
+        Папка записи кэша для данного отпечатка файла.
+
+        :param fingerprint: Отпечаток файла
+        :type fingerprint: dict
+
+        :return: Путь к папке записи
+        :rtype: str
+        """
+        key = hashlib.blake2b(json.dumps(fingerprint, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{self.kind}-{key}")
+
+    def load(self, fingerprint: dict = None) -> VacancyFrame or None:
+        """
+        Загружает данные из кэша, если запись для текущего содержимого файла существует.
+
+        :param fingerprint: Отпечаток файла (считается заново, если не передан)
+        :type fingerprint: dict
+
+        :return: Вакансии (или другой объект loader) из кэша или None
+        :rtype: VacancyFrame or None
+        """
+        entry_dir = self.get_entry_dir(fingerprint or self.get_fingerprint())
+        if not os.path.exists(os.path.join(entry_dir, "fingerprint.json")):
+            return None
+        return self.loader(entry_dir)
+
+    def save(self, frame: VacancyFrame, fingerprint: dict = None) -> None:
+        """
+        Сохраняет данные в кэш. Запись сначала пишется во временную папку и затем атомарно
+        переименовывается, поэтому параллельные читатели видят только полностью записанный кэш.
+        Устаревшие записи того же вида (ровно того же kind) удаляются.
+
+        :param frame: Вакансии (или другой объект с методом save)
+        :type frame: VacancyFrame
+
+        :param fingerprint: Отпечаток файла (считается заново, если не передан)
+        :type fingerprint: dict
+        """
+        fingerprint = fingerprint or self.get_fingerprint()
+        entry_dir = self.get_entry_dir(fingerprint)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        frame.save(temp_dir)
+        with open(os.path.join(temp_dir, "fingerprint.json"), "w", encoding='utf-8') as file:
+            json.dump(fingerprint, file, ensure_ascii=False)
+        try:
+            os.rename(temp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        for name in os.listdir(self.cache_dir):
+            if name.rsplit("-", 1)[0] == self.kind and os.path.join(self.cache_dir, name) != entry_dir:
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    def load_or_build(self, build: Callable[[], VacancyFrame]) -> VacancyFrame:
+        """
+        Загружает данные из кэша или строит их функцией build и сохраняет в кэш.
+
+        :param build: Функция разбора csv-файла
+        :type build: Callable
+
+        :return: Вакансии
+        :rtype: VacancyFrame
+        """
+        fingerprint = self.get_fingerprint()
+        frame = self.load(fingerprint)
+        if frame is None:
+            frame = build()
+            self.save(frame, fingerprint)
+        return frame
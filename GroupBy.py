@@ -0,0 +1,329 @@
+import functools
+import heapq
+import operator
+from typing import Callable, Iterable, List
+import numpy as np
+from TDigest import TDigest
+
+
+def get_accessor(field: str or Callable) -> Callable:
+    """
+    Функция получения значения поля: для строки - атрибут (можно через точку, например
+    "salary.salary_currency"), для функции - сама функция.
+
+    :param field: Название атрибута или функция от элемента
+    :type field: str or Callable
+
+    :return: Функция от элемента
+    :rtype: Callable
+
+    >>> get_accessor("real")(3 + 4j)
+    3.0
+    """
+    return field if callable(field) else operator.attrgetter(field)
+
+
+class GroupBy:
+    """
+    Группировка по хэшу ключа с накоплением итогов: для каждого ключа хранятся количество,
+    сумма, минимум и максимум значений, а не списки значений.
+
+    :param key: Функция получения ключа группы
+    :type key: Callable
+
+    :param value: Функция получения значения (None - считается только количество)
+    :type value: Callable or None
+
+    :param where: Условие учета элемента (None - учитываются все)
+    :type where: Callable or None
+
+    :param groups: Итоги по ключам: [количество, сумма, минимум, максимум]
+    :type groups: dict
+
+    :param sketches: Скетчи квантилей значений по ключам (только при quantiles=True)
+    :type sketches: dict
+
+    >>> group = GroupBy(len, float).add_all(["1", "22", "3", "44", "55"])
+    >>> group.count(), group.sum(), group.mean(), group.min(), group.max()
+    ({1: 2, 2: 3}, {1: 4.0, 2: 121.0}, {1: 2.0, 2: 40.333333333333336}, {1: 1.0, 2: 22.0}, {1: 3.0, 2: 55.0})
+    >>> group.top(1, "sum")
+    [(2, 121.0)]
+    >>> GroupBy(len, float, quantiles=True).add_all(["1", "22", "3", "44", "55"]).median()
+    {1: 2.0, 2: 44.0}
+    """
+    def __init__(self, key: str or Callable, value: str or Callable = None, where: Callable = None,
+                 quantiles: bool = False):
+        """
+        Инициализирует пустой объект GroupBy.
+
+        :param key: Поле или функция получения ключа группы (год, город, валюта, опыт, работодатель и т.д.)
+        :type key: str or Callable
+
+        :param value: Поле или функция получения значения (None - считается только количество)
+        :type value: str or Callable
+
+        :param where: Условие учета элемента
+        :type where: Callable
+
+        :param quantiles: Вести ли для каждого ключа скетч TDigest для медианы и перцентилей
+        :type quantiles: bool
+        """
+        self.key = get_accessor(key)
+        self.value = None if value is None else get_accessor(value)
+        self.where = where
+        self.groups = {}
+        self.sketches = {} if quantiles else None
+
+    def add(self, item) -> None:
+        """
+        Учитывает один элемент.
+
+        :param item: Элемент (вакансия, словарь и т.д.)
+        """
+        if self.where is not None and not self.where(item):
+            return
+        self.add_value(self.key(item), 0 if self.value is None else self.value(item))
+
+    def add_value(self, key, value=0) -> None:
+        """
+        Учитывает значение для уже вычисленного ключа (без key, value и where).
+
+        :param key: Ключ группы
+        :param value: Значение
+        """
+        if self.sketches is not None:
+            self.get_sketch(key).add(value)
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = [1, value, value, value]
+            return
+        group[0] += 1
+        group[1] += value
+        if value < group[2]:
+            group[2] = value
+        if value > group[3]:
+            group[3] = value
+
+    def add_values(self, key, values: list) -> None:
+        """
+        Учитывает сразу список значений одного ключа (например, накопленных в буфере): сумма
+        продолжается последовательно, как при добавлении значений по одному, а скетч сжимается один раз.
+
+        :param key: Ключ группы
+        :param values: Значения
+        :type values: list
+
+        >>> group = GroupBy(len, quantiles=True)
+        >>> group.add_values(1, [3.0, 1.0]); group.add_values(1, [2.0])
+        >>> group.groups, group.median()
+        ({1: [3, 6.0, 1.0, 3.0]}, {1: 2.0})
+        """
+        if len(values) == 0:
+            return
+        if self.sketches is not None:
+            self.get_sketch(key).add_many(values)
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = [len(values), functools.reduce(operator.add, values), min(values), max(values)]
+            return
+        group[0] += len(values)
+        group[1] = functools.reduce(operator.add, values, group[1])
+        group[2] = min(group[2], min(values))
+        group[3] = max(group[3], max(values))
+
+    def add_all(self, items: Iterable) -> 'GroupBy':
+        """
+        Учитывает все элементы из потока за один проход.
+
+        :param items: Поток элементов
+        :type items: Iterable
+
+        :return: Этот же объект GroupBy
+        :rtype: GroupBy
+        """
+        for item in items:
+            self.add(item)
+        return self
+
+    def add_codes(self, categories: list, codes: np.ndarray, values: np.ndarray = None,
+                  mask: np.ndarray = None) -> 'GroupBy':
+        """
+        Векторно учитывает столбец кодов групп (например, категориальный столбец VacancyFrame):
+        итоги по всем строкам считаются через np.bincount, затем добавляются к итогам ключей.
+        Условие where здесь не применяется - вместо него передается mask.
+
+        :param categories: Ключи групп по кодам
+        :type categories: list
+
+        :param codes: Коды групп по строкам
+        :type codes: np.ndarray
+
+        :param values: Значения по строкам (None - считается только количество)
+        :type values: np.ndarray
+
+        :param mask: Учитываемые строки (по умолчанию все)
+        :type mask: np.ndarray
+
+        :return: Этот же объект GroupBy
+        :rtype: GroupBy
+
+        >>> GroupBy("year").add_codes([2007, 2008], np.array([1, 0, 1]), np.array([1.0, 2.0, 3.0])).sum()
+        {2007: 2.0, 2008: 4.0}
+        """
+        if values is None:
+            values = np.zeros(len(codes))
+        if mask is not None:
+            codes, values = codes[mask], values[mask]
+        size = len(categories)
+        counts = np.bincount(codes, minlength=size)
+        sums = np.bincount(codes, weights=values, minlength=size)
+        mins = np.full(size, np.inf)
+        maxs = np.full(size, -np.inf)
+        np.minimum.at(mins, codes, values)
+        np.maximum.at(maxs, codes, values)
+        present = np.flatnonzero(counts).tolist()
+        for i in present:
+            self.merge_group(categories[i], [int(counts[i]), float(sums[i]), float(mins[i]), float(maxs[i])])
+        if self.sketches is not None:
+            order = np.argsort(codes, kind="stable")
+            groups = np.split(values[order], np.cumsum(counts)[:-1])
+            for i in present:
+                self.get_sketch(categories[i]).add_many(groups[i])
+        return self
+
+    def get_sketch(self, key) -> TDigest:
+        """
+        Скетч квантилей ключа (создается при первом обращении).
+
+        :param key: Ключ группы
+
+        :rtype: TDigest
+        """
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = TDigest()
+        return sketch
+
+    def merge_group(self, key, totals: list) -> None:
+        """
+        Добавляет итоги [количество, сумма, минимум, максимум] к итогам ключа.
+
+        :param key: Ключ группы
+        :param totals: Итоги группы
+        :type totals: list
+        """
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = list(totals)
+            return
+        group[0] += totals[0]
+        group[1] += totals[1]
+        group[2] = min(group[2], totals[2])
+        group[3] = max(group[3], totals[3])
+
+    def merge(self, other: 'GroupBy') -> 'GroupBy':
+        """
+        Добавляет итоги другой группировки (например, посчитанной в другом процессе).
+        Если у другой группировки есть скетчи квантилей, они переносятся и тогда, когда у этой их еще нет,
+        поэтому скетчи не теряются при любом порядке объединения.
+
+        :param other: Группировка по тому же ключу
+        :type other: GroupBy
+
+        :return: Этот же объект GroupBy
+        :rtype: GroupBy
+        """
+        for key, totals in other.groups.items():
+            self.merge_group(key, totals)
+        if other.sketches is not None:
+            if self.sketches is None:
+                self.sketches = {}
+            for key, sketch in other.sketches.items():
+                self.get_sketch(key).merge(sketch)
+        return self
+
+    def keys(self) -> list:
+        return list(self.groups)
+
+    def count(self) -> dict:
+        """
+        Количество элементов по ключам.
+
+        :rtype: dict
+        """
+        return {key: group[0] for key, group in self.groups.items()}
+
+    def sum(self) -> dict:
+        """
+        Сумма значений по ключам.
+
+        :rtype: dict
+        """
+        return {key: group[1] for key, group in self.groups.items()}
+
+    def mean(self) -> dict:
+        """
+        Среднее значение по ключам.
+
+        :rtype: dict
+        """
+        return {key: group[1] / group[0] for key, group in self.groups.items()}
+
+    def min(self) -> dict:
+        """
+        Минимальное значение по ключам.
+
+        :rtype: dict
+        """
+        return {key: group[2] for key, group in self.groups.items()}
+
+    def max(self) -> dict:
+        """
+        Максимальное значение по ключам.
+
+        :rtype: dict
+        """
+        return {key: group[3] for key, group in self.groups.items()}
+
+    def quantile(self, q: float) -> dict:
+        """
+        Оценка квантиля значений по ключам (нужен quantiles=True). Ключи без скетча
+        (пришедшие из объединенной группировки без квантилей) пропускаются.
+
+        :param q: Уровень квантиля от 0 до 1
+        :type q: float
+
+        :rtype: dict
+        """
+        if self.sketches is None:
+            raise ValueError("Квантили не собирались: нужен GroupBy(..., quantiles=True)")
+        return {key: self.sketches[key].quantile(q) for key in self.groups if key in self.sketches}
+
+    def median(self) -> dict:
+        """
+        Оценка медианы значений по ключам (нужен quantiles=True).
+
+        :rtype: dict
+        """
+        return self.quantile(0.5)
+
+    def top(self, k: int = 10, by: str = "count", reverse: bool = True) -> List[tuple]:
+        """
+        k ключей с наибольшими (reverse=False - наименьшими) итогами.
+
+        :param k: Количество ключей
+        :type k: int
+
+        :param by: Итог для упорядочивания: "count", "sum", "mean", "min" или "max"
+        :type by: str
+
+        :param reverse: Упорядочить по убыванию
+        :type reverse: bool
+
+        :return: Пары (ключ, итог)
+        :rtype: list
+        """
+        if by not in ("count", "sum", "mean", "min", "max"):
+            raise ValueError(f"Неизвестный итог {by}")
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(k, getattr(self, by)().items(), key=lambda item: item[1])
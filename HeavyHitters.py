@@ -0,0 +1,400 @@
+import copy
+import heapq
+import operator
+from typing import Callable, List
+import numpy as np
+from TDigest import TDigest
+
+
+class SpaceSaving:
+    """
+    Счетчик частых ключей Space-Saving фиксированного размера: хранится не больше capacity ключей.
+    Новый ключ при заполненном счетчике вытесняет ключ с наименьшим счетом и наследует этот счет как ошибку,
+    поэтому счет любого ключа завышен не больше чем на total / capacity, а каждый ключ, встретившийся
+    чаще total / capacity раз, гарантированно есть в счетчике. Счетчики разных частей потока объединяются
+    с той же оценкой ошибки. По желанию для хранимых ключей копятся сумма и скетч квантилей значений
+    (например, зарплат), учтенных с момента попадания ключа в счетчик, поэтому счетчик можно использовать
+    вместо GroupBy для полей с неограниченным количеством ключей (город, работодатель, название).
+
+    :param capacity: Наибольшее количество хранимых ключей
+    :type capacity: int
+
+    :param counts: Счет (оценка сверху частоты) по ключам
+    :type counts: dict
+
+    :param errors: Наибольшая ошибка счета по ключам
+    :type errors: dict
+
+    :param total: Сумма весов всех учтенных ключей
+    :type total: int
+
+    :param sums: Суммы учтенных значений по ключам (только при values=True)
+    :type sums: dict
+
+    :param sketches: Скетчи квантилей учтенных значений по ключам (только при quantiles=True)
+    :type sketches: dict
+
+    >>> counter = SpaceSaving(2)
+    >>> for key in "aabacaad": counter.add(key)
+    >>> counter.top(2), counter.errors, counter.get_bounds('d'), counter.get_guaranteed_top(1)
+    ([('a', 5), ('d', 3)], {'a': 0, 'd': 2}, (1, 3), ['a'])
+    >>> salaries = SpaceSaving(2, values=True)
+    >>> for area, salary in [("Москва", 10.0), ("Казань", 5.0), ("Москва", 20.0), ("Уфа", 7.0)]:
+    ...     salaries.add_value(area, salary)
+    >>> salaries.count(), salaries.mean(), salaries.sum()
+    ({'Москва': 2, 'Уфа': 2}, {'Москва': 15.0, 'Уфа': 7.0}, {'Москва': 30.0, 'Уфа': 14.0})
+    """
+    def __init__(self, capacity: int, values: bool = False, quantiles: bool = False):
+        """
+        Инициализирует пустой счетчик.
+
+        :param capacity: Наибольшее количество хранимых ключей
+        :type capacity: int
+
+        :param values: Копить ли суммы значений хранимых ключей
+        :type values: bool
+
+        :param quantiles: Вести ли для хранимых ключей скетчи TDigest для медианы и перцентилей
+        :type quantiles: bool
+        """
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.heap = []
+        self.total = 0
+        self.sums = {} if values else None
+        self.sketches = {} if quantiles else None
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state["heap"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self.heap)
+
+    def pop_min(self) -> int:
+        """
+        Вытесняет ключ с наименьшим счетом. В куче у каждого ключа одна запись, счет в которой
+        может отставать от текущего: такие записи обновляются по мере подъема к вершине.
+
+        :return: Счет вытесненного ключа
+        :rtype: int
+        """
+        heap, counts = self.heap, self.counts
+        while True:
+            count, key = heap[0]
+            current = counts[key]
+            if current == count:
+                heapq.heappop(heap)
+                del counts[key], self.errors[key]
+                if self.sums is not None:
+                    self.sums.pop(key, None)
+                if self.sketches is not None:
+                    self.sketches.pop(key, None)
+                return count
+            heapq.heapreplace(heap, (current, key))
+
+    def add(self, key, weight: int = 1) -> None:
+        """
+        Учитывает ключ с весом (количеством повторений).
+
+        :param key: Ключ
+        :param weight: Вес
+        :type weight: int
+        """
+        self.total += weight
+        count = self.counts.get(key)
+        if count is not None:
+            self.counts[key] = count + weight
+            return
+        error = self.pop_min() if len(self.counts) >= self.capacity else 0
+        self.counts[key] = error + weight
+        self.errors[key] = error
+        heapq.heappush(self.heap, (error + weight, key))
+
+    def add_value(self, key, value: float) -> None:
+        """
+        Учитывает ключ со значением (как GroupBy.add_value).
+
+        :param key: Ключ
+        :param value: Значение
+        :type value: float
+        """
+        self.add(key)
+        if self.sums is not None:
+            self.sums[key] = self.sums.get(key, 0) + value
+        if self.sketches is not None:
+            sketch = self.sketches.get(key)
+            if sketch is None:
+                sketch = self.sketches[key] = TDigest()
+            sketch.add(value)
+
+    def get_batch(self, key_to_count: dict) -> 'SpaceSaving':
+        """
+        Пустой счетчик пачки с теми же настройками, в котором оставлены capacity самых частых ключей пачки.
+        Частота любого отброшенного ключа не больше наименьшей из оставленных, поэтому при объединении
+        пачки со счетчиком оценка ошибки сохраняется.
+
+        :param key_to_count: Словарь ключ/частота
+        :type key_to_count: dict
+
+        :rtype: SpaceSaving
+        """
+        batch = SpaceSaving(self.capacity, self.sums is not None, self.sketches is not None)
+        batch.total = sum(key_to_count.values())
+        if len(key_to_count) > self.capacity:
+            key_to_count = dict(heapq.nlargest(self.capacity, key_to_count.items(), key=operator.itemgetter(1)))
+        batch.counts = dict(key_to_count)
+        batch.errors = dict.fromkeys(batch.counts, 0)
+        return batch
+
+    def add_counts(self, key_to_count: dict, key_to_sum: dict = None) -> 'SpaceSaving':
+        """
+        Учитывает накопленные частоты ключей (например, Counter по пачке строк) одним объединением.
+
+        :param key_to_count: Словарь ключ/частота
+        :type key_to_count: dict
+
+        :param key_to_sum: Словарь ключ/сумма значений (нужен при values=True)
+        :type key_to_sum: dict
+
+        :return: Этот же объект SpaceSaving
+        :rtype: SpaceSaving
+        """
+        batch = self.get_batch(key_to_count)
+        if batch.sums is not None:
+            batch.sums = {key: key_to_sum[key] for key in batch.counts}
+        return self.merge(batch)
+
+    def add_values(self, key_to_values: dict) -> 'SpaceSaving':
+        """
+        Учитывает накопленные списки значений по ключам (как PartialStats.add_buffered) одним объединением.
+
+        :param key_to_values: Словарь ключ/список значений
+        :type key_to_values: dict
+
+        :return: Этот же объект SpaceSaving
+        :rtype: SpaceSaving
+        """
+        batch = self.get_batch({key: len(values) for key, values in key_to_values.items() if len(values) != 0})
+        if batch.sums is not None:
+            batch.sums = {key: sum(key_to_values[key]) for key in batch.counts}
+        if batch.sketches is not None:
+            for key in batch.counts:
+                sketch = batch.sketches[key] = TDigest()
+                sketch.add_many(key_to_values[key])
+        return self.merge(batch)
+
+    def add_codes(self, categories: list, codes: np.ndarray, values: np.ndarray = None,
+                  mask: np.ndarray = None) -> 'SpaceSaving':
+        """
+        Учитывает столбец кодов ключей (например, категориальный столбец VacancyFrame), как GroupBy.add_codes.
+
+        :param categories: Ключи по кодам
+        :type categories: list
+
+        :param codes: Коды ключей по строкам
+        :type codes: np.ndarray
+
+        :param values: Значения по строкам (None - считается только количество)
+        :type values: np.ndarray
+
+        :param mask: Учитываемые строки (по умолчанию все)
+        :type mask: np.ndarray
+
+        :return: Этот же объект SpaceSaving
+        :rtype: SpaceSaving
+        """
+        if mask is not None:
+            codes = codes[mask]
+            values = None if values is None else values[mask]
+        counts = np.bincount(codes, minlength=len(categories))
+        present = np.flatnonzero(counts).tolist()
+        if values is None or (self.sums is None and self.sketches is None):
+            return self.add_counts({categories[i]: int(counts[i]) for i in present})
+        groups = np.split(values[np.argsort(codes, kind="stable")], np.cumsum(counts)[:-1])
+        return self.add_values({categories[i]: groups[i].tolist() for i in present})
+
+    def get_min_count(self) -> int:
+        """
+        Наименьший счет в заполненном счетчике (0, если место еще есть): оценка сверху
+        частоты любого ключа, которого нет в счетчике.
+
+        :rtype: int
+        """
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """
+        Добавляет счетчик другой части потока: счет и ошибка отсутствующего в одном из счетчиков ключа
+        оцениваются наименьшим счетом этого счетчика, затем остаются capacity ключей с наибольшим счетом
+        (в порядке первого появления, как в GroupBy).
+
+        :param other: Счетчик
+        :type other: SpaceSaving
+
+        :return: Этот же объект SpaceSaving
+        :rtype: SpaceSaving
+        """
+        own_min, other_min = self.get_min_count(), other.get_min_count()
+        merged = {key: (self.counts.get(key, own_min) + other.counts.get(key, other_min),
+                        self.errors.get(key, own_min) + other.errors.get(key, other_min))
+                  for key in {**self.counts, **other.counts}}
+        if len(merged) > self.capacity:
+            kept = {key for key, _ in heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1][0])}
+            merged = {key: value for key, value in merged.items() if key in kept}
+        self.counts = {key: count for key, (count, error) in merged.items()}
+        self.errors = {key: error for key, (count, error) in merged.items()}
+        self.heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self.heap)
+        self.total += other.total
+        if self.sums is not None:
+            other_sums = other.sums or {}
+            self.sums = {key: self.sums[key] + other_sums[key] if key in self.sums and key in other_sums
+                         else self.sums.get(key, other_sums.get(key, 0)) for key in self.counts}
+        if self.sketches is not None:
+            sketches = {}
+            for key in self.counts:
+                sketch, other_sketch = self.sketches.get(key), (other.sketches or {}).get(key)
+                if sketch is not None and other_sketch is not None:
+                    sketch.merge(other_sketch)
+                sketches[key] = sketch if sketch is not None else copy.deepcopy(other_sketch)
+            self.sketches = {key: sketch for key, sketch in sketches.items() if sketch is not None}
+        return self
+
+    def map_keys(self, function: Callable) -> 'SpaceSaving':
+        """
+        Копия счетчика с ключами, переведенными функцией (например, номера из другого словаря).
+
+        :param function: Функция перевода ключа
+        :type function: Callable
+
+        :rtype: SpaceSaving
+        """
+        counter = SpaceSaving(self.capacity, self.sums is not None, self.sketches is not None)
+        if self.sums is not None:
+            counter.sums = {function(key): total for key, total in self.sums.items()}
+        if self.sketches is not None:
+            counter.sketches = {function(key): sketch for key, sketch in self.sketches.items()}
+        counter.counts = {function(key): count for key, count in self.counts.items()}
+        counter.errors = {function(key): error for key, error in self.errors.items()}
+        counter.heap = [(count, key) for key, count in counter.counts.items()]
+        heapq.heapify(counter.heap)
+        counter.total = self.total
+        return counter
+
+    def top(self, count: int) -> List[tuple]:
+        """
+        Ключи с наибольшим счетом.
+
+        :param count: Количество ключей
+        :type count: int
+
+        :return: Пары ключ/счет по убыванию счета
+        :rtype: list
+        """
+        return heapq.nlargest(count, self.counts.items(), key=operator.itemgetter(1))
+
+    def keys(self) -> list:
+        return list(self.counts)
+
+    def count(self) -> dict:
+        """
+        Счет (оценка сверху количества) по ключам.
+
+        :rtype: dict
+        """
+        return dict(self.counts)
+
+    def mean(self) -> dict:
+        """
+        Среднее значений, учтенных с момента попадания ключа в счетчик (их количество - счет минус ошибка).
+
+        :rtype: dict
+        """
+        return {key: total / (self.counts[key] - self.errors[key]) for key, total in self.sums.items()}
+
+    def sum(self) -> dict:
+        """
+        Оценка суммы значений по ключам: среднее учтенных значений, умноженное на счет.
+        Для ключей, которые не вытеснялись (ошибка 0), совпадает с точной суммой.
+
+        :rtype: dict
+        """
+        return {key: total if self.errors[key] == 0
+                else total / (self.counts[key] - self.errors[key]) * self.counts[key]
+                for key, total in self.sums.items()}
+
+    def get_bounds(self, key) -> tuple:
+        """
+        Гарантированные границы частоты ключа.
+
+        :param key: Ключ
+
+        :return: Нижняя и верхняя границы
+        :rtype: tuple
+        """
+        if key in self.counts:
+            return self.counts[key] - self.errors[key], self.counts[key]
+        return 0, self.get_min_count()
+
+    def get_error_bound(self) -> float:
+        """
+        Наибольшее завышение счета любого ключа: total / capacity.
+
+        :rtype: float
+        """
+        return self.total / self.capacity
+
+    def get_guaranteed_top(self, count: int) -> list:
+        """
+        Ключи из top(count), которые гарантированно входят в count самых частых: нижняя граница
+        их частоты не меньше верхней границы частоты любого ключа вне top(count).
+
+        :param count: Количество ключей
+        :type count: int
+
+        :rtype: list
+        """
+        ranked = self.top(count + 1)
+        threshold = ranked[count][1] if len(ranked) > count else self.get_min_count()
+        return [key for key, frequency in ranked[:count] if frequency - self.errors[key] >= threshold]
+
+
+def print_heavy_hitters(counter: SpaceSaving, title: str, count: int = 10) -> tuple:
+    """
+    Выводит в консоль самые частые ключи счетчика с количеством вакансий, гарантированной ошибкой счета
+    и уровнем зарплат. Общий вывод частых работодателей и названий для всех отчетов.
+
+    :param counter: Счетчик частых ключей с суммами зарплат
+    :type counter: SpaceSaving
+
+    :param title: Что считается (например, 'Работодатели')
+    :type title: str
+
+    :param count: Количество ключей
+    :type count: int
+
+    :return: Словари ключ/количество вакансий (оценка сверху) и ключ/уровень зарплат
+    :rtype: tuple
+
+    >>> counter = SpaceSaving(2, values=True)
+    >>> for key, salary in [("a", 10.0), ("a", 20.0), ("b", 30.0)]: counter.add_value(key, salary)
+    >>> print_heavy_hitters(counter, 'Работодатели', 1)
+    Работодатели с наибольшим количеством вакансий (ошибка счета не больше 1): {'a': 2}
+    Работодатели - уровень зарплат: {'a': 15}
+    ({'a': 2}, {'a': 15})
+    """
+    key_to_count = dict(counter.top(count))
+    key_to_mean = counter.mean()
+    key_to_salary = {key: int(key_to_mean[key]) for key in key_to_count}
+    print(f'{title} с наибольшим количеством вакансий (ошибка счета не больше {int(counter.get_error_bound())}): '
+          f'{key_to_count}')
+    print(f'{title} - уровень зарплат: {key_to_salary}')
+    return key_to_count, key_to_salary
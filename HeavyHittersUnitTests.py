@@ -0,0 +1,51 @@
+from unittest import TestCase
+from collections import Counter
+import random
+from HeavyHitters import *
+
+class HeavyHittersUnitTests(TestCase):
+    def setUp(self):
+        generator = random.Random(1)
+        self.keys = [int(generator.paretovariate(1.2)) for _ in range(20000)]
+        self.exact = Counter(self.keys)
+
+    def check_bounds(self, counter: SpaceSaving):
+        self.assertLessEqual(len(counter), counter.capacity)
+        for key, count in counter.counts.items():
+            self.assertGreaterEqual(count, self.exact[key])
+            self.assertLessEqual(count - counter.errors[key], self.exact[key])
+            self.assertLessEqual(count - self.exact[key], counter.total / counter.capacity)
+        for key, count in self.exact.items():
+            if count > counter.total / counter.capacity:
+                self.assertIn(key, counter.counts)
+
+    def test_space_saving_bounds(self):
+        counter = SpaceSaving(20)
+        for key in self.keys:
+            counter.add(key)
+        self.check_bounds(counter)
+        self.assertEqual([key for key, count in counter.top(3)], [key for key, count in self.exact.most_common(3)])
+
+    def test_space_saving_add_counts_and_merge(self):
+        parts = [SpaceSaving(20) for _ in range(4)]
+        for start in range(0, len(self.keys), 1000):
+            parts[start // 1000 % 4].add_counts(Counter(self.keys[start:start + 1000]))
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+        self.assertEqual(merged.total, len(self.keys))
+        self.check_bounds(merged)
+
+    def test_space_saving_map_keys(self):
+        counter = SpaceSaving(2)
+        counter.add_counts({'a': 3, 'b': 1, 'c': 2})
+        self.assertEqual(counter.map_keys(str.upper).top(2), [('A', 3), ('C', 2)])
+
+    def test_space_saving_values_and_guaranteed_top(self):
+        counter = SpaceSaving(20, values=True)
+        for key in self.keys:
+            counter.add_value(key, float(key))
+        top = counter.get_guaranteed_top(3)
+        self.assertEqual(top, [key for key, count in self.exact.most_common(len(top))])
+        for key in top:
+            self.assertEqual(counter.mean()[key], float(key))
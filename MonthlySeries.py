@@ -0,0 +1,251 @@
+from typing import Iterable
+import numpy as np
+from GroupBy import GroupBy
+
+START_YEAR = 2000
+YEARS = 32
+
+
+class MonthlySeries:
+    """
+    Помесячный ряд зарплат: количество вакансий и сумма зарплат хранятся в массивах по месяцам,
+    номер ячейки - смещение месяца от января start_year. Если месяц вне диапазона, ряд расширяется
+    на недостающие годы. Ряды объединяются сложением массивов (диапазоны выравниваются), поэтому их можно
+    считать по частям в разных процессах. Скользящие окна (3, 12 месяцев) считаются за один проход:
+    к сумме окна прибавляется вошедший месяц и вычитается вышедший.
+
+    :param start_year: Первый год ряда
+    :type start_year: int
+
+    :param counts: Количество вакансий по месяцам
+    :type counts: np.ndarray
+
+    :param sums: Сумма зарплат по месяцам
+    :type sums: np.ndarray
+
+    >>> series = MonthlySeries(2007, 2)
+    >>> series.add(2007, 11, 10.0); series.add(2007, 12, 20.0); series.add(2008, 2, 60.0)
+    >>> series.rolling(1)
+    ({'2007-11': 10, '2007-12': 20, '2008-01': 0, '2008-02': 60}, {'2007-11': 1.0, '2007-12': 1.0, '2008-01': 0.0, '2008-02': 1.0})
+    >>> series.rolling(3)[0]
+    {'2007-11': 10, '2007-12': 15, '2008-01': 15, '2008-02': 40}
+    """
+    def __init__(self, start_year: int = START_YEAR, years: int = YEARS):
+        """
+        Инициализирует пустой ряд на years лет начиная с января start_year (начальный размер, ряд растет сам).
+
+        :param start_year: Первый год ряда
+        :type start_year: int
+
+        :param years: Количество лет в ряду
+        :type years: int
+        """
+        self.start_year = start_year
+        self.counts = np.zeros(years * 12, dtype=np.int64)
+        self.sums = np.zeros(years * 12, dtype=np.float64)
+
+    def get_last_year(self) -> int:
+        """
+        Последний год диапазона ряда.
+
+        :rtype: int
+        """
+        return self.start_year + len(self.counts) // 12 - 1
+
+    def include_years(self, first_year: int, last_year: int) -> None:
+        """
+        Расширяет диапазон ряда так, чтобы в него входили годы от first_year до last_year.
+
+        :param first_year: Первый год
+        :type first_year: int
+
+        :param last_year: Последний год
+        :type last_year: int
+
+        >>> series = MonthlySeries(2007, 1)
+        >>> series.include_years(2005, 2008); series.start_year, series.get_last_year()
+        (2005, 2008)
+        """
+        first_year, last_year = min(first_year, self.start_year), max(last_year, self.get_last_year())
+        if first_year == self.start_year and last_year == self.get_last_year():
+            return
+        before = (self.start_year - first_year) * 12
+        counts = np.zeros((last_year - first_year + 1) * 12, dtype=np.int64)
+        sums = np.zeros(len(counts), dtype=np.float64)
+        counts[before:before + len(self.counts)] = self.counts
+        sums[before:before + len(self.sums)] = self.sums
+        self.start_year, self.counts, self.sums = first_year, counts, sums
+
+    def get_offsets(self, years, months) -> np.ndarray:
+        """
+        Номера ячеек месяцев; если годы вне диапазона, ряд расширяется.
+
+        :param years: Годы
+        :type years: np.ndarray or int
+
+        :param months: Месяцы (1-12)
+        :type months: np.ndarray or int
+
+        :rtype: np.ndarray
+
+        >>> MonthlySeries(2007, 2).get_offsets(np.array([2007, 2008]), np.array([1, 12])).tolist()
+        [0, 23]
+        >>> MonthlySeries(2007, 1).get_offsets(np.array([2006]), np.array([12])).tolist()
+        [11]
+        """
+        years, months = np.asarray(years, dtype=np.int64), np.asarray(months, dtype=np.int64)
+        if months.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        if months.min() < 1 or months.max() > 12:
+            raise ValueError("Номер месяца должен быть от 1 до 12")
+        self.include_years(int(years.min()), int(years.max()))
+        return (years - self.start_year) * 12 + months - 1
+
+    def add(self, year: int, month: int, value: float) -> None:
+        """
+        Учитывает одну зарплату.
+
+        :param year: Год публикации
+        :type year: int
+
+        :param month: Месяц публикации (1-12)
+        :type month: int
+
+        :param value: Зарплата
+        :type value: float
+        """
+        offset = (year - self.start_year) * 12 + month - 1
+        if not (0 <= offset < len(self.counts) and 1 <= month <= 12):
+            offset = int(self.get_offsets(year, month))
+        self.counts[offset] += 1
+        self.sums[offset] += value
+
+    def add_many(self, years: np.ndarray, months: np.ndarray, values: np.ndarray,
+                 mask: np.ndarray = None) -> 'MonthlySeries':
+        """
+        Векторно учитывает столбцы годов, месяцев и зарплат (например, из VacancyFrame).
+
+        :param years: Годы публикации
+        :type years: np.ndarray
+
+        :param months: Месяцы публикации (1-12)
+        :type months: np.ndarray
+
+        :param values: Зарплаты
+        :type values: np.ndarray
+
+        :param mask: Булева маска учитываемых строк (None - все строки)
+        :type mask: np.ndarray
+
+        :return: Этот же объект MonthlySeries
+        :rtype: MonthlySeries
+        """
+        if mask is not None:
+            years, months, values = years[mask], months[mask], values[mask]
+        offsets = self.get_offsets(years, months)
+        self.counts += np.bincount(offsets, minlength=len(self.counts))
+        self.sums += np.bincount(offsets, weights=values, minlength=len(self.sums))
+        return self
+
+    def add_group_by(self, group: GroupBy) -> 'MonthlySeries':
+        """
+        Учитывает итоги GroupBy с ключами (год, месяц), например свертку куба зарплат
+        или таблицу month частичной статистики.
+
+        :param group: Итоги по месяцам
+        :type group: GroupBy
+
+        :return: Этот же объект MonthlySeries
+        :rtype: MonthlySeries
+        """
+        if group.groups:
+            keys = np.array(list(group.groups), dtype=np.int64).reshape(-1, 2)
+            offsets = self.get_offsets(keys[:, 0], keys[:, 1])
+            totals = list(zip(*group.groups.values()))
+            np.add.at(self.counts, offsets, totals[0])
+            np.add.at(self.sums, offsets, totals[1])
+        return self
+
+    def merge(self, other: 'MonthlySeries') -> 'MonthlySeries':
+        """
+        Добавляет к ряду другой ряд (диапазон этого ряда расширяется до диапазона другого).
+
+        :param other: Ряд
+        :type other: MonthlySeries
+
+        :return: Этот же объект MonthlySeries
+        :rtype: MonthlySeries
+        """
+        self.include_years(other.start_year, other.get_last_year())
+        offset = (other.start_year - self.start_year) * 12
+        self.counts[offset:offset + len(other.counts)] += other.counts
+        self.sums[offset:offset + len(other.sums)] += other.sums
+        return self
+
+    @staticmethod
+    def merge_all(series: Iterable['MonthlySeries']) -> 'MonthlySeries':
+        """
+        Объединяет ряды по порядку в новый ряд, исходные ряды не изменяются.
+
+        :param series: Ряды
+        :type series: Iterable[MonthlySeries]
+
+        :rtype: MonthlySeries
+        """
+        merged = MonthlySeries()
+        for item in series:
+            merged.merge(item)
+        return merged
+
+    def get_label(self, offset: int) -> str:
+        """
+        Месяц ячейки в виде 'ГГГГ-ММ' (как published_at[:7]).
+
+        :param offset: Номер ячейки
+        :type offset: int
+
+        :rtype: str
+
+        >>> MonthlySeries(2007).get_label(13)
+        '2008-02'
+        """
+        return f"{self.start_year + offset // 12}-{offset % 12 + 1:02d}"
+
+    def get_bounds(self) -> tuple:
+        """
+        Первая и последняя ячейки с вакансиями (None, если ряд пуст).
+
+        :rtype: tuple
+        """
+        filled = np.flatnonzero(self.counts)
+        return (int(filled[0]), int(filled[-1])) if len(filled) else None
+
+    def rolling(self, window: int) -> tuple:
+        """
+        Скользящие средняя зарплата и среднее количество вакансий в месяц за window месяцев
+        по всем месяцам от первого до последнего с вакансиями. Итоги окна обновляются по одному месяцу:
+        прибавляется вошедший месяц и вычитается вышедший. В начале ряда окно неполное.
+
+        :param window: Ширина окна в месяцах (1 - помесячная статистика)
+        :type window: int
+
+        :return: Словари месяц/средняя зарплата и месяц/среднее количество вакансий в месяц
+        :rtype: tuple
+        """
+        bounds = self.get_bounds()
+        if bounds is None:
+            return {}, {}
+        first, last = bounds
+        counts, sums = self.counts[first:last + 1].tolist(), self.sums[first:last + 1].tolist()
+        month_to_salary, month_to_count = {}, {}
+        window_count, window_sum = 0, 0.0
+        for i in range(len(counts)):
+            window_count += counts[i]
+            window_sum += sums[i]
+            if i >= window:
+                window_count -= counts[i - window]
+                window_sum -= sums[i - window]
+            label = self.get_label(first + i)
+            month_to_salary[label] = int(window_sum / window_count) if window_count != 0 else 0
+            month_to_count[label] = round(window_count / min(i + 1, window), 1)
+        return month_to_salary, month_to_count
@@ -0,0 +1,46 @@
+from unittest import TestCase
+from MonthlySeries import *
+
+class MonthlySeriesUnitTests(TestCase):
+    def test_rolling_equals_window_sums(self):
+        rng = np.random.default_rng(1)
+        series = MonthlySeries(2003, 20).add_many(rng.integers(2003, 2023, 5000), rng.integers(1, 13, 5000),
+                                                   rng.integers(10000, 200000, 5000).astype(float))
+        first, last = series.get_bounds()
+        for window in (1, 3, 12):
+            salaries, counts = series.rolling(window)
+            for i, label in enumerate(salaries):
+                start = max(first, first + i - window + 1)
+                count = series.counts[start:first + i + 1].sum()
+                self.assertEqual(salaries[label], int(series.sums[start:first + i + 1].sum() / count))
+                self.assertEqual(counts[label], round(count / min(i + 1, window), 1))
+
+    def test_add_many_equals_add(self):
+        one, many = MonthlySeries(), MonthlySeries()
+        for year, month, value in [(2007, 12, 10.0), (2008, 1, 20.0), (2007, 12, 30.0)]:
+            one.add(year, month, value)
+        many.add_many(np.array([2007, 2008, 2007, 2009]), np.array([12, 1, 12, 5]), np.array([10.0, 20.0, 30.0, 5.0]),
+                      np.array([True, True, True, False]))
+        self.assertEqual(one.rolling(1), many.rolling(1))
+        self.assertEqual(one.rolling(1)[0], {'2007-12': 20, '2008-01': 20})
+
+    def test_merge_parts_equals_whole(self):
+        whole, first, second = MonthlySeries(), MonthlySeries(), MonthlySeries()
+        whole.add(2010, 3, 100.0); whole.add(2011, 4, 50.0)
+        first.add(2010, 3, 100.0); second.add(2011, 4, 50.0)
+        merged = MonthlySeries.merge_all([first, second])
+        self.assertEqual(merged.rolling(12), whole.rolling(12))
+
+    def test_series_grows_to_any_year(self):
+        series = MonthlySeries(2007, 1)
+        series.add(2008, 1, 10.0)
+        series.add_many(np.array([1995]), np.array([6]), np.array([30.0]))
+        other = MonthlySeries(2040, 1)
+        other.add(2040, 2, 50.0)
+        merged = MonthlySeries.merge_all([series, other])
+        self.assertEqual((merged.start_year, merged.get_last_year()), (1995, 2040))
+        self.assertEqual(merged.get_label(merged.get_bounds()[0]), '1995-06')
+        self.assertEqual(merged.rolling(1)[0]['2040-02'], 50)
+        self.assertEqual((series.start_year, series.counts.sum()), (1995, 2))
+        with self.assertRaises(ValueError):
+            series.add(2008, 13, 10.0)
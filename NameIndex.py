@@ -0,0 +1,253 @@
+import json
+import os
+import time
+from typing import Callable, List
+import numpy as np
+from DatasetCache import DatasetCache
+from VacancyFrame import VacancyFrame
+
+
+def get_trigrams(text: str) -> set:
+    """
+    Множество триграмм (подстрок длины 3) строки.
+
+    :param text: Строка
+    :type text: str
+
+    :return: Триграммы
+    :rtype: set
+
+    >>> sorted(get_trigrams("Java"))
+    ['Jav', 'ava']
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Инвертированный индекс триграмм по названиям вакансий. Индексируются уникальные названия:
+    для каждой триграммы хранится отсортированный список номеров названий, для каждого названия -
+    номера строк набора данных с этим названием. Поиск подстроки пересекает списки триграмм запроса
+    (начиная с самого короткого) и проверяет оставшихся кандидатов обычным вхождением подстроки,
+    поэтому результат совпадает с фильтром "query in name".
+
+    :param names: Уникальные названия
+    :type names: list
+
+    :param grams: Триграммы
+    :type grams: list
+
+    :param offsets: Границы списков названий каждой триграммы в postings
+    :type offsets: np.ndarray
+
+    :param postings: Номера названий для всех триграмм подряд
+    :type postings: np.ndarray
+
+    :param row_offsets: Границы строк каждого названия в rows
+    :type row_offsets: np.ndarray
+
+    :param rows: Номера строк, упорядоченные по названию
+    :type rows: np.ndarray
+
+    >>> index = TrigramIndex.build(['Java-программист', 'Аналитик', 'Программист Java'], np.array([0, 1, 2, 0]))
+    >>> index.find_rows('Java').tolist(), index.find_rows('Python').tolist(), index.mask('ал').tolist()
+    ([0, 2, 3], [], [False, True, False, False])
+    """
+    def __init__(self, names: List[str], grams: List[str], offsets: np.ndarray, postings: np.ndarray,
+                 row_offsets: np.ndarray, rows: np.ndarray):
+        """
+        Инициализирует объект TrigramIndex из готовых массивов.
+
+        :param names: Уникальные названия
+        :type names: list
+
+        :param grams: Триграммы
+        :type grams: list
+
+        :param offsets: Границы списков названий каждой триграммы в postings
+        :type offsets: np.ndarray
+
+        :param postings: Номера названий для всех триграмм подряд
+        :type postings: np.ndarray
+
+        :param row_offsets: Границы строк каждого названия в rows
+        :type row_offsets: np.ndarray
+
+        :param rows: Номера строк, упорядоченные по названию
+        :type rows: np.ndarray
+        """
+        self.names = names
+        self.grams = grams
+        self.gram_ids = {gram: i for i, gram in enumerate(grams)}
+        self.offsets = offsets
+        self.postings = postings
+        self.row_offsets = row_offsets
+        self.rows = rows
+
+    @staticmethod
+    def build(names: List[str], codes: np.ndarray) -> 'TrigramIndex':
+        """
+        Строит индекс по уникальным названиям и кодам названий по строкам.
+
+        :param names: Уникальные названия
+        :type names: list
+
+        :param codes: Номера названий по строкам
+        :type codes: np.ndarray
+
+        :return: Индекс
+        :rtype: TrigramIndex
+        """
+        name_lists = {}
+        for name_id, name in enumerate(names):
+            for gram in get_trigrams(name):
+                name_lists.setdefault(gram, []).append(name_id)
+        grams = sorted(name_lists)
+        offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum([len(name_lists[gram]) for gram in grams], out=offsets[1:])
+        postings = np.fromiter((name_id for gram in grams for name_id in name_lists[gram]), dtype=np.int32,
+                               count=int(offsets[-1]))
+        codes = np.asarray(codes)
+        row_offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(names)), out=row_offsets[1:])
+        return TrigramIndex(list(names), grams, offsets, postings, row_offsets, np.argsort(codes, kind='stable'))
+
+    @staticmethod
+    def from_frame(frame: VacancyFrame, field: str = 'name') -> 'TrigramIndex':
+        """
+        Строит индекс по категориальному столбцу VacancyFrame.
+
+        :param frame: Вакансии в столбцовом виде
+        :type frame: VacancyFrame
+
+        :param field: Название поля
+        :type field: str
+
+        :return: Индекс
+        :rtype: TrigramIndex
+        """
+        column = frame.categorical[field]
+        return TrigramIndex.build(column.categories, column.codes)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def find_names(self, query: str) -> np.ndarray:
+        """
+        Номера уникальных названий, содержащих query.
+
+        :param query: Подстрока (например, название профессии)
+        :type query: str
+
+        :return: Номера названий по возрастанию
+        :rtype: np.ndarray
+        """
+        if len(query) < 3:
+            candidates = range(len(self.names))
+        else:
+            name_lists = []
+            for gram in get_trigrams(query):
+                gram_id = self.gram_ids.get(gram)
+                if gram_id is None:
+                    return np.zeros(0, dtype=np.int64)
+                name_lists.append(self.postings[self.offsets[gram_id]:self.offsets[gram_id + 1]])
+            name_lists.sort(key=len)
+            candidates = name_lists[0]
+            for name_list in name_lists[1:]:
+                candidates = np.intersect1d(candidates, name_list, assume_unique=True)
+            candidates = candidates.tolist()
+        return np.array([name_id for name_id in candidates if query in self.names[name_id]], dtype=np.int64)
+
+    def find_rows(self, query: str) -> np.ndarray:
+        """
+        Номера строк, название в которых содержит query.
+
+        :param query: Подстрока
+        :type query: str
+
+        :return: Номера строк по возрастанию
+        :rtype: np.ndarray
+        """
+        name_ids = self.find_names(query).tolist()
+        if not name_ids:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate([self.rows[self.row_offsets[i]:self.row_offsets[i + 1]] for i in name_ids]))
+
+    def mask(self, query: str) -> np.ndarray:
+        """
+        Булева маска строк, название в которых содержит query.
+
+        :param query: Подстрока
+        :type query: str
+
+        :return: Булева маска
+        :rtype: np.ndarray
+        """
+        mask = np.zeros(len(self.rows), dtype=bool)
+        mask[self.find_rows(query)] = True
+        return mask
+
+    def save(self, directory: str) -> None:
+        """
+        Сохраняет индекс в папку: массивы - в .npy, названия и триграммы - в index.json.
+
+        :param directory: Папка
+        :type directory: str
+        """
+        for name in ('offsets', 'postings', 'row_offsets', 'rows'):
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(directory, 'index.json'), 'w', encoding='utf-8') as file:
+            json.dump({'names': self.names, 'grams': self.grams}, file, ensure_ascii=False)
+
+    @staticmethod
+    def load(directory: str, mmap_mode: str = 'r') -> 'TrigramIndex':
+        """
+        Загружает индекс из папки. Массивы по умолчанию отображаются в память.
+
+        :param directory: Папка
+        :type directory: str
+
+        :param mmap_mode: Режим отображения в память для np.load (None - прочитать целиком)
+        :type mmap_mode: str
+
+        :return: Индекс
+        :rtype: TrigramIndex
+        """
+        with open(os.path.join(directory, 'index.json'), encoding='utf-8') as file:
+            data = json.load(file)
+        arrays = [np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in ('offsets', 'postings', 'row_offsets', 'rows')]
+        return TrigramIndex(data['names'], data['grams'], *arrays)
+
+
+def get_name_index(file_name: str, build_frame: Callable[[], VacancyFrame], kind: str) -> TrigramIndex:
+    """
+    Загружает индекс названий из кэша рядом с csv-файлом или строит его и сохраняет в кэш.
+    Номера строк индекса совпадают с номерами строк VacancyFrame того же вида очистки kind.
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param build_frame: Функция получения VacancyFrame (вызывается, только если индекса нет в кэше)
+    :type build_frame: Callable
+
+    :param kind: Вид очистки данных VacancyFrame (clean, raw)
+    :type kind: str
+
+    :return: Индекс названий
+    :rtype: TrigramIndex
+    """
+    return DatasetCache(file_name, f"names-{kind}", TrigramIndex.load).load_or_build(
+        lambda: TrigramIndex.from_frame(build_frame()))
+
+
+if __name__ == '__main__':
+    from ReportPDFInMultiprocess import DataSet
+    file_name = input("Введите название файла: ")
+    index = get_name_index(file_name, lambda: DataSet.read_frame(file_name), "raw")
+    query = input("Введите название профессии: ")
+    while query:
+        start = time.perf_counter()
+        rows = index.find_rows(query)
+        print(f"{len(rows)} вакансий, {(time.perf_counter() - start) * 1000:.2f} мс")
+        query = input("Введите название профессии: ")
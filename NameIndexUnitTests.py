@@ -0,0 +1,24 @@
+import tempfile
+from unittest import TestCase
+from NameIndex import *
+
+class NameIndexUnitTests(TestCase):
+    names = ['Java-программист', 'Аналитик', 'Программист Java', 'Системный аналитик']
+    codes = np.array([0, 1, 2, 3, 0, 1])
+
+    def test_find_rows_same_as_substring_check(self):
+        index = TrigramIndex.build(self.names, self.codes)
+        for query in ['', 'a', 'ал', 'Java', 'аналитик', 'рограммист', 'Python', 'Java-п']:
+            self.assertEqual(index.find_rows(query).tolist(),
+                             [row for row, code in enumerate(self.codes) if query in self.names[code]])
+
+    def test_trigrams_of_short_text(self):
+        self.assertEqual(get_trigrams("ab"), set())
+
+    def test_save_and_load(self):
+        index = TrigramIndex.build(self.names, self.codes)
+        with tempfile.TemporaryDirectory() as directory:
+            index.save(directory)
+            loaded = TrigramIndex.load(directory)
+            self.assertEqual(loaded.mask('Java').tolist(), index.mask('Java').tolist())
+            del loaded
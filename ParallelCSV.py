@@ -0,0 +1,623 @@
+import csv
+import io
+import itertools
+import os
+import queue
+import time
+import traceback
+import multiprocessing as mp
+import concurrent.futures
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, Iterator, List
+
+BACKENDS = ("serial", "thread", "process", "shared")
+PIPELINE_POLL_TIMEOUT = 1.0
+
+
+def find_record_starts(file_name: str, targets: List[int], block_size: int = 1 << 22) -> List[int]:
+    """
+    Для каждого смещения из targets находит начало первой записи csv-файла после него.
+    Перевод строки считается концом записи, только если перед ним четное число кавычек,
+    поэтому переводы строк внутри полей в кавычках (например, description) границей не считаются.
+    Файл просматривается блоками, кавычки считаются средствами bytes.count без разбора csv.
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param targets: Смещения в байтах по возрастанию
+    :type targets: list
+
+    :param block_size: Размер блока чтения в байтах
+    :type block_size: int
+
+    :return: Смещения начала записей (для смещений за последней записью - конец файла)
+    :rtype: list
+    """
+    result = []
+    targets = iter(targets)
+    target = next(targets, None)
+    position, quotes = 0, 0
+    with open(file_name, 'rb') as file:
+        while target is not None:
+            block = file.read(block_size)
+            if not block:
+                break
+            counted, block_quotes = 0, quotes
+            while target is not None and target < position + len(block):
+                start = max(target - position, counted)
+                block_quotes += block.count(b'"', counted, start)
+                counted = start
+                newline = block.find(b'\n', counted)
+                while newline != -1:
+                    block_quotes += block.count(b'"', counted, newline)
+                    counted = newline
+                    if block_quotes % 2 == 0:
+                        break
+                    newline = block.find(b'\n', newline + 1)
+                if newline == -1:
+                    target = position + len(block)
+                    break
+                counted = newline + 1
+                result.append(position + counted)
+                target = next(targets, None)
+            quotes += block.count(b'"')
+            position += len(block)
+    size = os.path.getsize(file_name)
+    while target is not None:
+        result.append(size)
+        target = next(targets, None)
+    return result
+
+
+def split_csv_ranges(file_name: str, chunks: int) -> tuple:
+    """
+    Делит csv-файл на диапазоны байт примерно одинакового размера, выровненные по границам записей.
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param chunks: Желаемое количество диапазонов
+    :type chunks: int
+
+    :return: Заголовки файла и список диапазонов (начало, конец)
+    :rtype: tuple
+    """
+    header_end = find_record_starts(file_name, [0])[0]
+    with open(file_name, 'rb') as file:
+        headers = next(csv.reader(io.StringIO(file.read(header_end).decode('utf-8-sig'), newline='')), [])
+    size = os.path.getsize(file_name)
+    step = (size - header_end) / max(chunks, 1)
+    starts = [header_end] + find_record_starts(file_name, [int(header_end + step * k) for k in range(1, chunks)])
+    ranges = [(start, end) for start, end in zip(starts, starts[1:] + [size]) if start < end]
+    return headers, ranges
+
+
+def read_range_rows(file_name: str, start: int, end: int) -> Iterator[list]:
+    """
+    Читает строки csv-файла из диапазона байт, найденного split_csv_ranges.
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param start: Начало диапазона
+    :type start: int
+
+    :param end: Конец диапазона
+    :type end: int
+
+    :return: Строки csv-файла
+    :rtype: Iterator[list]
+    """
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+
+
+def read_shared_range_rows(shm_name: str, start: int, end: int) -> Iterator[list]:
+    """
+    Читает строки csv-файла из диапазона байт блока общей памяти, в который файл загружен целиком.
+
+    :param shm_name: Название блока общей памяти
+    :type shm_name: str
+
+    :param start: Начало диапазона
+    :type start: int
+
+    :param end: Конец диапазона
+    :type end: int
+
+    :return: Строки csv-файла
+    :rtype: Iterator[list]
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        data = bytes(shm.buf[start:end])
+    finally:
+        shm.close()
+    return csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+
+
+def run_range_task(task: tuple):
+    """
+    Разбирает один диапазон байт и агрегирует его строки. Выполняется в обработчике любого вида.
+
+    :param task: Источник (файл или блок общей памяти), признак общей памяти, начало и конец диапазона,
+        заголовки, функция агрегации и ее дополнительный аргумент
+    :type task: tuple
+
+    :return: Частичный результат функции агрегации
+    """
+    source, shared, start, end, headers, aggregate, context = task
+    rows = read_shared_range_rows(source, start, end) if shared else read_range_rows(source, start, end)
+    return aggregate(None, headers, rows, context)
+
+
+def map_ranges(file_name: str, aggregate: Callable, context=None, backend: str = "process",
+               workers: int = None, chunks_per_worker: int = 4, initializer: Callable = None,
+               initargs: tuple = ()) -> tuple:
+    """
+    Делит csv-файл на диапазоны байт и агрегирует их выбранным способом:
+    serial - в текущем процессе, thread - в пуле потоков, process - в пуле процессов,
+    shared - в пуле процессов, которые читают файл из общей памяти вместо диска.
+    Частичные результаты возвращаются в порядке диапазонов, поэтому при одинаковом
+    количестве обработчиков все способы дают одинаковый результат.
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param aggregate: Функция агрегации (см. pipeline_worker), должна быть определена на уровне модуля
+    :type aggregate: Callable
+
+    :param context: Дополнительный аргумент aggregate
+
+    :param backend: Способ выполнения: serial, thread, process или shared
+    :type backend: str
+
+    :param workers: Количество обработчиков (по умолчанию - количество ядер)
+    :type workers: int
+
+    :param chunks_per_worker: Количество диапазонов на одного обработчика
+    :type chunks_per_worker: int
+
+    :param initializer: Функция, которая один раз выполняется в каждом процессе-обработчике
+        (например, загрузка справочника); для serial и thread - один раз в текущем процессе
+    :type initializer: Callable
+
+    :param initargs: Аргументы initializer
+    :type initargs: tuple
+
+    :return: Заголовки файла и частичные результаты по диапазонам
+    :rtype: tuple
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный способ выполнения: {backend}")
+    workers = workers or os.cpu_count()
+    headers, ranges = split_csv_ranges(file_name, workers * chunks_per_worker)
+    if initializer is not None and backend in ("serial", "thread"):
+        initializer(*initargs)
+    if backend == "serial":
+        return headers, [run_range_task((file_name, False, start, end, headers, aggregate, context))
+                         for start, end in ranges]
+    if backend == "thread":
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return headers, list(executor.map(run_range_task, [(file_name, False, start, end, headers, aggregate,
+                                                                context) for start, end in ranges]))
+    if backend == "process":
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                                    initargs=initargs) as executor:
+            return headers, list(executor.map(run_range_task, [(file_name, False, start, end, headers, aggregate,
+                                                                context) for start, end in ranges]))
+    size = os.path.getsize(file_name)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        with open(file_name, 'rb') as file:
+            file.readinto(shm.buf[:size])
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                                    initargs=initargs) as executor:
+            return headers, list(executor.map(run_range_task, [(shm.name, True, start, end, headers, aggregate,
+                                                                context) for start, end in ranges]))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def benchmark_backends(file_name: str, aggregate: Callable, context=None, workers: int = None,
+                       backends: Iterable[str] = BACKENDS) -> dict:
+    """
+    Замеряет время агрегации файла каждым способом выполнения и выводит его.
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param aggregate: Функция агрегации
+    :type aggregate: Callable
+
+    :param context: Дополнительный аргумент aggregate
+
+    :param workers: Количество обработчиков
+    :type workers: int
+
+    :param backends: Проверяемые способы выполнения
+    :type backends: Iterable[str]
+
+    :return: Словарь способ/(время в секундах, частичные результаты)
+    :rtype: dict
+    """
+    result = {}
+    for backend in backends:
+        start = time.perf_counter()
+        partials = map_ranges(file_name, aggregate, context, backend, workers)[1]
+        result[backend] = (time.perf_counter() - start, partials)
+        print(f"{backend}: {result[backend][0]:.2f} с")
+    return result
+
+
+def iter_row_batches(rows: Iterable[list], batch_size: int, row_filter: Callable = None) -> Iterator[list]:
+    """
+    Собирает строки csv-файла в пачки по batch_size строк.
+
+    :param rows: Строки csv-файла
+    :type rows: Iterable[list]
+
+    :param batch_size: Количество строк в пачке
+    :type batch_size: int
+
+    :param row_filter: Условие, которому должна удовлетворять строка (по умолчанию - все строки)
+    :type row_filter: Callable
+
+    :return: Пачки строк
+    :rtype: Iterator[list]
+
+    >>> list(iter_row_batches([[1], [2], [3]], 2))
+    [[[1], [2]], [[3]]]
+    """
+    rows = iter(rows) if row_filter is None else filter(row_filter, rows)
+    batch = list(itertools.islice(rows, batch_size))
+    while len(batch) != 0:
+        yield batch
+        batch = list(itertools.islice(rows, batch_size))
+
+
+class YearFileWriter:
+    """
+    Необязательный вывод конвейера: раскладывает строки по файлам file_<год>.csv по мере чтения.
+
+    :param directory: Папка для файлов
+    :type directory: str
+
+    :param year_index: Номер столбца published_at
+    :type year_index: int
+
+    :param files: Открытые файлы по годам
+    :type files: dict
+    """
+    def __init__(self, directory: str, year_index: int, prefix: str = "file_"):
+        """
+        Инициализирует объект YearFileWriter.
+
+        :param directory: Папка для файлов
+        :type directory: str
+
+        :param year_index: Номер столбца published_at
+        :type year_index: int
+
+        :param prefix: Начало названия файлов
+        :type prefix: str
+        """
+        self.directory = directory
+        self.year_index = year_index
+        self.prefix = prefix
+        self.files = {}
+        self.writers = {}
+
+    def write(self, batch: List[list]) -> None:
+        """
+        Дописывает пачку строк в файлы соответствующих годов.
+
+        :param batch: Пачка строк
+        :type batch: list
+        """
+        for line in batch:
+            year = line[self.year_index][:4]
+            if year not in self.writers:
+                self.files[year] = open(os.path.join(self.directory, f"{self.prefix}{year}.csv"), "w",
+                                        encoding='utf-8-sig', newline='')
+                self.writers[year] = csv.writer(self.files[year])
+            self.writers[year].writerow(line)
+
+    def close(self) -> None:
+        """
+        Закрывает все файлы.
+        """
+        for file in self.files.values():
+            file.close()
+
+
+def pipeline_worker(batches: mp.Queue, results: mp.Queue, headers: list, aggregate: Callable, context,
+                    initializer: Callable = None, initargs: tuple = ()) -> None:
+    """
+    Обработчик конвейера: забирает пачки строк из очереди, пока не получит None,
+    копит по ним частичный результат и отправляет его вместе со временем работы.
+    Если агрегация упала, вместо результата отправляется текст ошибки и обработчик завершается с кодом 1.
+
+    :param batches: Очередь пачек строк
+    :type batches: mp.Queue
+
+    :param results: Очередь результатов
+    :type results: mp.Queue
+
+    :param headers: Заголовки csv-файла
+    :type headers: list
+
+    :param aggregate: Функция aggregate(частичный результат или None, заголовки, пачка, context) -> частичный результат
+    :type aggregate: Callable
+
+    :param context: Дополнительный аргумент aggregate (например, название профессии)
+
+    :param initializer: Функция, которая выполняется в обработчике перед началом работы
+    :type initializer: Callable
+
+    :param initargs: Аргументы initializer
+    :type initargs: tuple
+    """
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+        partial, busy_time = None, 0.0
+        batch = batches.get()
+        while batch is not None:
+            start = time.perf_counter()
+            partial = aggregate(partial, headers, batch, context)
+            busy_time += time.perf_counter() - start
+            batch = batches.get()
+    except Exception:
+        results.put((None, traceback.format_exc()))
+        results.close()
+        results.join_thread()
+        os._exit(1)
+    results.put((partial, busy_time))
+
+
+def check_workers(procs: List[mp.Process], results: mp.Queue) -> None:
+    """
+    Проверяет, что ни один обработчик конвейера не завершился с ошибкой или аварийно (например, по нехватке
+    памяти). Иначе выбрасывает RuntimeError с текстом ошибки, если обработчик успел его отправить.
+
+    :param procs: Процессы обработчиков
+    :type procs: list
+
+    :param results: Очередь результатов
+    :type results: mp.Queue
+    """
+    failed = [proc.exitcode for proc in procs if proc.exitcode not in (None, 0)]
+    if failed:
+        message = f"Обработчик конвейера завершился с кодом {failed[0]}"
+        while not results.empty():
+            partial, busy_time = results.get()
+            if isinstance(busy_time, str):
+                message = f"Ошибка в обработчике конвейера:\n{busy_time}"
+                break
+        raise RuntimeError(message)
+
+
+def stop_workers(procs: List[mp.Process]) -> None:
+    """
+    Останавливает обработчики конвейера, которые еще работают.
+
+    :param procs: Процессы обработчиков
+    :type procs: list
+    """
+    for proc in procs:
+        if proc.is_alive():
+            proc.terminate()
+        proc.join()
+
+
+def put_batch(batches: mp.Queue, batch, procs: List[mp.Process], results: mp.Queue) -> None:
+    """
+    Кладет пачку в очередь конвейера, пока ждет место - проверяет, живы ли обработчики.
+
+    :param batches: Очередь пачек строк
+    :type batches: mp.Queue
+
+    :param batch: Пачка строк или None (конец потока)
+
+    :param procs: Процессы обработчиков
+    :type procs: list
+
+    :param results: Очередь результатов
+    :type results: mp.Queue
+    """
+    while True:
+        try:
+            batches.put(batch, timeout=PIPELINE_POLL_TIMEOUT)
+            return
+        except queue.Full:
+            check_workers(procs, results)
+
+
+def get_result(results: mp.Queue, procs: List[mp.Process]) -> tuple:
+    """
+    Забирает результат одного обработчика конвейера. Ошибка обработчика выбрасывается в RuntimeError,
+    аварийное завершение обработчика обнаруживается по коду выхода.
+
+    :param results: Очередь результатов
+    :type results: mp.Queue
+
+    :param procs: Процессы обработчиков
+    :type procs: list
+
+    :return: Частичный результат и время работы обработчика
+    :rtype: tuple
+    """
+    while True:
+        try:
+            partial, busy_time = results.get(timeout=PIPELINE_POLL_TIMEOUT)
+            break
+        except queue.Empty:
+            check_workers(procs, results)
+            if all(proc.exitcode is not None for proc in procs) and results.empty():
+                raise RuntimeError("Обработчики конвейера завершились, не отправив результат")
+    if isinstance(busy_time, str):
+        raise RuntimeError(f"Ошибка в обработчике конвейера:\n{busy_time}")
+    return partial, busy_time
+
+
+def run_pipeline(file_name: str, aggregate: Callable, context=None, workers: int = None, batch_size: int = 5000,
+                 queue_size: int = None, row_filter: Callable = None, writer: YearFileWriter = None,
+                 initializer: Callable = None, initargs: tuple = ()) -> tuple:
+    """
+    Конвейер "чтение - агрегация" без промежуточных файлов: процесс-читатель разбирает csv-файл
+    и кладет пачки строк в ограниченную очередь, обработчики агрегируют их, пока чтение еще идет.
+    Очереди опрашиваются с таймаутом, поэтому ошибка или аварийное завершение обработчика
+    выбрасывается в RuntimeError, а не подвешивает чтение.
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param aggregate: Функция агрегации пачки (см. pipeline_worker), должна быть определена на уровне модуля
+    :type aggregate: Callable
+
+    :param context: Дополнительный аргумент aggregate
+
+    :param workers: Количество обработчиков (по умолчанию - количество ядер)
+    :type workers: int
+
+    :param batch_size: Количество строк в пачке
+    :type batch_size: int
+
+    :param queue_size: Наибольшее количество пачек в очереди (по умолчанию - два на обработчика)
+    :type queue_size: int
+
+    :param row_filter: Условие, которому должна удовлетворять строка
+    :type row_filter: Callable
+
+    :param writer: Необязательный вывод строк по файлам годов
+    :type writer: YearFileWriter
+
+    :param initializer: Функция, которая один раз выполняется в каждом обработчике
+    :type initializer: Callable
+
+    :param initargs: Аргументы initializer
+    :type initargs: tuple
+
+    :return: Заголовки, частичные результаты обработчиков и сводка по времени
+    :rtype: tuple
+    """
+    workers = workers or os.cpu_count()
+    batches = mp.Queue(queue_size or workers * 2)
+    results = mp.Queue()
+    start = time.perf_counter()
+    wait_time = 0.0
+    procs = []
+    try:
+        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            headers = next(reader, [])
+            procs = [mp.Process(target=pipeline_worker,
+                                args=(batches, results, headers, aggregate, context, initializer, initargs))
+                     for _ in range(workers)]
+            for proc in procs:
+                proc.start()
+            for batch in iter_row_batches(reader, batch_size, row_filter):
+                if writer is not None:
+                    writer.write(batch)
+                put_start = time.perf_counter()
+                put_batch(batches, batch, procs, results)
+                wait_time += time.perf_counter() - put_start
+        read_time = time.perf_counter() - start - wait_time
+        for _ in procs:
+            put_batch(batches, None, procs, results)
+        worker_results = [get_result(results, procs) for _ in procs]
+    except BaseException:
+        batches.cancel_join_thread()
+        stop_workers(procs)
+        if writer is not None:
+            writer.close()
+        raise
+    for proc in procs:
+        proc.join()
+    if writer is not None:
+        writer.close()
+    summary = {"read_time": read_time, "aggregate_time": sum(busy for _, busy in worker_results),
+               "wall_time": time.perf_counter() - start}
+    summary["overlap_time"] = max(0.0, summary["read_time"] + summary["aggregate_time"] - summary["wall_time"])
+    return headers, [partial for partial, _ in worker_results if partial is not None], summary
+
+
+def collect_partials(file_name: str, aggregate: Callable, context=None, backend=None, pipeline: bool = False,
+                     workers: int = None, row_filter: Callable = None, save_dir: str = None) -> tuple:
+    """
+    Общий путь выполнения отчетов: агрегирует csv-файл конвейером (pipeline=True) или по диапазонам байт
+    выбранным способом (backend). Если заданы оба, используется конвейер; backend True/False понимается
+    как прежний флаг parallel (True - process).
+
+    :param file_name: Название csv-файла
+    :type file_name: str
+
+    :param aggregate: Функция агрегации пачки (см. pipeline_worker), должна быть определена на уровне модуля
+    :type aggregate: Callable
+
+    :param context: Дополнительный аргумент aggregate
+
+    :param backend: Способ выполнения для диапазонов байт: serial, thread, process или shared
+    :type backend: str or bool
+
+    :param pipeline: Агрегировать строки конвейером по мере чтения
+    :type pipeline: bool
+
+    :param workers: Количество обработчиков (по умолчанию - количество ядер)
+    :type workers: int
+
+    :param row_filter: Условие для строк конвейера (при разборе по диапазонам строки фильтрует aggregate)
+    :type row_filter: Callable
+
+    :param save_dir: Папка, куда конвейер дополнительно раскладывает строки по файлам годов (None - не сохранять)
+    :type save_dir: str
+
+    :return: Заголовки файла и частичные результаты
+    :rtype: tuple
+    """
+    if pipeline:
+        writer = None
+        if save_dir is not None:
+            with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+                writer = YearFileWriter(save_dir, next(csv.reader(csv_file)).index("published_at"))
+        headers, partials, summary = run_pipeline(file_name, aggregate, context, workers=workers,
+                                                  row_filter=row_filter, writer=writer)
+        print_pipeline_summary(summary)
+        return headers, partials
+    return map_ranges(file_name, aggregate, context, get_backend(backend), workers)
+
+
+def get_backend(backend) -> str or None:
+    """
+    Способ выполнения по значению параметра backend отчетов: True и False - прежний флаг parallel.
+
+    :param backend: Способ выполнения, True, False или None
+    :type backend: str or bool
+
+    :return: Способ выполнения или None (разбор по диапазонам не нужен)
+    :rtype: str or None
+
+    >>> get_backend(True), get_backend(False), get_backend("thread")
+    ('process', None, 'thread')
+    """
+    if backend is True:
+        return "process"
+    if backend is False:
+        return None
+    return backend
+
+
+def print_pipeline_summary(summary: dict) -> None:
+    """
+    Выводит сводку работы конвейера: сколько заняли чтение и агрегация и насколько они перекрылись.
+
+    :param summary: Сводка, которую вернул run_pipeline
+    :type summary: dict
+    """
+    print(f"Чтение: {summary['read_time']:.2f} с, агрегация: {summary['aggregate_time']:.2f} с "
+          f"(сумма по обработчикам), всего: {summary['wall_time']:.2f} с, "
+          f"перекрытие: {summary['overlap_time']:.2f} с")
@@ -0,0 +1,170 @@
+import copy
+import os
+import pickle
+from typing import Iterable
+import numpy as np
+from GroupBy import GroupBy
+from HeavyHitters import SpaceSaving
+
+
+class PartialStats:
+    """
+    Частичная статистика обработчика: именованные таблицы GroupBy (по годам, городам, профессиям и годам и т.д.),
+    в которых для каждого ключа хранятся количество, сумма, минимум, максимум и, по желанию, скетч квантилей.
+    Объединение ассоциативно, поэтому части файла можно обрабатывать в любом порядке любым количеством
+    обработчиков, сохранять и объединять позже. При сериализации итоги таблиц хранятся столбцами numpy,
+    а скетчи - сжатыми. Для полей с неограниченным количеством ключей вместо таблицы можно вести
+    счетчик частых ключей SpaceSaving фиксированного размера.
+
+    :param tables: Таблицы по названиям
+    :type tables: dict
+
+    :param counters: Счетчики частых ключей по названиям
+    :type counters: dict
+
+    >>> first, second = PartialStats(), PartialStats()
+    >>> first.table("year").add_value(2007, 10.0)
+    >>> second.table("year").add_values(2007, [30.0]); second.table("year").add_value(2008, 5.0)
+    >>> merged = PartialStats.merge_all([first, second])
+    >>> merged.table("year").mean(), pickle.loads(pickle.dumps(merged)).table("year").groups
+    ({2007: 20.0, 2008: 5.0}, {2007: [2, 40.0, 10.0, 30.0], 2008: [1, 5.0, 5.0, 5.0]})
+    """
+    def __init__(self):
+        """
+        Инициализирует пустой объект PartialStats.
+        """
+        self.tables = {}
+        self.counters = {}
+
+    def __getstate__(self) -> dict:
+        tables = {}
+        for name, table in self.tables.items():
+            columns = [np.array(column) for column in zip(*table.groups.values())] or [np.zeros(0)] * 4
+            tables[name] = (list(table.groups), columns, table.sketches)
+        return {"tables": tables, "counters": self.counters}
+
+    def __setstate__(self, state: dict) -> None:
+        self.tables = {}
+        for name, (keys, columns, sketches) in state["tables"].items():
+            table = self.table(name)
+            table.groups = dict(zip(keys, map(list, zip(*(column.tolist() for column in columns)))))
+            table.sketches = sketches
+        self.counters = state.get("counters", {})
+
+    def table(self, name: str, quantiles: bool = False) -> GroupBy:
+        """
+        Таблица итогов по названию (создается при первом обращении). Значения добавляются в нее
+        методами GroupBy add_value, add_values и add_codes.
+
+        :param name: Название таблицы (обычно поле группировки)
+        :type name: str
+
+        :param quantiles: Вести ли в новой таблице скетчи квантилей
+        :type quantiles: bool
+
+        :rtype: GroupBy
+        """
+        table = self.tables.get(name)
+        if table is None:
+            table = self.tables[name] = GroupBy(name, quantiles=quantiles)
+        return table
+
+    def counter(self, name: str, capacity: int, values: bool = True, quantiles: bool = False) -> SpaceSaving:
+        """
+        Счетчик частых ключей по названию (создается при первом обращении).
+
+        :param name: Название счетчика (обычно поле)
+        :type name: str
+
+        :param capacity: Размер нового счетчика
+        :type capacity: int
+
+        :param values: Копить ли в новом счетчике суммы значений
+        :type values: bool
+
+        :param quantiles: Вести ли в новом счетчике скетчи квантилей
+        :type quantiles: bool
+
+        :rtype: SpaceSaving
+        """
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters[name] = SpaceSaving(capacity, values, quantiles)
+        return counter
+
+    def add_buffered(self, buffers: dict) -> None:
+        """
+        Добавляет накопленные списки значений: название таблицы/(ключ/список значений).
+        Если с таким названием ведется счетчик частых ключей, значения добавляются в него.
+
+        :param buffers: Списки значений по таблицам и ключам
+        :type buffers: dict
+        """
+        for name, key_to_values in buffers.items():
+            if name in self.counters:
+                self.counters[name].add_values(key_to_values)
+                continue
+            table = self.table(name)
+            for key, values in key_to_values.items():
+                table.add_values(key, values)
+
+    def merge(self, other: 'PartialStats') -> 'PartialStats':
+        """
+        Добавляет к статистике другую частичную статистику. Другая статистика не изменяется:
+        таблицы и счетчики, которых здесь нет, копируются.
+
+        :param other: Частичная статистика
+        :type other: PartialStats
+
+        :return: Этот же объект PartialStats
+        :rtype: PartialStats
+        """
+        for name, table in other.tables.items():
+            if name in self.tables:
+                self.tables[name].merge(table)
+            else:
+                self.tables[name] = copy.deepcopy(table)
+        for name, counter in other.counters.items():
+            if name in self.counters:
+                self.counters[name].merge(counter)
+            else:
+                self.counters[name] = copy.deepcopy(counter)
+        return self
+
+    @staticmethod
+    def merge_all(partials: Iterable['PartialStats']) -> 'PartialStats':
+        """
+        Объединяет частичные статистики по порядку в новую статистику, исходные не изменяются.
+
+        :param partials: Частичные статистики
+        :type partials: Iterable[PartialStats]
+
+        :rtype: PartialStats
+        """
+        merged = PartialStats()
+        for partial in partials:
+            merged.merge(partial)
+        return merged
+
+    def save(self, directory: str) -> None:
+        """
+        Сохраняет статистику в папку (файл stats.pickle).
+
+        :param directory: Папка
+        :type directory: str
+        """
+        with open(os.path.join(directory, "stats.pickle"), "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(directory: str) -> 'PartialStats':
+        """
+        Загружает статистику из папки.
+
+        :param directory: Папка
+        :type directory: str
+
+        :rtype: PartialStats
+        """
+        with open(os.path.join(directory, "stats.pickle"), "rb") as file:
+            return pickle.load(file)
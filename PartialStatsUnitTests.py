@@ -0,0 +1,83 @@
+import tempfile
+from unittest import TestCase
+from PartialStats import *
+
+def make_stats(values: list) -> PartialStats:
+    stats = PartialStats()
+    for year, area, salary in values:
+        stats.table("year", quantiles=True).add_value(year, salary)
+        stats.table("area_name").add_value(area, salary)
+    return stats
+
+class PartialStatsUnitTests(TestCase):
+    values = [(2007, 'Москва', 10.0), (2008, 'Москва', 20.5), (2007, 'Казань', 30.0), (2008, 'Казань', 1.5)]
+
+    def test_merge_same_as_one_pass(self):
+        merged = PartialStats.merge_all([make_stats(self.values[:1]), make_stats(self.values[1:3]),
+                                         make_stats(self.values[3:])])
+        whole = make_stats(self.values)
+        for name in ("year", "area_name"):
+            self.assertEqual(merged.table(name).groups, whole.table(name).groups)
+        self.assertEqual(merged.table("year").median(), whole.table("year").median())
+
+    def test_merge_order_does_not_change_totals(self):
+        first = PartialStats.merge_all([make_stats([value]) for value in self.values])
+        second = PartialStats.merge_all([make_stats([value]) for value in reversed(self.values)])
+        self.assertEqual(first.table("year").count(), second.table("year").count())
+        self.assertEqual(first.table("area_name").sum(), second.table("area_name").sum())
+
+    def test_merge_keeps_sketches_and_inputs(self):
+        plain, sketched = PartialStats(), make_stats(self.values)
+        plain.table("year").add_value(2009, 5.0)
+        for parts in ([plain, sketched], [sketched, plain]):
+            merged = PartialStats.merge_all(parts)
+            self.assertEqual(merged.table("year").median(), sketched.table("year").median())
+        self.assertEqual(plain.table("year").count(), {2009: 1})
+        self.assertIsNone(plain.table("year").sketches)
+        self.assertEqual(sketched.table("year").count(), make_stats(self.values).table("year").count())
+
+    def test_merge_empty(self):
+        self.assertEqual(PartialStats.merge_all([]).tables, {})
+
+    def test_save_and_load(self):
+        stats = make_stats(self.values)
+        with tempfile.TemporaryDirectory() as directory:
+            stats.save(directory)
+            loaded = PartialStats.load(directory)
+        self.assertEqual(loaded.table("area_name").groups, stats.table("area_name").groups)
+        self.assertEqual(loaded.table("year").quantile(0.9), stats.table("year").quantile(0.9))
+        self.assertIsNone(loaded.table("area_name").sketches)
+
+    def test_merge_counters_same_as_table(self):
+        parts = []
+        for value in self.values:
+            stats = PartialStats()
+            stats.counter("area_name", 10, quantiles=True).add_value(value[1], value[2])
+            parts.append(stats)
+        merged = PartialStats.merge_all(parts).counters["area_name"]
+        whole = make_stats(self.values).table("area_name")
+        self.assertEqual(merged.count(), whole.count())
+        self.assertEqual(merged.sum(), whole.sum())
+        self.assertEqual(list(merged.keys()), list(whole.keys()))
+
+    def test_merge_counters_with_eviction_keeps_bounds(self):
+        values = [(2007, area, float(salary)) for salary, area in
+                  enumerate(['Москва'] * 12 + ['Казань', 'Омск', 'Томск', 'Пермь', 'Уфа', 'Сочи'] * 2 + ['Москва'] * 4)]
+        parts = []
+        for start in range(0, len(values), 7):
+            stats = PartialStats()
+            for value in values[start:start + 7]:
+                stats.counter("area_name", 3).add_value(value[1], value[2])
+            parts.append(stats)
+        merged = PartialStats.merge_all(parts).counters["area_name"]
+        whole = make_stats(values).table("area_name")
+        self.assertLess(merged.capacity, len(whole.keys()))
+        self.assertEqual(merged.total, len(values))
+        for area, count in whole.count().items():
+            lower, upper = merged.get_bounds(area)
+            self.assertLessEqual(lower, count)
+            self.assertLessEqual(count, upper)
+            self.assertLessEqual(upper - count, merged.get_error_bound())
+        self.assertEqual(merged.top(1)[0][0], 'Москва')
+        salaries = [salary for _, area, salary in values if area == 'Москва']
+        self.assertTrue(min(salaries) <= merged.mean()['Москва'] <= max(salaries))
@@ -1,4 +1,5 @@
 import pandas as pd
+import CurrencyRates
 
 class ProcessSalaries:
     def __init__(self, file_name: str) -> None:
@@ -44,16 +45,41 @@ class ProcessSalaries:
 
         return salary
 
-    def process_salaries(self) -> None:
+    def get_salaries(self, df: pd.DataFrame) -> tuple:
+        """
+        Векторно генерирует зарплаты для всех рядов по тем же правилам, что и get_salary:
+        курс берется соединением с таблицей курсов (месяц, валюта, курс), валюта не из списка
+        доступных не переводится, пустой курс дает NaN
+
+        :param df: Вакансии
+        :type df: DataFrame
+
+        :return: Зарплаты и маска рядов, для которых get_salary не вернул бы 'nan'
+        :rtype: tuple
+        """
+        salaries = CurrencyRates.get_salary_sums(df)
+        keep = salaries.notna() & df['salary_currency'].notna()
+        rates = CurrencyRates.join_rates(df, CurrencyRates.melt_rate_frame(self.currencies))
+        converted = (df['salary_currency'] != 'RUR') & df['salary_currency'].isin(self.available_currencies)
+        return salaries.where(~converted, salaries * rates), keep
+
+    def process_salaries(self, vectorized: bool = False) -> None:
         """
         Обрабатывает зарплаты, переводя в рубли в соответствии с нужным курсом. Удаляет строки,
         в которых невозможно посчитать зарплату. Сохраняет в формате CSV.
+
+        :param vectorized: Переводить все зарплаты сразу (get_salaries) вместо apply по рядам
+        :type vectorized: bool
         """
         df = pd.read_csv(self.file_name)
-        df['salary'] = df[['salary_from', 'salary_to', 'salary_currency', 'published_at']].apply(self.get_salary, axis=1)
-        df.drop(labels=['salary_to', 'salary_from', 'salary_currency'], axis=1, inplace=True)
-        df = df.loc[df['salary'] != 'nan']
+        if vectorized:
+            salaries, keep = self.get_salaries(df)
+            df = df.loc[keep].assign(salary=salaries[keep])
+        else:
+            df['salary'] = df[['salary_from', 'salary_to', 'salary_currency', 'published_at']].apply(self.get_salary, axis=1)
+            df = df.loc[df['salary'] != 'nan']
+        df = df.drop(labels=['salary_to', 'salary_from', 'salary_currency'], axis=1)
         df.head(100).to_csv('currency_conversion_pandas.csv', index=False)
 
 
-ProcessSalaries('vacancies_dif_currencies.csv').process_salaries()
+ProcessSalaries('vacancies_dif_currencies.csv').process_salaries(vectorized=True)
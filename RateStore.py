@@ -0,0 +1,133 @@
+import sqlite3
+from typing import List
+import pandas as pd
+
+
+class RateStore:
+    """
+    Постоянное хранилище курсов валют в SQLite с ключом (date, currency), где date - месяц "YYYY-MM".
+    Курсы прошлых месяцев не меняются, поэтому загружать из API ЦБ нужно только отсутствующие месяцы.
+    Пустой курс (валюты не было в ответе ЦБ) хранится как NULL и считается уже загруженным.
+
+    :param db_name: Имя файла БД
+    :type db_name: str
+
+    :param con: Соединение с БД
+    :type con: sqlite3.Connection
+    """
+    def __init__(self, db_name: str = "rates_store.sqlite"):
+        """
+        Открывает хранилище и создает таблицу курсов, если ее еще нет.
+
+        :param db_name: Имя файла БД
+        :type db_name: str
+        """
+        self.db_name = db_name
+        self.con = sqlite3.connect(db_name)
+        self.con.execute("CREATE TABLE IF NOT EXISTS rates (date TEXT, currency TEXT, rate, PRIMARY KEY (date, currency))")
+        self.con.commit()
+
+    def __enter__(self) -> 'RateStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с БД.
+        """
+        self.con.close()
+
+    def get_missing_months(self, months: List[str], currencies: List[str]) -> List[str]:
+        """
+        Отбирает месяцы, для которых в хранилище нет курса хотя бы одной из валют.
+
+        :param months: Месяцы "YYYY-MM"
+        :type months: list
+
+        :param currencies: Валюты
+        :type currencies: list
+
+        :return: Отсутствующие месяцы в исходном порядке
+        :rtype: list
+
+        >>> store = RateStore(":memory:")
+        >>> store.save_rows([["2003-01", 1, 31.78]], ["RUR", "USD"])
+        >>> store.get_missing_months(["2003-01", "2003-02"], ["RUR", "USD"]), store.get_missing_months(["2003-01"], ["EUR"])
+        (['2003-02'], ['2003-01'])
+        """
+        stored = {}
+        for date, count in self.con.execute(
+                f"SELECT date, COUNT(*) FROM rates WHERE currency IN ({', '.join('?' * len(currencies))}) GROUP BY date",
+                currencies):
+            stored[date] = count
+        return [month for month in months if stored.get(month, 0) < len(set(currencies))]
+
+    def save_rows(self, rows: List[list], currencies: List[str]) -> None:
+        """
+        Добавляет или заменяет курсы из строк вида [месяц, курс первой валюты, курс второй валюты, ...].
+
+        :param rows: Строки курсов
+        :type rows: list
+
+        :param currencies: Валюты в порядке столбцов строк
+        :type currencies: list
+        """
+        self.con.executemany("INSERT OR REPLACE INTO rates (date, currency, rate) VALUES (?, ?, ?)",
+                             [(row[0], currency, rate) for row in rows for currency, rate in zip(currencies, row[1:])])
+        self.con.commit()
+
+    def get_rows(self, currencies: List[str], months: List[str] = None) -> List[list]:
+        """
+        Строки курсов вида [месяц, курс первой валюты, ...] по возрастанию месяца.
+        Месяцы, для которых в хранилище нет ни одной из валют, пропускаются.
+
+        :param currencies: Валюты
+        :type currencies: list
+
+        :param months: Месяцы "YYYY-MM" (по умолчанию - все месяцы хранилища)
+        :type months: list
+
+        :return: Строки курсов
+        :rtype: list
+
+        >>> store = RateStore(":memory:")
+        >>> store.save_rows([["2003-02", 1, None], ["2003-01", 1, 31.78]], ["RUR", "USD"])
+        >>> store.get_rows(["USD", "RUR"])
+        [['2003-01', 31.78, 1], ['2003-02', None, 1]]
+        """
+        rows = {}
+        for date, currency, rate in self.con.execute(
+                f"SELECT date, currency, rate FROM rates WHERE currency IN ({', '.join('?' * len(currencies))})",
+                currencies):
+            rows.setdefault(date, {})[currency] = rate
+        dates = sorted(rows) if months is None else [month for month in months if month in rows]
+        return [[date] + [rows[date].get(currency) for currency in currencies] for date in dates]
+
+    def get_currencies(self) -> List[str]:
+        """
+        Валюты, которые есть в хранилище, в порядке первого появления.
+
+        :return: Список валют
+        :rtype: list
+        """
+        return [currency for currency, in
+                self.con.execute("SELECT currency FROM rates GROUP BY currency ORDER BY MIN(rowid)")]
+
+    def get_frame(self, currencies: List[str] = None, months: List[str] = None) -> pd.DataFrame:
+        """
+        Таблица курсов date/валюты в том же виде, что и dataframe.csv.
+
+        :param currencies: Валюты (по умолчанию - все валюты хранилища)
+        :type currencies: list
+
+        :param months: Месяцы "YYYY-MM" (по умолчанию - все месяцы хранилища)
+        :type months: list
+
+        :return: Таблица курсов
+        :rtype: pd.DataFrame
+        """
+        currencies = currencies or self.get_currencies()
+        frame = pd.DataFrame(self.get_rows(currencies, months), columns=['date'] + currencies)
+        return frame.astype({currency: float for currency in currencies if frame[currency].dtype == object})
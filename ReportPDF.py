@@ -1,23 +1,47 @@
 import csv
 import re
 import datetime
-from typing import List
+import functools
+import itertools
+from typing import List, Iterator, Iterable
 from matplotlib.axes import Axes
 import matplotlib.pyplot as plt
 from jinja2 import Template
+from openpyxl import Workbook
+from openpyxl.styles import Font
 import pdfkit
 import doctest
+import sys
+import numpy as np
+from VacancyFrame import VacancyFrame
+from DatasetCache import DatasetCache
+from NameIndex import get_name_index
+from SalaryCube import SalaryCube, get_salary_cube
+from MonthlySeries import MonthlySeries
+from SkillStats import SkillStats
+from HeavyHitters import SpaceSaving, print_heavy_hitters
+from CurrencyConverter import CurrencyConverter
+from GroupBy import GroupBy
+from AhoCorasick import AhoCorasick
+from TDigest import TDigest
 # Меняю файл в ветке develop
 
 class DataSet:
     """
     Считывание файла и формирование удобной структуры данных.
+    Вакансии читаются потоково: файл не загружается в память целиком.
 
     :param file: Название считываемого файла
     :type file: str
 
-    :param vacancies: Лист вакансий
-    :type vacancies: list
+    :param headers: Заголовки файла
+    :type headers: list
+
+    :param vacancies_rows: Генератор очищенных словарей вакансий
+    :type vacancies_rows: Iterator[dict]
+
+    :param vacancies: Генератор вакансий (можно пройти только один раз)
+    :type vacancies: Iterator[Vacancy]
 
     :param vacancy_name: Название профессии
     :type vacancy_name: str
@@ -28,7 +52,50 @@ class DataSet:
         """
         self.file = input("Введите название файла: ")
         self.vacancy_name = input("Введите название профессии: ")
-        self.vacancies = [Vacancy(vac) for vac in self.csv_filer(*self.csv_reader(self.file))]
+        self.headers, rows = self.csv_reader(self.file)
+        self.vacancies_rows = self.csv_filer(self.headers, rows)
+        self.vacancies = (Vacancy(vac) for vac in self.vacancies_rows)
+
+    def to_frame(self, use_cache: bool = False) -> VacancyFrame:
+        """
+        Собирает вакансии в столбцовое хранилище VacancyFrame без создания объектов Vacancy.
+        Использует тот же поток, что и vacancies, поэтому вызывается вместо прохода по vacancies.
+
+        :param use_cache: Брать ли очищенные данные и индекс названий из кэша рядом с файлом (и сохранять их туда)
+        :type use_cache: bool
+
+        :return: Столбцовое хранилище вакансий
+        :rtype: VacancyFrame
+        """
+        if use_cache:
+            frame = DatasetCache(self.file, "clean").load_or_build(lambda: VacancyFrame.from_dicts(self.vacancies_rows))
+            frame.name_index = get_name_index(self.file, lambda: frame, "clean")
+            return frame
+        return VacancyFrame.from_dicts(self.vacancies_rows)
+
+    def get_cubes(self, professions: List[str]) -> tuple:
+        """
+        Куб зарплат по всем вакансиям и кубы по каждой профессии из кэша рядом с файлом.
+        Вакансии разбираются (или берутся из кэша), только если какого-то куба в кэше нет.
+
+        :param professions: Названия профессий
+        :type professions: list
+
+        :return: Куб по всем вакансиям и словарь профессия/куб
+        :rtype: tuple
+        """
+        @functools.cache
+        def get_frame() -> tuple:
+            frame = self.to_frame(use_cache=True)
+            return frame, frame.middle_salary_in_rub(converter)
+
+        def build(profession: str = None) -> SalaryCube:
+            frame, salaries = get_frame()
+            return SalaryCube.from_frame(frame, salaries, None if profession is None else frame.profession_mask(profession))
+
+        cube = get_salary_cube(self.file, build, "clean")
+        return cube, {profession: get_salary_cube(self.file, lambda: build(profession), "clean", profession)
+                      for profession in professions}
 
     @staticmethod
     def delete_html(new_html) -> str:
@@ -67,36 +134,36 @@ class DataSet:
         :param file: Название считываемого файла
         :type file: str
 
-        :return: Заголовки файла и данные о вакансиях
+        :return: Заголовки файла и итератор по строкам с данными о вакансиях
         :rtype: tuple
         """
         reader = csv.reader(open(file, encoding='utf_8_sig'))
-        new_vacancies = [row for row in reader]
-        if len(new_vacancies) == 0:
+        headers = next(reader, None)
+        if headers is None:
             print("Пустой файл")
             exit()
-        elif len(new_vacancies[1:]) == 0:
+        first_vacancy = next(reader, None)
+        if first_vacancy is None:
             print("Нет данных")
             exit()
-        else:
-            return new_vacancies[0], new_vacancies[1:]
+        return headers, itertools.chain([first_vacancy], reader)
 
-    def csv_filer(self, headers, vacancies) -> list:
+    def csv_filer(self, headers, vacancies: Iterable[list]) -> Iterator[dict]:
         """
-        Отчищает лист вакансий от пустых элементов, создает словарь вакансий.
+        Отчищает поток вакансий от пустых элементов, создает словарь для каждой вакансии.
 
         :param headers: Заголовки csv файла
         :type headers: list
 
         :param vacancies: Описания вакансий
-        :type vacancies: list
+        :type vacancies: Iterable[list]
 
-        :return: Лист со словарями для каждой вакансии
-        :rtype: list
+        :return: Генератор словарей для каждой вакансии
+        :rtype: Iterator[dict]
         """
-        vacancies_list = list(filter(lambda vac: (len(vac) == len(headers) and vac.count('') == 0), vacancies))
-        vacanies_dictionary = [dict(zip(headers, map(self.delete_html, vac))) for vac in vacancies_list]
-        return vacanies_dictionary
+        for vac in vacancies:
+            if len(vac) == len(headers) and vac.count('') == 0:
+                yield dict(zip(headers, map(self.delete_html, vac)))
 
 class Salary:
     """
@@ -110,6 +177,9 @@ class Salary:
 
     :param salary_currency: Идентификатор валюты оклада
     :type salary_currency: str
+
+    :param salary_in_rur: Среднее значение вилки оклада в рублях
+    :type salary_in_rur: float
     """
     def __init__(self, salary_from, salary_to, salary_currency):
         """
@@ -127,10 +197,11 @@ class Salary:
         self.salary_from = salary_from
         self.salary_to = salary_to
         self.salary_currency = salary_currency
+        self.salary_in_rur = converter.middle_to_rub(salary_from, salary_to, salary_currency)
 
     def to_rub(self, new_salary: float) -> float:
         """
-        Переводит валюту в рубли при помощи словаря currency_to_rub.
+        Переводит валюту в рубли при помощи конвертера валют.
 
         :param new_salary: Значение оклада
         :type new_salary: float
@@ -147,7 +218,7 @@ class Salary:
         >>> Salary(10, 20, 'AZN').to_rub(10 + 20)
         1070.4
         """
-        return new_salary * currency_to_rub[self.salary_currency]
+        return converter.to_rub(new_salary, self.salary_currency)
 
 class Vacancy:
     """
@@ -164,6 +235,12 @@ class Vacancy:
 
     :param published_at: Дата публикации вакансии
     :type published_at: str
+
+    :param key_skills: Навыки через перевод строки
+    :type key_skills: str
+
+    :param employer_name: Название работодателя
+    :type employer_name: str
     """
     def __init__(self, dictionary):
         """
@@ -176,6 +253,8 @@ class Vacancy:
         self.salary = Salary(dictionary['salary_from'], dictionary['salary_to'], dictionary['salary_currency'])
         self.area_name = dictionary['area_name']
         self.published_at = dictionary['published_at']
+        self.key_skills = dictionary.get('key_skills', '')
+        self.employer_name = dictionary.get('employer_name', '')
 
 class Report:
     """
@@ -213,9 +292,19 @@ class Report:
 
     :param city_sheet_rows: Строки для таблицы по городам
     :type city_sheet_rows: list
+
+    :param years_quantiles: Медиана и 90-й перцентиль зарплат по годам
+    :type years_quantiles: dict
+
+    :param city_quantiles: Медиана и 90-й перцентиль зарплат по городам
+    :type city_quantiles: dict
+
+    :param months: Помесячный ряд зарплат
+    :type months: MonthlySeries
     """
     def __init__(self, vacancy_name, years_salary, years_vacs_count, prof_years_salary, prof_years_vacs_count,
-                 city_salary, city_vacs_rate):
+                 city_salary, city_vacs_rate, years_quantiles: dict = None, city_quantiles: dict = None,
+                 months: MonthlySeries = None):
         """
         Инициализация класса Report. Структурирование данных для графиков и таблиц.
 
@@ -239,6 +328,15 @@ class Report:
 
         :param city_vacs_rate: Доля вакансий по городам
         :type city_vacs_rate: dict
+
+        :param years_quantiles: Словарь год/(медиана, 90-й перцентиль) зарплат (None - без этих столбцов)
+        :type years_quantiles: dict
+
+        :param city_quantiles: Словарь город/(медиана, 90-й перцентиль) зарплат (None - без этих столбцов)
+        :type city_quantiles: dict
+
+        :param months: Помесячный ряд зарплат (None - без графика по месяцам)
+        :type months: MonthlySeries
         """
         self.vacancy_name = vacancy_name
         self.years_salary = years_salary
@@ -247,16 +345,25 @@ class Report:
         self.prof_years_vacs_count = prof_years_vacs_count
         self.city_salary = city_salary
         self.city_vacs_rate = city_vacs_rate
-        self.years_sheet_headers = ['Год', 'Средняя зарплата', 'Средняя зарплата - Программист', 'Количество вакансий',
-                               'Количество вакансий - Программист']
+        self.years_quantiles = years_quantiles
+        self.city_quantiles = city_quantiles
+        self.months = months
+        self.years_sheet_headers = ['Год', 'Средняя зарплата', f'Средняя зарплата - {vacancy_name}',
+                                    'Количество вакансий', f'Количество вакансий - {vacancy_name}']
         years_sheet_columns = [list(years_salary.keys()), list(years_salary.values()),
                            list(years_vacs_count.values()), list(prof_years_salary.values()),
                            list(prof_years_vacs_count.values())]
+        if years_quantiles is not None:
+            self.years_sheet_headers += ['Медиана зарплат', '90-й перцентиль зарплат']
+            years_sheet_columns += self.get_quantile_columns(years_quantiles, years_salary)
         self.years_sheet_rows = self.get_table_rows(years_sheet_columns)
         self.city_sheet_headers = ['Город', 'Уровень зарплат', ' ', 'Город', 'Доля вакансий']
         city_sheet_columns = [list(city_salary.keys()), list(city_salary.values()),
                            ["" for _ in city_salary.keys()], list(city_vacs_rate.keys()),
                            list(map(self.get_percents, city_vacs_rate.values()))]
+        if city_quantiles is not None:
+            self.city_sheet_headers[2:2] = ['Медиана зарплат', '90-й перцентиль зарплат']
+            city_sheet_columns[2:2] = self.get_quantile_columns(city_quantiles, city_salary)
         self.city_sheet_rows = self.get_table_rows(city_sheet_columns)
 
     @staticmethod
@@ -311,6 +418,25 @@ class Report:
                 rows_list[cell][col] = columns[col][cell]
         return rows_list
 
+    @staticmethod
+    def get_quantile_columns(quantiles: dict, keys) -> list:
+        """
+        Функция для получения столбцов медианы и 90-го перцентиля в порядке ключей таблицы.
+
+        :param quantiles: Словарь ключ/(медиана, 90-й перцентиль)
+        :type quantiles: dict
+
+        :param keys: Ключи строк таблицы
+        :type keys: Iterable
+
+        :return: Столбец медиан и столбец 90-х перцентилей
+        :rtype: list
+
+        >>> Report.get_quantile_columns({2007: (10, 20), 2008: (30, 40)}, [2008, 2007])
+        [[30, 10], [40, 20]]
+        """
+        return [[quantiles[key][0] for key in keys], [quantiles[key][1] for key in keys]]
+
     @staticmethod
     def create_regular_schedule(ax: Axes, keys1, keys2, values1, values2, label1, label2, title) -> None:
         """
@@ -409,14 +535,22 @@ class Report:
         plt.rcParams['font.size'] = 8
         self.create_regular_schedule(axis[0, 0], self.years_salary.keys(), self.prof_years_salary.keys(),
                                      self.years_salary.values(), self.prof_years_salary.values(),
-                                     "Средняя з/п", "з/п программист", "Уровень зарплат по годам")
+                                     "Средняя з/п", f"з/п {self.vacancy_name}", "Уровень зарплат по годам")
+        if self.years_quantiles is not None:
+            medians = self.get_quantile_columns(self.years_quantiles, self.years_salary)[0]
+            axis[0, 0].plot(list(self.years_salary.keys()), medians, "o-", color="black", label="Медиана з/п")
+            axis[0, 0].legend()
 
         self.create_regular_schedule(axis[0, 1], self.years_vacs_count.keys(), self.prof_years_vacs_count.keys(),
                             self.years_vacs_count.values(), self.prof_years_vacs_count.values(),
-                            "Количество вакансий", "Количество вакансий программист", "Количество вакансий по годам")
+                            "Количество вакансий", f"Количество вакансий {self.vacancy_name}", "Количество вакансий по годам")
 
         self.create_horizontal_schedule(axis[1, 0], self.city_salary.keys(), self.city_salary.values(),
                                         "Уровень зарплат по городам")
+        if self.city_quantiles is not None:
+            medians = self.get_quantile_columns(self.city_quantiles, self.city_salary)[0]
+            axis[1, 0].plot(medians, range(len(medians)), "o", color="black", label="Медиана з/п")
+            axis[1, 0].legend()
 
         self.create_pie_schedule(axis[1, 1], "Доля вакансий по городам")
 
@@ -424,13 +558,66 @@ class Report:
         fig.tight_layout(h_pad=2)
         fig.savefig("graph.png")
 
-    def generate_pdf(self) -> None:
+    @staticmethod
+    def create_months_schedule(ax: Axes, windows: dict, title) -> None:
+        """
+        Функция создания линейного графика помесячной статистики со скользящими средними.
+
+        :param ax: Глобальная позиция графика (поле для рисования)
+        :type ax: Axes
+
+        :param windows: Словарь легенда/(месяц/значение) для каждой линии
+        :type windows: dict
+
+        :param title: Название поля
+        :type title: str
+
+        :return: Линейный график
+        """
+        for label, month_to_value in windows.items():
+            ax.plot(list(month_to_value.keys()), list(month_to_value.values()), label=label)
+        months = list(next(iter(windows.values())).keys())
+        ax.set_xticks(months[::12])
+        ax.legend()
+        ax.set_title(title, fontsize=16)
+        ax.grid(axis="y")
+        ax.tick_params(axis="x", labelrotation=90)
+
+    def generate_months_schedule(self, file_name: str = "months_graph.png") -> None:
+        """
+        Функция для создания png-файла с графиками средней зарплаты и количества вакансий по месяцам
+        и их скользящих средних за 3 и 12 месяцев.
+
+        :param file_name: Название png-файла
+        :type file_name: str
+
+        :return: png-файл с графиками
+        """
+        windows = {window: self.months.rolling(window) for window in (1, 3, 12)}
+        labels = {1: "По месяцам", 3: "Среднее за 3 месяца", 12: "Среднее за 12 месяцев"}
+        fig, axis = plt.subplots(2, 1)
+        self.create_months_schedule(axis[0], {labels[window]: windows[window][0] for window in windows},
+                                    "Уровень зарплат по месяцам")
+        self.create_months_schedule(axis[1], {labels[window]: windows[window][1] for window in windows},
+                                    "Количество вакансий по месяцам")
+        fig.set_size_inches(16, 9)
+        fig.tight_layout(h_pad=2)
+        fig.savefig(file_name)
+
+    def generate_pdf(self, file_name: str = "report.pdf") -> None:
         """
         Функция для генерации pdf-файла из получившихся данных, png-графиков, и HTML-шаблона.
 
+        :param file_name: Название pdf-файла
+        :type file_name: str
+
         :return: PDF-файл с данными
         """
         self.generate_schedule()
+        months_image_name = None
+        if self.months is not None and self.months.get_bounds() is not None:
+            months_image_name = "months_graph.png"
+            self.generate_months_schedule(months_image_name)
         html = open("pdf_template.html").read()
         template = Template(html)
         keys_to_values = {
@@ -442,15 +629,16 @@ class Report:
             "cities_title": "Статистика по городам",
             "cities_headers": self.city_sheet_headers,
             "count_columns": len(self.city_sheet_headers),
-            "cities_rows": self.city_sheet_rows
+            "cities_rows": self.city_sheet_rows,
+            "months_title": "Статистика по месяцам",
+            "months_image_name": months_image_name
         }
         pdf_template = template.render(keys_to_values)
         config = pdfkit.configuration(wkhtmltopdf=r"D:\For PDF python\wkhtmltopdf\bin\wkhtmltopdf.exe")
-        pdfkit.from_string(pdf_template, "report.pdf", configuration=config, options={"enable-local-file-access": True})
+        pdfkit.from_string(pdf_template, file_name, configuration=config, options={"enable-local-file-access": True})
 
 
-currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76,
-                   "KZT": 0.13, "RUR": 1, "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
+converter = CurrencyConverter()
 
 # def get_data_1(date) -> int:
 #    """
@@ -535,24 +723,10 @@ def get_salary_statistic(vacs_list: List[Vacancy], field, vac_name: str = '') ->
     :return: Словарь со статистикой по окладу
     :rtype: dict
     """
-    statistic_result = {}
-    for vac in vacs_list:
-        if vac.__getattribute__(field) not in statistic_result.keys():
-            statistic_result[vac.__getattribute__(field)] = []
-    if vac_name != '':
-        vacs_list = list(filter(lambda item: vac_name in item.name, vacs_list))
-
-    for vac in vacs_list:
-        salary_to = vac.salary.salary_to
-        salary_from = vac.salary.salary_from
-        statistic_result[vac.__getattribute__(field)].append(
-            vac.salary.to_rub(float(salary_from) + float(salary_to)) / 2)
-
-    for key in statistic_result.keys():
-        statistic_result[key] = int(sum(statistic_result[key]) // len(statistic_result[key])) if len(
-            statistic_result[key]) != 0 else 0
-
-    return statistic_result
+    keys = GroupBy(field).add_all(vacs_list).keys()
+    salaries = GroupBy(field, 'salary.salary_in_rur', where=lambda vac: vac_name in vac.name).add_all(vacs_list)
+    counts = salaries.count()
+    return get_middle_statistic(salaries.sum(), {key: counts.get(key, 0) for key in keys})
 
 def get_vacancies_statistic(vacs_list: List[Vacancy], length, field, vac_name: str = '') -> dict:
     """
@@ -573,57 +747,566 @@ def get_vacancies_statistic(vacs_list: List[Vacancy], length, field, vac_name: s
     :return: Словарь со статистикой по вакансиям
     :rtype: dict
     """
-    statistic_result = {}
-    for vac in vacs_list:
-        if vac.__getattribute__(field) not in statistic_result.keys():
-            statistic_result[vac.__getattribute__(field)] = 0
+    keys = GroupBy(field).add_all(vacs_list).keys()
+    counts = GroupBy(field, where=lambda vac: vac_name in vac.name).add_all(vacs_list).count()
+    if field == 'area_name':
+        return {key: round(counts.get(key, 0) / length, 4) for key in keys}
+    return {key: counts.get(key, 0) for key in keys}
 
-    if vac_name != '':
-        vacs_list = list(filter(lambda item: vac_name in item.name, vacs_list))
-    for vac in vacs_list:
-        statistic_result[vac.__getattribute__(field)] += 1
+def get_middle_statistic(key_to_sum: dict, key_to_count: dict) -> dict:
+    """
+    Функция для получения словаря средних значений по накопленным суммам и количествам.
 
-    if field == 'area_name':
-        for key in statistic_result.keys():
-            statistic_result[key] = round(statistic_result[key] / length, 4)
+    :param key_to_sum: Словарь ключ/сумма
+    :type key_to_sum: dict
+
+    :param key_to_count: Словарь ключ/количество
+    :type key_to_count: dict
+
+    :return: Словарь ключ/среднее значение (0, если значений по ключу нет)
+    :rtype: dict
+
+    >>> get_middle_statistic({2007: 30.0, 2008: 0}, {2007: 4, 2008: 0})
+    {2007: 7, 2008: 0}
+    """
+    return {key: int(key_to_sum[key] // count) if count != 0 else 0 for key, count in key_to_count.items()}
+
+def get_quantiles(sketch: TDigest) -> tuple:
+    """
+    Функция для получения медианы и 90-го перцентиля по скетчу значений.
+
+    :param sketch: Скетч значений
+    :type sketch: TDigest
+
+    :return: Медиана и 90-й перцентиль (округленные вниз)
+    :rtype: tuple
+
+    >>> sketch = TDigest()
+    >>> sketch.add_many([10.5, 20.5, 30.5, 40.5, 50.5, 60.5, 70.5, 80.5, 90.5, 100.5])
+    >>> get_quantiles(sketch)
+    (55, 95)
+    """
+    return int(sketch.quantile(0.5)), int(sketch.quantile(0.9))
+
+class StatisticAggregator:
+    """
+    Однопроходный подсчет всей статистики для отчета: за один просмотр вакансий копятся
+    итоги GroupBy по годам, по годам для каждой выбранной профессии и по городам.
+    Все профессии ищутся в названии вакансии одним проходом автомата Ахо-Корасик,
+    результат поиска запоминается для каждого уникального названия.
 
-    return statistic_result
+    :param vacancy_name: Название основной профессии
+    :type vacancy_name: str
+
+    :param professions: Названия всех профессий отчета
+    :type professions: list
+
+    :param vacs_count: Количество учтенных вакансий
+    :type vacs_count: int
+
+    :param years: Зарплаты по годам (со скетчами квантилей)
+    :type years: GroupBy
+
+    :param profession_years: Зарплаты по годам для каждой профессии
+    :type profession_years: dict
+
+    :param prof_years: Зарплаты по годам для основной профессии
+    :type prof_years: GroupBy
+
+    :param areas: Зарплаты по городам (со скетчами квантилей): GroupBy или, в режиме частых ключей,
+        счетчик SpaceSaving фиксированного размера
+    :type areas: GroupBy or SpaceSaving
 
-def create_report() -> None:
+    :param employers: Количество вакансий и зарплаты частых работодателей (только в режиме частых ключей
+        и при наличии столбца employer_name)
+    :type employers: SpaceSaving or None
+
+    :param names: Количество вакансий и зарплаты частых названий вакансий (только в режиме частых ключей)
+    :type names: SpaceSaving or None
+
+    :param months: Помесячный ряд зарплат
+    :type months: MonthlySeries
+
+    :param skills: Частоты навыков по годам, профессиям и парам (None - навыки не считаются)
+    :type skills: SkillStats or None
     """
-    Функция создания pdf-файла-отчета.
+    def __init__(self, vacancy_name: str = '', professions: List[str] = None, skills: bool = False,
+                 heavy_hitters: int = None):
+        """
+        Инициализирует пустой объект StatisticAggregator.
+
+        :param vacancy_name: Название профессии
+        :type vacancy_name: str
+
+        :param professions: Названия профессий для пакетного отчета (по умолчанию - только vacancy_name)
+        :type professions: list
+
+        :param skills: Считать ли за тот же проход частоты навыков
+        :type skills: bool
+
+        :param heavy_hitters: Размер счетчиков частых городов, работодателей и названий
+            (None - города считаются точно, работодатели и названия не считаются)
+        :type heavy_hitters: int
+        """
+        self.professions = list(dict.fromkeys(professions)) if professions else [vacancy_name]
+        self.vacancy_name = self.professions[0]
+        self.vacs_count = 0
+        self.years = GroupBy(lambda vac: get_data_3(vac.published_at), 'salary.salary_in_rur', quantiles=True)
+        self.profession_years = {profession: GroupBy(lambda vac: get_data_3(vac.published_at), 'salary.salary_in_rur')
+                                 for profession in self.professions}
+        self.prof_years = self.profession_years[self.vacancy_name]
+        self.automaton = AhoCorasick(self.professions)
+        self.name_to_professions = {}
+        if heavy_hitters:
+            self.areas = SpaceSaving(heavy_hitters, values=True, quantiles=True)
+            self.employers = SpaceSaving(heavy_hitters, values=True)
+            self.names = SpaceSaving(heavy_hitters, values=True)
+        else:
+            self.areas = GroupBy('area_name', 'salary.salary_in_rur', quantiles=True)
+            self.employers = self.names = None
+        self.months = MonthlySeries()
+        self.skills = SkillStats() if skills else None
+
+    def add(self, vac: Vacancy) -> None:
+        """
+        Учитывает одну вакансию во всех группировках и в помесячном ряду. Год и зарплата вычисляются один раз.
+
+        :param vac: Вакансия
+        :type vac: Vacancy
+        """
+        year = get_data_3(vac.published_at)
+        salary = vac.salary.salary_in_rur
+        self.vacs_count += 1
+        self.years.add_value(year, salary)
+        professions = self.get_professions(vac.name)
+        for profession in professions:
+            self.profession_years[profession].add_value(year, salary)
+        self.areas.add_value(vac.area_name, salary)
+        self.months.add(year, int(vac.published_at[5:7]), salary)
+        if self.skills is not None:
+            self.skills.add(vac.key_skills, year, professions)
+        if self.employers is not None:
+            self.employers.add_value(vac.employer_name, salary)
+        if self.names is not None:
+            self.names.add_value(vac.name, salary)
+
+    def get_professions(self, name: str) -> List[str]:
+        """
+        Профессии, входящие в название вакансии (поиск выполняется один раз на каждое название).
+
+        :param name: Название вакансии
+        :type name: str
+
+        :return: Найденные профессии
+        :rtype: list
+        """
+        professions = self.name_to_professions.get(name)
+        if professions is None:
+            professions = self.name_to_professions[name] = self.automaton.find_patterns(name)
+        return professions
+
+    def add_frame(self, frame: VacancyFrame) -> 'StatisticAggregator':
+        """
+        Учитывает все вакансии из VacancyFrame векторными операциями над столбцами.
+
+        :param frame: Столбцовое хранилище вакансий
+        :type frame: VacancyFrame
+
+        :return: Этот же объект StatisticAggregator
+        :rtype: StatisticAggregator
+        """
+        salaries = frame.middle_salary_in_rub(converter)
+        years, year_codes = frame.field_codes('year')
+        self.years.add_codes(years, year_codes, salaries)
+        profession_masks = frame.profession_masks(self.professions)
+        for profession, mask in profession_masks.items():
+            self.profession_years[profession].add_codes(years, year_codes, salaries, mask)
+        self.areas.add_codes(*frame.field_codes('area_name'), salaries)
+        self.months.add_many(frame.year, frame.month(), salaries)
+        self.add_frame_counters(frame, salaries, profession_masks)
+        self.vacs_count += len(frame)
+        return self
+
+    def add_frame_counters(self, frame: VacancyFrame, salaries: np.ndarray, profession_masks: dict) -> None:
+        """
+        Учитывает вакансии из VacancyFrame в статистике, которой нет в кубе зарплат:
+        навыки, частые работодатели и названия.
+
+        :param frame: Столбцовое хранилище вакансий
+        :type frame: VacancyFrame
+
+        :param salaries: Зарплаты в рублях по строкам
+        :type salaries: np.ndarray
+
+        :param profession_masks: Словарь профессия/булева маска вакансий профессии
+        :type profession_masks: dict
+        """
+        if self.skills is not None:
+            self.skills.add_frame(frame, profession_masks)
+        if self.employers is not None:
+            self.employers.add_codes(*frame.field_codes('employer_name'), salaries)
+        if self.names is not None:
+            self.names.add_codes(*frame.field_codes('name'), salaries)
+
+    def add_cube(self, cube: SalaryCube, profession_cubes: dict) -> 'StatisticAggregator':
+        """
+        Учитывает вакансии по кубам зарплат сверткой по годам, городам и месяцам, без прохода по вакансиям.
+        Скетчи квантилей при этом не собираются.
+
+        :param cube: Куб по всем вакансиям
+        :type cube: SalaryCube
+
+        :param profession_cubes: Кубы по профессиям
+        :type profession_cubes: dict
+
+        :return: Этот же объект StatisticAggregator
+        :rtype: StatisticAggregator
+        """
+        self.years.merge(cube.roll_up('year').to_group_by())
+        for profession in self.professions:
+            self.profession_years[profession].merge(profession_cubes[profession].roll_up('year').to_group_by())
+        areas = cube.roll_up('area_name').to_group_by()
+        if isinstance(self.areas, SpaceSaving):
+            self.areas.add_counts(areas.count(), areas.sum())
+        else:
+            self.areas.merge(areas)
+        self.months.add_group_by(cube.roll_up('year', 'month').to_group_by())
+        self.vacs_count += cube.total('count')
+        return self
+
+    def add_all(self, vacancies: Iterable[Vacancy]) -> 'StatisticAggregator':
+        """
+        Учитывает все вакансии из потока за один проход.
+
+        :param vacancies: Поток вакансий
+        :type vacancies: Iterable[Vacancy]
+
+        :return: Этот же объект StatisticAggregator
+        :rtype: StatisticAggregator
+        """
+        for vac in vacancies:
+            self.add(vac)
+        return self
+
+    def get_needed_area_count(self) -> dict:
+        """
+        Отбирает города, в которых не меньше 1% от всех вакансий.
+
+        :return: Словарь город/количество вакансий
+        :rtype: dict
+        """
+        min_count = int(self.vacs_count * 0.01)
+        return {area: count for area, count in self.areas.count().items() if min_count <= count}
+
+    def get_profession_years(self, profession: str) -> tuple:
+        """
+        Суммы и количества вакансий профессии по всем годам отчета (0 для лет без вакансий профессии).
+
+        :param profession: Название профессии
+        :type profession: str
+
+        :return: Словари год/сумма зарплат и год/количество вакансий
+        :rtype: tuple
+        """
+        prof_years = self.profession_years[profession]
+        prof_counts, prof_sums = prof_years.count(), prof_years.sum()
+        years = self.years.keys()
+        return {year: prof_sums.get(year, 0) for year in years}, {year: prof_counts.get(year, 0) for year in years}
+
+    def get_report_statistic(self, profession: str = None) -> tuple:
+        """
+        Формирует шесть словарей статистики в том виде, в котором их принимает Report.
+
+        :param profession: Название профессии (по умолчанию - основная профессия)
+        :type profession: str
+
+        :return: Зарплаты и количество вакансий по годам, то же для профессии, зарплаты и доли по городам
+        :rtype: tuple
+        """
+        needed_area_count = self.get_needed_area_count()
+        years_count = self.years.count()
+        prof_years_sum, prof_years_count = self.get_profession_years(profession or self.vacancy_name)
+        years_salary = get_statistic(get_middle_statistic(self.years.sum(), years_count).items(), 0,
+                                     'Динамика уровня зарплат по годам: ')
+        years_vacs_count = get_statistic(years_count.items(), 0, 'Динамика количества вакансий по годам: ')
+        prof_years_salary = get_statistic(get_middle_statistic(prof_years_sum, prof_years_count).items(), 0,
+                                          'Динамика уровня зарплат по годам для выбранной профессии: ')
+        prof_years_vacs_count = get_statistic(prof_years_count.items(), 0,
+                                              'Динамика количества вакансий по годам для выбранной профессии: ')
+        city_salary = get_statistic(get_middle_statistic(self.areas.sum(), needed_area_count).items(), 1,
+                                    'Уровень зарплат по городам (в порядке убывания): ', 10, True)
+        city_vacs_rate = get_statistic({area: round(count / self.vacs_count, 4)
+                                        for area, count in needed_area_count.items()}.items(), 1,
+                                       'Доля вакансий по городам (в порядке убывания): ', 10, True)
+        return years_salary, years_vacs_count, prof_years_salary, prof_years_vacs_count, city_salary, city_vacs_rate
+
+    def get_quantile_statistic(self, city_salary: dict) -> tuple:
+        """
+        Формирует медиану и 90-й перцентиль зарплат по годам и по городам отчета
+        по скетчам, накопленным за тот же проход, что и средние.
+
+        :param city_salary: Уровень зарплат по городам отчета
+        :type city_salary: dict
+
+        :return: Словари год/(медиана, 90-й перцентиль) и город/(медиана, 90-й перцентиль)
+        :rtype: tuple
+        """
+        years_quantiles = {year: get_quantiles(self.years.sketches[year]) for year in sorted(self.years.keys())}
+        city_quantiles = {area: get_quantiles(self.areas.sketches[area]) for area in city_salary}
+        return years_quantiles, city_quantiles
+
+    def get_heavy_hitters_statistic(self, count: int = 10) -> tuple:
+        """
+        Формирует количество вакансий и уровень зарплат самых частых работодателей и названий вакансий
+        по счетчикам фиксированного размера и выводит их в консоль вместе с гарантированной ошибкой счета.
+
+        :param count: Количество работодателей и названий
+        :type count: int
+
+        :return: Словари работодатель/количество вакансий, работодатель/уровень зарплат и то же для названий
+            (словари работодателей пустые, если в файле нет столбца employer_name)
+        :rtype: tuple
+        """
+        employers_count, employers_salary = {}, {}
+        if self.employers is not None:
+            employers_count, employers_salary = print_heavy_hitters(self.employers, 'Работодатели', count)
+        names_count, names_salary = print_heavy_hitters(self.names, 'Названия вакансий', count)
+        return employers_count, employers_salary, names_count, names_salary
+
+class BatchReport:
+    """
+    Сводный xlsx-отчет по многим профессиям: общие зарплаты и количество вакансий по годам
+    и те же столбцы для каждой профессии в одной таблице.
+
+    :param aggregator: Статистика, собранная за один проход по всем профессиям
+    :type aggregator: StatisticAggregator
+
+    :param years_sheet_headers: Заголовки для таблицы по годам
+    :type years_sheet_headers: list
+
+    :param years_sheet_rows: Строки для таблицы по годам
+    :type years_sheet_rows: list
+    """
+    def __init__(self, aggregator: StatisticAggregator):
+        """
+        Инициализация класса BatchReport. Структурирование данных для таблицы.
+
+        :param aggregator: Статистика, собранная за один проход по всем профессиям
+        :type aggregator: StatisticAggregator
+        """
+        self.aggregator = aggregator
+        years_count = dict(sorted(aggregator.years.count().items()))
+        self.years_sheet_headers = ['Год', 'Средняя зарплата', 'Количество вакансий']
+        years_sheet_columns = [list(years_count.keys()),
+                               list(get_middle_statistic(aggregator.years.sum(), years_count).values()),
+                               list(years_count.values())]
+        for profession in aggregator.professions:
+            prof_years_sum, prof_years_count = aggregator.get_profession_years(profession)
+            self.years_sheet_headers += [f'Средняя зарплата - {profession}', f'Количество вакансий - {profession}']
+            prof_years_salary = get_middle_statistic(prof_years_sum, prof_years_count)
+            years_sheet_columns += [[prof_years_salary[year] for year in years_count],
+                                    [prof_years_count[year] for year in years_count]]
+        self.years_sheet_rows = Report.get_table_rows(years_sheet_columns)
+
+    def generate_excel(self, file_name: str = "report_batch.xlsx") -> None:
+        """
+        Функция для создания xlsx-файла с таблицей по годам.
+
+        :param file_name: Название xlsx-файла
+        :type file_name: str
+
+        :return: xlsx-файл с данными
+        """
+        workbook = Workbook()
+        years_sheet = workbook.active
+        years_sheet.title = 'Статистика по годам'
+        years_sheet.append(self.years_sheet_headers)
+        for row in self.years_sheet_rows:
+            years_sheet.append(row)
+        for cell in years_sheet[1]:
+            cell.font = Font(bold=True)
+            years_sheet.column_dimensions[cell.column_letter].width = len(str(cell.value)) + 2
+        workbook.save(file_name)
+
+class SkillReport:
+    """
+    xlsx-отчет по навыкам: самые частые навыки по годам и по профессиям и самые частые пары навыков в вакансиях.
+
+    :param sheets: Таблицы по названиям листов: (заголовки, строки)
+    :type sheets: dict
+    """
+    def __init__(self, skills: SkillStats, professions: List[str], count: int = 10):
+        """
+        Инициализация класса SkillReport. Структурирование данных для таблиц.
+
+        :param skills: Частоты навыков, собранные за один проход
+        :type skills: SkillStats
+
+        :param professions: Названия профессий отчета
+        :type professions: list
+
+        :param count: Количество навыков в каждой группе
+        :type count: int
+        """
+        years_rows = [[year, skill, frequency] for year in sorted(skills.keys('year'))
+                      for skill, frequency in skills.top('year', year, count)]
+        professions_rows = [[profession, skill, frequency] for profession in professions
+                            for skill, frequency in skills.top('profession', profession, count)]
+        pairs_rows = [[first, second, frequency] for (first, second), frequency in skills.top_pairs(count)]
+        self.sheets = {'Навыки по годам': (['Год', 'Навык', 'Количество вакансий'], years_rows),
+                       'Навыки по профессиям': (['Профессия', 'Навык', 'Количество вакансий'], professions_rows),
+                       'Пары навыков': (['Навык', 'Навык', 'Количество вакансий'], pairs_rows)}
+
+    def generate_excel(self, file_name: str = "report_skills.xlsx") -> None:
+        """
+        Функция для создания xlsx-файла с листом на каждую таблицу.
+
+        :param file_name: Название xlsx-файла
+        :type file_name: str
+
+        :return: xlsx-файл с данными
+        """
+        workbook = Workbook()
+        workbook.remove(workbook.active)
+        for title, (headers, rows) in self.sheets.items():
+            sheet = workbook.create_sheet(title)
+            sheet.append(headers)
+            for row in rows:
+                sheet.append(row)
+            for cell in sheet[1]:
+                cell.font = Font(bold=True)
+                sheet.column_dimensions[cell.column_letter].width = max(
+                    [len(str(row[cell.column - 1])) for row in rows] + [len(str(cell.value))]) + 2
+        workbook.save(file_name)
+
+def collect_statistic(new_data: DataSet, aggregator: StatisticAggregator, columnar: bool = False,
+                      use_cache: bool = False, use_cube: bool = False) -> StatisticAggregator:
+    """
+    Собирает статистику по вакансиям выбранным способом: проходом по вакансиям, векторно по VacancyFrame
+    или сверткой кубов зарплат.
+
+    :param new_data: Входные данные
+    :type new_data: DataSet
+
+    :param aggregator: Пустая статистика
+    :type aggregator: StatisticAggregator
+
+    :param columnar: Собирать ли вакансии в VacancyFrame и считать статистику векторно
+    :type columnar: bool
+
+    :param use_cache: Использовать ли кэш разобранного файла (включает columnar)
+    :type use_cache: bool
+
+    :param use_cube: Считать статистику сверткой кубов зарплат из кэша (навыки, работодатели и названия
+        при этом считаются по кэшу вакансий)
+    :type use_cube: bool
+
+    :return: Этот же объект StatisticAggregator (без счетчика работодателей, если в файле нет столбца employer_name)
+    :rtype: StatisticAggregator
+    """
+    if 'employer_name' not in new_data.headers:
+        aggregator.employers = None
+    if use_cube:
+        aggregator.add_cube(*new_data.get_cubes(aggregator.professions))
+        if aggregator.skills is not None or aggregator.names is not None:
+            frame = new_data.to_frame(use_cache=True)
+            aggregator.add_frame_counters(frame, frame.middle_salary_in_rub(converter),
+                                          frame.profession_masks(aggregator.professions))
+        return aggregator
+    if columnar or use_cache:
+        return aggregator.add_frame(new_data.to_frame(use_cache))
+    return aggregator.add_all(new_data.vacancies)
+
+def create_batch_report(professions: List[str] = None, combined: bool = False, columnar: bool = False,
+                        use_cache: bool = False, use_cube: bool = False, skills: bool = False,
+                        heavy_hitters: int = None) -> None:
+    """
+    Функция создания отчетов сразу по многим профессиям за один проход по файлу.
+    Профессии ищутся в названиях вакансий автоматом Ахо-Корасик, поэтому время прохода
+    почти не зависит от количества профессий.
+
+    :param professions: Названия профессий (по умолчанию - введенные через запятую)
+    :type professions: list
+
+    :param combined: Создать один сводный xlsx-файл вместо pdf-файла на каждую профессию
+    :type combined: bool
+
+    :param columnar: Собирать ли вакансии в VacancyFrame и считать статистику векторно
+    :type columnar: bool
+
+    :param use_cache: Использовать ли кэш разобранного файла (включает columnar)
+    :type use_cache: bool
+
+    :param use_cube: Считать статистику сверткой кубов зарплат из кэша (без медиан и перцентилей)
+    :type use_cube: bool
+
+    :param skills: Посчитать за тот же проход частоты навыков и сохранить их в report_skills.xlsx
+    :type skills: bool
+
+    :param heavy_hitters: Размер счетчиков частых городов, работодателей и названий: города для отчета
+        отбираются по счетчику фиксированного размера, частые работодатели и названия выводятся в консоль
+    :type heavy_hitters: int
+
+    :return: PDF-файлы report_<профессия>.pdf или xlsx-файл report_batch.xlsx
+    """
+    new_data = DataSet()
+    professions = professions or [profession.strip() for profession in new_data.vacancy_name.split(',')]
+    aggregator = collect_statistic(new_data, StatisticAggregator(professions=professions, skills=skills,
+                                                                 heavy_hitters=heavy_hitters),
+                                   columnar, use_cache, use_cube)
+    if skills:
+        SkillReport(aggregator.skills, aggregator.professions).generate_excel()
+    if heavy_hitters:
+        aggregator.get_heavy_hitters_statistic()
+    if combined:
+        BatchReport(aggregator).generate_excel()
+        return
+    for profession in aggregator.professions:
+        statistic = aggregator.get_report_statistic(profession)
+        quantiles = () if use_cube else aggregator.get_quantile_statistic(statistic[4])
+        report = Report(profession, *statistic, *quantiles, months=aggregator.months)
+        report.generate_pdf(f"report_{profession}.pdf")
+
+def create_report(columnar: bool = False, use_cache: bool = False, use_cube: bool = False,
+                  skills: bool = False, heavy_hitters: int = None) -> None:
+    """
+    Функция создания pdf-файла-отчета. Вакансии из DataSet читаются одним проходом,
+    вся статистика считается в StatisticAggregator.
+
+    :param columnar: Собирать ли вакансии в VacancyFrame и считать статистику векторно
+    :type columnar: bool
+
+    :param use_cache: Использовать ли кэш разобранного файла (включает columnar)
+    :type use_cache: bool
+
+    :param use_cube: Считать статистику сверткой кубов зарплат из кэша (без медиан и перцентилей)
+    :type use_cube: bool
+
+    :param skills: Посчитать за тот же проход частоты навыков и сохранить их в report_skills.xlsx
+    :type skills: bool
+
+    :param heavy_hitters: Размер счетчиков частых городов, работодателей и названий: города для отчета
+        отбираются по счетчику фиксированного размера, частые работодатели и названия выводятся в консоль
+    :type heavy_hitters: int
 
     :return: PDF-файл с отчетом
     """
     new_data = DataSet()
-    new_dict = {}
-
-    for vacs in new_data.vacancies:
-        vacs.published_at = get_data_3(vacs.published_at)
-        if vacs.area_name not in new_dict.keys():
-            new_dict[vacs.area_name] = 0
-        new_dict[vacs.area_name] += 1
-
-    needed_vacs = list(
-        filter(lambda x: int(len(new_data.vacancies) * 0.01) <= new_dict[x.area_name], new_data.vacancies))
-    years_salary = get_statistic(get_salary_statistic(new_data.vacancies, 'published_at').items(), 0,
-                                 'Динамика уровня зарплат по годам: ')
-    years_vacs_count = get_statistic(get_vacancies_statistic(new_data.vacancies, len(new_data.vacancies), 'published_at').items(), 0,
-                                     'Динамика количества вакансий по годам: ')
-    prof_years_salary = get_statistic(get_salary_statistic(new_data.vacancies, 'published_at', new_data.vacancy_name).items(), 0,
-        'Динамика уровня зарплат по годам для выбранной профессии: ')
-    prof_years_vacs_count = get_statistic(
-        get_vacancies_statistic(new_data.vacancies, len(new_data.vacancies), 'published_at', new_data.vacancy_name).items(), 0,
-        'Динамика количества вакансий по годам для выбранной профессии: ')
-    city_salary = get_statistic(get_salary_statistic(needed_vacs, 'area_name').items(), 1,
-                                'Уровень зарплат по городам (в порядке убывания): ', 10, True)
-    city_vacs_rate = get_statistic(get_vacancies_statistic(needed_vacs, len(new_data.vacancies), 'area_name').items(),1,
-                                   'Доля вакансий по городам (в порядке убывания): ', 10, True)
-
-    report = Report(new_data.vacancy_name, years_salary, years_vacs_count, prof_years_salary, prof_years_vacs_count,
-                    city_salary, city_vacs_rate)
+    aggregator = collect_statistic(new_data, StatisticAggregator(new_data.vacancy_name, skills=skills,
+                                                                 heavy_hitters=heavy_hitters),
+                                   columnar, use_cache, use_cube)
+    if skills:
+        SkillReport(aggregator.skills, aggregator.professions).generate_excel()
+    if heavy_hitters:
+        aggregator.get_heavy_hitters_statistic()
+    statistic = aggregator.get_report_statistic()
+    quantiles = () if use_cube else aggregator.get_quantile_statistic(statistic[4])
+    report = Report(new_data.vacancy_name, *statistic, *quantiles, months=aggregator.months)
     report.generate_pdf()
 
 if __name__ == '__main__':
     doctest.testmod()
-    create_report()
+    if "--batch" in sys.argv[1:]:
+        create_batch_report(combined="--combined" in sys.argv[1:])
+    else:
+        create_report()
@@ -1,14 +1,15 @@
-import concurrent.futures as pool
 import csv
 import math
 import os
 import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
+from typing import Iterable
 from jinja2 import Template
 import pdfkit
+import ParallelCSV
+from ReportPDFInMultiprocess import count_batch_data
+from PartialStats import PartialStats
 
-currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76,
-                   "KZT": 0.13, "RUR": 1, "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
 
 class InputCorrect:
     """
@@ -45,47 +46,6 @@ class InputCorrect:
                 exit()
 
 
-class Salary:
-    """
-    Класс для представления зарплаты.
-
-    :param dictionary: Словарь информации о зарплате
-        :type dictionary: dict
-    """
-    def __init__(self, dictionary):
-        """
-        Инициализирует объект Salary, переводит зарплату в рубли.
-
-        :param dictionary: Словарь информации о зарплате
-        :type dictionary: dict
-        """
-        self.salary_from = math.floor(float(dictionary["salary_from"]))
-        self.salary_to = math.floor(float(dictionary["salary_to"]))
-        self.salary_currency = dictionary["salary_currency"]
-        middle_salary = (self.salary_to + self.salary_from) / 2
-        self.salary_in_rur = currency_to_rub[self.salary_currency] * middle_salary
-
-
-class Vacancy:
-    """
-    Класс для представления вакансии.
-
-    :param dictionary: Словарь информации о зарплате
-    :type dictionary: dict
-    """
-    def __init__(self, dictionary: dict):
-        """
-        Инициализация объекта Vacancy. Приведение к более удобному виду.
-
-        :param dictionary: Словарь информации о зарплате
-        :type dictionary: dict
-        """
-        self.dictionary = dictionary
-        self.salary = Salary(dictionary)
-        self.dictionary["year"] = int(dictionary["published_at"][:4])
-        self.is_needed = dictionary["is_needed"]
-
-
 class DataSet:
     """
     Считывание файла и формирование удобной структуры данных.
@@ -96,7 +56,8 @@ class DataSet:
     :param data_set: Данные в удобном формате
     :type data_set: str
     """
-    def __init__(self, csv_dir: str, prof: str, file_name: str):
+    def __init__(self, csv_dir: str, prof: str, file_name: str, pipeline: bool = False, save_years: bool = False,
+                 backend: str = None, workers: int = None):
         """
         Инициализация класса DataSet. Чтение. Фильтрация. Форматирование.
 
@@ -105,6 +66,20 @@ class DataSet:
 
         :param data_set: Данные в удобном формате
         :type data_set: str
+
+        :param pipeline: Агрегировать строки конвейером по мере чтения, без промежуточных файлов
+            (имеет приоритет над backend)
+        :type pipeline: bool
+
+        :param save_years: При работе конвейером дополнительно сохранить файлы по годам
+        :type save_years: bool
+
+        :param backend: Способ разбора файла по диапазонам байт (serial, thread, process, shared);
+            None - процессы (потоки используются, только если они запрошены явно)
+        :type backend: str
+
+        :param workers: Количество обработчиков (по умолчанию - количество ядер)
+        :type workers: int
         """
         self.csv_dir = csv_dir
         self.prof = prof
@@ -115,7 +90,8 @@ class DataSet:
         self.year_to_salary_needed = {}
         self.area_to_salary = {}
         self.area_to_piece = {}
-        area_to_sum, area_to_count = self.csv_divide(file_name)
+        area_to_sum, area_to_count = self.parallel_parse(file_name, ParallelCSV.get_backend(backend) or "process",
+                                                         pipeline, workers, save_years)
         self.count_area_data(area_to_sum, area_to_count)
         self.sort_year_dicts()
 
@@ -132,115 +108,60 @@ class DataSet:
             self.year_to_count_needed[data[0]] = data[3]
             self.year_to_salary_needed[data[0]] = data[4]
 
-    def save_file(self, current_year: str, lines: list) -> str:
+    def parallel_parse(self, file_name: str, backend: str = None, pipeline: bool = False, workers: int = None,
+                       save_years: bool = False) -> tuple:
         """
-        Сохраняет CSV-файл с конкретными годами.
-
-        :param current_year: Текущий год
-        :type current_year: str
+        Агрегирует файл общим для отчетов путем ParallelCSV.collect_partials: конвейером (чтение и агрегация
+        идут одновременно, файлы по годам пишутся, только если это запрошено) или по диапазонам байт выбранным
+        способом. Все способы дают одинаковый результат.
 
-        :param lines: Список вакансий этого года
-        :type lines: list
+        :param file_name: Название большого файла с данными
+        :type file_name: str
 
-        :return: CSV-файл с конкретными годами
-        :rtype: str
-        """
-        file_name = f"file_{current_year}.csv"
-        with open(f"{self.csv_dir}/{file_name}", "w", encoding='utf-8-sig', newline='') as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerows(lines)
-        return file_name
+        :param backend: Способ выполнения: serial, thread, process или shared
+        :type backend: str
 
-    @staticmethod
-    def try_to_add(dic: dict, key, val) -> dict:
-        """
-        Попытка добавить в словарь значение по ключу или создать новый ключ, если его не было.
+        :param pipeline: Агрегировать строки конвейером (имеет приоритет над backend)
+        :type pipeline: bool
 
-        :param dic: Словарь, в который добавляется ключ или значение по ключу
-        :type dic: dict
+        :param workers: Количество обработчиков (по умолчанию - количество ядер)
+        :type workers: int
 
-        :param key: Ключ
-        :param val: Значение
+        :param save_years: При работе конвейером сохранить строки по файлам годов в csv_dir
+        :type save_years: bool
 
-        :return: Изменный словарь
-        :rtype: dict
+        :return: Словари город/сумма зарплат и город/количество вакансий
+        :rtype: tuple
         """
-        try:
-            dic[key] += val
-        except:
-            dic[key] = val
-        return dic
+        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            self.start_line = next(csv.reader(csv_file))
+        self.start_line, partials = ParallelCSV.collect_partials(
+            file_name, count_batch_data, self.prof, backend, pipeline, workers,
+            row_filter=lambda line: not ("" in line) and len(line) == len(self.start_line),
+            save_dir=self.csv_dir if save_years else None)
+        return self.merge_batch_partials(partials)
 
-    def read_one_csv_file(self, file_name: str) -> list:
+    def merge_batch_partials(self, partials: Iterable[PartialStats]) -> tuple:
         """
-        Читает один csv-файл и делает данные о нём.
+        Объединяет частичные статистики обработчиков: считает средние по годам для всех вакансий и для профессии
+        и суммы и количества по городам (скетчи зарплат в этом отчете не используются).
 
-        :param file_name: Файл, из которого идет чтение
-        :type file_name: str
-
-        :return: Вычисленные данные в виде листа
-        :rtype: list
-        """
-        print("start: "+file_name)
-        with open(f"{self.csv_dir}/{file_name}", "r", encoding='utf-8-sig', newline='') as csv_file:
-            file = csv.reader(csv_file)
-            filtered_vacs = []
-            year = int(file_name.replace("file_", "").replace(".csv", ""))
-            for line in file:
-                new_dict_line = dict(zip(self.start_line, line))
-                new_dict_line["is_needed"] = (new_dict_line["name"]).find(self.prof) > -1
-                vac = Vacancy(new_dict_line)
-                filtered_vacs.append(vac)
-            csv_file.close()
-            all_count = len(filtered_vacs)
-            all_sum = sum([vac.salary.salary_in_rur for vac in filtered_vacs])
-            all_middle = math.floor(all_sum / all_count)
-            needed_vacs = list(filter(lambda vacancy: vacancy.is_needed, filtered_vacs))
-            needed_count = len(needed_vacs)
-            needed_sum = sum([vac.salary.salary_in_rur for vac in needed_vacs])
-            needed_middle = math.floor(needed_sum / needed_count)
-        print("stop: " + file_name)
-        return [year, all_count, all_middle, needed_count, needed_middle]
-
-    def csv_divide(self, file_name: str):
-        """
-        Разделяет данные на csv-файлы по годам.
+        :param partials: Частичные статистики обработчиков
+        :type partials: Iterable[PartialStats]
 
-        :param file_name: Название большого файла с данными
-        :type file_name: str
+        :return: Словари город/сумма зарплат и город/количество вакансий
+        :rtype: tuple
         """
-        area_to_sum = {}
-        area_to_count = {}
-        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
-            all_files = []
-            file = csv.reader(csv_file)
-            self.start_line = next(file)
-            year_index = self.start_line.index("published_at")
-            next_line = next(file)
-            current_year = int(next_line[year_index][:4])
-            data_years = [next_line]
-            for line in file:
-                if not ("" in line) and len(line) == len(self.start_line):
-                    new_dict_line = dict(zip(self.start_line, line))
-                    new_dict_line["is_needed"] = None
-                    vac = Vacancy(new_dict_line)
-                    area_to_sum = DataSet.try_to_add(area_to_sum, vac.dictionary["area_name"], vac.salary.salary_in_rur)
-                    area_to_count = DataSet.try_to_add(area_to_count, vac.dictionary["area_name"], 1)
-                    if vac.dictionary["year"] != current_year:
-                        new_csv = self.save_file(current_year, data_years)
-                        all_files.append(new_csv)
-                        data_years = []
-                        print("save " + str(current_year))
-                        current_year = vac.dictionary["year"]
-                    data_years.append(line)
-            new_csv = self.save_file(str(current_year), data_years)
-            all_files.append(new_csv)
-            with pool.ThreadPoolExecutor(max_workers=16) as executer:
-                res = executer.map(self.read_one_csv_file, all_files)
-            read_queue = list(res)
-            csv_file.close()
-            self.csv_reader(read_queue)
-            return area_to_sum, area_to_count
+        stats = PartialStats.merge_all(partials)
+        profession_years = stats.table("profession_year")
+        read_queue = []
+        for year, (count, total, low, high) in stats.table("year").groups.items():
+            needed_count, needed_total = profession_years.groups.get((self.prof, year), [0, 0])[:2]
+            read_queue.append([year, count, math.floor(total / count), needed_count,
+                               math.floor(needed_total / needed_count) if needed_count != 0 else 0])
+        self.csv_reader(read_queue)
+        areas = stats.table("area_name")
+        return areas.sum(), areas.count()
 
     @staticmethod
     def get_sorted_dict(key_to_salary: dict) -> dict:
@@ -516,14 +437,15 @@ class Report:
         pdfkit.from_string(pdf_template, file_name, configuration=config, options={"enable-local-file-access": True})
 
 
-def create_pdf(csv_dir: str, file_name: str):
+def create_pdf(csv_dir: str, file_name: str, pipeline: bool = False, save_years: bool = False,
+               backend: str = None, workers: int = None):
     file_csv_name = input("Введите название файла: ")
     prof = "Аналитик"
     if os.path.exists(csv_dir):
         import shutil
         shutil.rmtree(csv_dir)
     os.mkdir(csv_dir)
-    data_set = DataSet(csv_dir, prof, file_csv_name)
+    data_set = DataSet(csv_dir, prof, file_csv_name, pipeline, save_years, backend, workers)
     report = Report(data_set)
     report.generate_pdf(file_name)
 
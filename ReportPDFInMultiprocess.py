@@ -1,14 +1,29 @@
 import time
 import csv
+import sys
+import functools
 import math
+import os
 import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
 import multiprocessing as mp
+import numpy as np
+from typing import Iterable
 from jinja2 import Template
 import pdfkit
-
-currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76,
-                   "KZT": 0.13, "RUR": 1, "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
+from VacancyFrame import VacancyFrame
+from DatasetCache import DatasetCache
+from NameIndex import get_name_index
+import ParallelCSV
+from CurrencyConverter import CurrencyConverter
+from TDigest import TDigest
+from AhoCorasick import AhoCorasick
+from PartialStats import PartialStats
+from HeavyHitters import print_heavy_hitters
+from MonthlySeries import MonthlySeries
+
+converter = CurrencyConverter()
+SKETCH_BUFFER_SIZE = 50000
 
 class InputCorrect:
     """
@@ -61,8 +76,8 @@ class Salary:
         self.salary_from = math.floor(float(dictionary["salary_from"]))
         self.salary_to = math.floor(float(dictionary["salary_to"]))
         self.salary_currency = dictionary["salary_currency"]
-        middle_salary = (self.salary_to + self.salary_from) / 2
-        self.salary_in_rur = currency_to_rub[self.salary_currency] * middle_salary
+        self.salary_in_rur = converter.middle_to_rub(dictionary["salary_from"], dictionary["salary_to"],
+                                                    self.salary_currency, floor=True)
 
 class Vacancy:
     """
@@ -83,6 +98,91 @@ class Vacancy:
         self.dictionary["year"] = int(dictionary["published_at"][:4])
         self.is_needed = dictionary["is_needed"]
 
+def count_batch_data(partial: PartialStats or None, start_line: list, lines: Iterable[list],
+                     prof: str or list, heavy_hitters: int = None) -> PartialStats:
+    """
+    Добавляет к частичной статистике зарплаты по строкам csv-файла, пропуская невалидные строки.
+    Зарплаты копятся в списках по ключам и каждые SKETCH_BUFFER_SIZE строк добавляются в таблицы
+    year и area_name (со скетчами), profession_year (ключ - профессия и год) и month (ключ - год и месяц).
+    В режиме частых ключей вместо таблицы area_name ведутся счетчики SpaceSaving фиксированного размера
+    area_name (со скетчами), employer_name (если такой столбец есть в файле) и name. Все профессии ищутся
+    в названии одним проходом автомата Ахо-Корасик (один раз на каждое уникальное название).
+    Выполняется в процессе-обработчике.
+
+    :param partial: Частичная статистика (None - начать новую)
+    :type partial: PartialStats or None
+
+    :param start_line: Заголовки файла
+    :type start_line: list
+
+    :param lines: Строки csv-файла
+    :type lines: Iterable[list]
+
+    :param prof: Название профессии или список профессий
+    :type prof: str or list
+
+    :param heavy_hitters: Размер счетчиков частых ключей (None - города считаются точно)
+    :type heavy_hitters: int
+
+    :return: Частичная статистика
+    :rtype: PartialStats
+    """
+    stats = partial or PartialStats()
+    stats.table("year", quantiles=True)
+    employer_index = start_line.index("employer_name") if heavy_hitters and "employer_name" in start_line else None
+    if heavy_hitters:
+        stats.counter("area_name", heavy_hitters, quantiles=True)
+        stats.counter("name", heavy_hitters)
+        if employer_index is not None:
+            stats.counter("employer_name", heavy_hitters)
+    else:
+        stats.table("area_name", quantiles=True)
+    professions = [prof] if isinstance(prof, str) else list(prof)
+    automaton = AhoCorasick(professions)
+    name_to_professions = {}
+    year_index = start_line.index("published_at")
+    name_index = start_line.index("name")
+    area_index = start_line.index("area_name")
+    from_index = start_line.index("salary_from")
+    to_index = start_line.index("salary_to")
+    currency_index = start_line.index("salary_currency")
+    year_salaries, area_salaries, profession_salaries, month_salaries, buffered = {}, {}, {}, {}, 0
+    employer_salaries, name_salaries = {}, {}
+
+    def get_buffers() -> dict:
+        buffers = {"year": year_salaries, "area_name": area_salaries, "profession_year": profession_salaries,
+                   "month": month_salaries}
+        if heavy_hitters:
+            buffers.update(name=name_salaries)
+        if employer_index is not None:
+            buffers.update(employer_name=employer_salaries)
+        return buffers
+
+    for line in lines:
+        if "" in line or len(line) != len(start_line):
+            continue
+        salary = converter.middle_to_rub(line[from_index], line[to_index], line[currency_index], floor=True)
+        year = int(line[year_index][:4])
+        year_salaries.setdefault(year, []).append(salary)
+        month_salaries.setdefault((year, int(line[year_index][5:7])), []).append(salary)
+        area_salaries.setdefault(line[area_index], []).append(salary)
+        found = name_to_professions.get(line[name_index])
+        if found is None:
+            found = name_to_professions[line[name_index]] = automaton.find_patterns(line[name_index])
+        for profession in found:
+            profession_salaries.setdefault((profession, year), []).append(salary)
+        if heavy_hitters:
+            name_salaries.setdefault(line[name_index], []).append(salary)
+        if employer_index is not None:
+            employer_salaries.setdefault(line[employer_index], []).append(salary)
+        buffered += 1
+        if buffered == SKETCH_BUFFER_SIZE:
+            stats.add_buffered(get_buffers())
+            year_salaries, area_salaries, profession_salaries, month_salaries, buffered = {}, {}, {}, {}, 0
+            employer_salaries, name_salaries = {}, {}
+    stats.add_buffered(get_buffers())
+    return stats
+
 class DataSet:
     """
     Считывание файла и формирование удобной структуры данных.
@@ -93,48 +193,195 @@ class DataSet:
     :param data_set: Данные в удобном формате
     :type data_set: str
     """
-    def __init__(self, csv_dir: str, prof: str, file_name: str):
+    def __init__(self, csv_dir: str, prof: str or list, file_name: str, use_cache: bool = False, backend: str = None,
+                 pipeline: bool = False, save_years: bool = False, workers: int = None, heavy_hitters: int = None):
         """
         Инициализация класса DataSet. Чтение. Фильтрация. Форматирование.
 
         :param csv_dir: Папка расположения всех csv-файлов
         :type csv_dir: str
 
+        :param prof: Название профессии или список профессий (статистика по всем считается за один проход)
+        :type prof: str or list
+
         :param data_set: Данные в удобном формате
         :type data_set: str
+
+        :param use_cache: Считать статистику по кэшу разобранного файла (и индексу названий) вместо разделения по годам
+        :type use_cache: bool
+
+        :param backend: Разбирать файл по диапазонам байт указанным способом (serial, thread, process, shared)
+            вместо разделения по годам; True - process (прежний флаг parallel)
+        :type backend: str or bool
+
+        :param pipeline: Агрегировать строки конвейером по мере чтения, без промежуточных файлов
+            (имеет приоритет над backend)
+        :type pipeline: bool
+
+        :param save_years: При работе конвейером дополнительно сохранить файлы по годам
+        :type save_years: bool
+
+        :param workers: Количество обработчиков (по умолчанию - количество ядер)
+        :type workers: int
+
+        :param heavy_hitters: Размер счетчиков частых городов, работодателей и названий, которые объединяются
+            между обработчиками (None - города считаются точно, работодатели и названия не считаются)
+        :type heavy_hitters: int
         """
         self.csv_dir = csv_dir
-        self.prof = prof
+        self.heavy_hitters = heavy_hitters
+        self.professions = [prof] if isinstance(prof, str) else list(dict.fromkeys(prof))
+        self.prof = self.professions[0]
         self.start_line = []
         self.year_to_count = {}
         self.year_to_salary = {}
         self.year_to_count_needed = {}
         self.year_to_salary_needed = {}
+        self.profession_to_count = {}
+        self.profession_to_salary = {}
         self.area_to_salary = {}
         self.area_to_piece = {}
-        area_to_sum, area_to_count = self.csv_divide(file_name)
+        self.year_sketches = {}
+        self.area_sketches = {}
+        self.year_to_quantiles = {}
+        self.area_to_quantiles = {}
+        self.months = MonthlySeries()
+        self.employers = None
+        self.names = None
+        if use_cache:
+            frame = DatasetCache(file_name, "raw").load_or_build(lambda: self.read_frame(file_name))
+            frame.name_index = get_name_index(file_name, lambda: frame, "raw")
+            area_to_sum, area_to_count = self.count_frame_data(frame)
+        elif pipeline or ParallelCSV.get_backend(backend) is not None:
+            area_to_sum, area_to_count = self.parallel_parse(file_name, backend, pipeline, workers, save_years)
+        else:
+            area_to_sum, area_to_count = self.csv_divide(file_name, workers)
         self.count_area_data(area_to_sum, area_to_count)
         self.sort_year_dicts()
+        self.count_quantiles()
+
+    def parallel_parse(self, file_name: str, backend: str = None, pipeline: bool = False, workers: int = None,
+                       save_years: bool = False) -> tuple:
+        """
+        Агрегирует файл общим для отчетов путем ParallelCSV.collect_partials: конвейером (чтение и агрегация
+        идут одновременно, файлы по годам пишутся, только если это запрошено) или по диапазонам байт выбранным
+        способом. Все способы дают одинаковый результат.
+
+        :param file_name: Название большого файла с данными
+        :type file_name: str
+
+        :param backend: Способ выполнения: serial, thread, process или shared
+        :type backend: str
+
+        :param pipeline: Агрегировать строки конвейером (имеет приоритет над backend)
+        :type pipeline: bool
+
+        :param workers: Количество обработчиков (по умолчанию - количество ядер)
+        :type workers: int
+
+        :param save_years: При работе конвейером сохранить строки по файлам годов в csv_dir
+        :type save_years: bool
+
+        :return: Словари город/сумма зарплат и город/количество вакансий
+        :rtype: tuple
+        """
+        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            self.start_line = next(csv.reader(csv_file))
+        self.start_line, partials = ParallelCSV.collect_partials(
+            file_name, self.get_aggregate(), self.professions, backend, pipeline, workers,
+            row_filter=lambda line: not ("" in line) and len(line) == len(self.start_line),
+            save_dir=self.csv_dir if save_years else None)
+        return self.merge_batch_partials(partials)
+
+    def get_aggregate(self):
+        """
+        Функция агрегации пачек строк для ParallelCSV: count_batch_data с размером счетчиков частых ключей.
 
-    def csv_reader(self, read_queue: mp.Queue) -> None:
+        :rtype: Callable
         """
-        Чтение данных и складывание их результатов воедино.
+        if self.heavy_hitters:
+            return functools.partial(count_batch_data, heavy_hitters=self.heavy_hitters)
+        return count_batch_data
 
-        :param read_queue: Oчередь из данных
-        :type read_queue: Queue
+    def merge_batch_partials(self, partials: list) -> tuple:
         """
-        while not read_queue.empty():
-            data = read_queue.get()
-            self.year_to_count[data[0]] = data[1]
-            self.year_to_salary[data[0]] = data[2]
-            self.year_to_count_needed[data[0]] = data[3]
-            self.year_to_salary_needed[data[0]] = data[4]
+        Объединяет частичные статистики count_batch_data и считает по ним данные отчета.
+
+        :param partials: Частичные статистики обработчиков
+        :type partials: list
+
+        :return: Словари город/сумма зарплат и город/количество вакансий
+        :rtype: tuple
+        """
+        return self.apply_stats(PartialStats.merge_all(partials))
+
+    @staticmethod
+    def read_frame(file_name: str) -> VacancyFrame:
+        """
+        Разбирает весь csv-файл в столбцовое хранилище, пропуская невалидные строки.
+
+        :param file_name: Название большого файла с данными
+        :type file_name: str
+
+        :return: Вакансии в столбцовом виде
+        :rtype: VacancyFrame
+        """
+        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            file = csv.reader(csv_file)
+            start_line = next(file)
+            return VacancyFrame.from_rows(start_line, (line for line in file
+                                                       if not ("" in line) and len(line) == len(start_line)))
+
+    def count_frame_data(self, frame: VacancyFrame) -> tuple:
+        """
+        Векторно считает статистику по годам и суммы/количества по городам из VacancyFrame.
+
+        :param frame: Вакансии в столбцовом виде
+        :type frame: VacancyFrame
+
+        :return: Словари город/сумма зарплат и город/количество вакансий
+        :rtype: tuple
+        """
+        return self.apply_stats(self.get_frame_stats(frame))
+
+    def apply_stats(self, stats: PartialStats) -> tuple:
+        """
+        Считает точные средние по годам для всех вакансий и для каждой профессии по объединенной статистике
+        и забирает из нее скетчи зарплат и помесячный ряд. Части статистики могли считаться разными процессами
+        в любом порядке.
+
+        :param stats: Объединенная статистика с таблицами year, area_name, profession_year и month
+            (в режиме частых ключей area_name, employer_name и name - счетчики)
+        :type stats: PartialStats
+
+        :return: Словари город/сумма зарплат и город/количество вакансий
+        :rtype: tuple
+        """
+        years = stats.table("year")
+        self.year_to_count = years.count()
+        self.year_to_salary = DataSet.get_middle_salary(self.year_to_count, years.sum())
+        profession_years = stats.table("profession_year")
+        counts, sums = profession_years.count(), profession_years.sum()
+        for profession in self.professions:
+            year_to_count = {year: counts.get((profession, year), 0) for year in self.year_to_count}
+            self.profession_to_count[profession] = year_to_count
+            self.profession_to_salary[profession] = DataSet.get_middle_salary(
+                year_to_count, {year: sums.get((profession, year), 0) for year in self.year_to_count})
+        self.year_to_count_needed = self.profession_to_count[self.prof]
+        self.year_to_salary_needed = self.profession_to_salary[self.prof]
+        areas = stats.counters["area_name"] if "area_name" in stats.counters else stats.table("area_name")
+        self.employers = stats.counters.get("employer_name")
+        self.names = stats.counters.get("name")
+        self.year_sketches = years.sketches or {}
+        self.area_sketches = areas.sketches or {}
+        self.months.add_group_by(stats.table("month"))
+        return areas.sum(), areas.count()
 
     def save_file(self, current_year: str, lines: list) -> str:
         """
         Сохраняет CSV-файл с конкретными годами.
 
-        :param current_year: Текущий год
+        :param current_year: Текущий год (с номером части, если год разбит на несколько файлов)
         :type current_year: str
 
         :param lines: Список вакансий этого года
@@ -149,97 +396,93 @@ class DataSet:
             writer.writerows(lines)
         return file_name
 
-    @staticmethod
-    def try_to_add(dic: dict, key, val) -> dict:
-        """
-        Попытка добавить в словарь значение по ключу или создать новый ключ, если его не было.
-
-        :param dic: Словарь, в который добавляется ключ или значение по ключу
-        :type dic: dict
-
-        :param key: Ключ
-        :param val: Значение
-
-        :return: Изменный словарь
-        :rtype: dict
-        """
-        try:
-            dic[key] += val
-        except:
-            dic[key] = val
-        return dic
-
-    def read_one_csv_file(self, queue: mp.Queue, file_name: str) -> None:
-        """
-        Читает один csv-файл и делает данные о нём.
-
-        :param queue: Очередь для добавления данных
-        :type queue: Queue
+    def get_frame_stats(self, frame: VacancyFrame) -> PartialStats:
+        """
+        Считает частичную статистику по вакансиям из VacancyFrame.
+
+        :param frame: Вакансии в столбцовом виде
+        :type frame: VacancyFrame
+
+        :return: Таблицы year и area_name (со скетчами), profession_year и month
+            (в режиме частых ключей area_name, employer_name и name - счетчики)
+        :rtype: PartialStats
+        """
+        salaries = frame.middle_salary_in_rub(converter, floor=True)
+        stats = PartialStats()
+        stats.tables["year"] = frame.group_by("year", salaries, quantiles=True)
+        if self.heavy_hitters:
+            stats.counter("area_name", self.heavy_hitters, quantiles=True).add_codes(
+                *frame.field_codes("area_name"), salaries)
+            for field in ("employer_name", "name"):
+                if field in frame.categorical:
+                    stats.counter(field, self.heavy_hitters).add_codes(*frame.field_codes(field), salaries)
+        else:
+            stats.tables["area_name"] = frame.group_by("area_name", salaries, quantiles=True)
+        years, year_codes = frame.field_codes("year")
+        profession_years = stats.table("profession_year")
+        for profession, mask in frame.profession_masks(self.professions).items():
+            profession_years.add_codes([(profession, year) for year in years], year_codes, salaries, mask)
+        months, month_codes = np.unique(frame.year.astype(np.int64) * 12 + frame.month() - 1, return_inverse=True)
+        stats.table("month").add_codes([(month // 12, month % 12 + 1) for month in months.tolist()], month_codes,
+                                       salaries)
+        return stats
+
+    def read_one_csv_file(self, file_name: str) -> PartialStats:
+        """
+        Читает один csv-файл и делает данные о нём. Выполняется в процессе-обработчике.
 
         :param file_name: Файл, из которого идет чтение
         :type file_name: str
+
+        :return: Частичная статистика файла
+        :rtype: PartialStats
         """
         print("start: "+file_name)
         with open(f"{self.csv_dir}/{file_name}", "r", encoding='utf-8-sig', newline='') as csv_file:
-            file = csv.reader(csv_file)
-            filtered_vacs = []
-            year = int(file_name.replace("file_", "").replace(".csv", ""))
-            for line in file:
-                new_dict_line = dict(zip(self.start_line, line))
-                new_dict_line["is_needed"] = (new_dict_line["name"]).find(self.prof) > -1
-                vac = Vacancy(new_dict_line)
-                filtered_vacs.append(vac)
-            csv_file.close()
-            all_count = len(filtered_vacs)
-            all_sum = sum([vac.salary.salary_in_rur for vac in filtered_vacs])
-            all_middle = math.floor(all_sum / all_count)
-            needed_vacs = list(filter(lambda vacancy: vacancy.is_needed, filtered_vacs))
-            needed_count = len(needed_vacs)
-            needed_sum = sum([vac.salary.salary_in_rur for vac in needed_vacs])
-            needed_middle = math.floor(needed_sum / needed_count)
-            queue.put((year, all_count, all_middle, needed_count, needed_middle))
+            frame = VacancyFrame.from_rows(self.start_line, csv.reader(csv_file))
         print("stop: " + file_name)
+        return self.get_frame_stats(frame)
 
-    def csv_divide(self, file_name: str):
+    def csv_divide(self, file_name: str, processes: int = None, max_lines: int = 100000):
         """
-        Разделяет данные на csv-файлы по годам.
+        Разделяет данные на csv-файлы по годам и обрабатывает их в пуле процессов фиксированного размера.
+        Большие годы делятся на несколько файлов не длиннее max_lines строк.
+
+        :param file_name: Название большого файла с данными
+        :type file_name: str
+
+        :param processes: Количество процессов (по умолчанию - количество ядер)
+        :type processes: int
+
+        :param max_lines: Наибольшее количество строк в одном файле
+        :type max_lines: int
+
+        :return: Словари город/сумма зарплат и город/количество вакансий
+        :rtype: tuple
         """
-        read_queue = mp.Queue()
-        area_to_sum = {}
-        area_to_count = {}
-        procs = []
-        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+        results = []
+        with open(file_name, "r", encoding='utf-8-sig', newline='') as csv_file, \
+                mp.Pool(processes or os.cpu_count()) as pool:
             file = csv.reader(csv_file)
             self.start_line = next(file)
             year_index = self.start_line.index("published_at")
-            next_line = next(file)
-            current_year = int(next_line[year_index][:4])
-            data_years = [next_line]
+            current_year = None
+            data_years = []
             for line in file:
                 if not ("" in line) and len(line) == len(self.start_line):
-                    new_dict_line = dict(zip(self.start_line, line))
-                    new_dict_line["is_needed"] = None
-                    vac = Vacancy(new_dict_line)
-                    area_to_sum = DataSet.try_to_add(area_to_sum, vac.dictionary["area_name"], vac.salary.salary_in_rur)
-                    area_to_count = DataSet.try_to_add(area_to_count, vac.dictionary["area_name"], 1)
-                    if vac.dictionary["year"] != current_year:
-                        new_csv = self.save_file(current_year, data_years)
+                    year = int(line[year_index][:4])
+                    if len(data_years) != 0 and (year != current_year or len(data_years) >= max_lines):
+                        new_csv = self.save_file(f"{current_year}_{len(results)}", data_years)
                         data_years = []
                         print("save " + str(current_year))
-                        proc = mp.Process(target=self.read_one_csv_file, args=(read_queue, new_csv))
-                        proc.start()
-                        procs.append(proc)
-                        current_year = vac.dictionary["year"]
+                        results.append(pool.apply_async(self.read_one_csv_file, (new_csv,)))
+                    current_year = year
                     data_years.append(line)
-            new_csv = self.save_file(str(current_year), data_years)
-            proc = mp.Process(target=self.read_one_csv_file, args=(read_queue, new_csv))
-            procs.append(proc)
-            proc.start()
-            csv_file.close()
-            for proc in procs:
-                proc.join()
-            self.csv_reader(read_queue)
-            return area_to_sum, area_to_count
+            if len(data_years) != 0:
+                new_csv = self.save_file(f"{current_year}_{len(results)}", data_years)
+                results.append(pool.apply_async(self.read_one_csv_file, (new_csv,)))
+            partials = [result.get() for result in results]
+        return self.merge_batch_partials(partials)
 
     @staticmethod
     def get_sorted_dict(key_to_salary: dict) -> dict:
@@ -275,6 +518,10 @@ class DataSet:
         self.year_to_salary = DataSet.sort_dict_for_keys(self.year_to_salary)
         self.year_to_count_needed = DataSet.sort_dict_for_keys(self.year_to_count_needed)
         self.year_to_salary_needed = DataSet.sort_dict_for_keys(self.year_to_salary_needed)
+        self.profession_to_count = {profession: DataSet.sort_dict_for_keys(year_to_count)
+                                    for profession, year_to_count in self.profession_to_count.items()}
+        self.profession_to_salary = {profession: DataSet.sort_dict_for_keys(year_to_salary)
+                                     for profession, year_to_salary in self.profession_to_salary.items()}
         self.area_to_piece = DataSet.get_sorted_dict(self.area_to_piece)
         self.area_to_salary = DataSet.get_sorted_dict(self.area_to_salary)
 
@@ -320,6 +567,26 @@ class DataSet:
         area_to_piece = {key: round(val / vacs_count, 4) for key, val in area_to_count.items()}
         return area_to_middle_salary, area_to_piece
 
+    @staticmethod
+    def get_quantiles(sketch: TDigest) -> tuple:
+        """
+        Получает медиану и 90-й перцентиль зарплат по скетчу.
+
+        :param sketch: Скетч зарплат
+        :type sketch: TDigest
+
+        :return: Медиана и 90-й перцентиль (округленные вниз)
+        :rtype: tuple
+        """
+        return math.floor(sketch.quantile(0.5)), math.floor(sketch.quantile(0.9))
+
+    def count_quantiles(self) -> None:
+        """
+        Считает медиану и 90-й перцентиль зарплат по годам и по городам отчета из объединенных скетчей.
+        """
+        self.year_to_quantiles = {year: DataSet.get_quantiles(self.year_sketches[year]) for year in self.year_to_salary}
+        self.area_to_quantiles = {area: DataSet.get_quantiles(self.area_sketches[area]) for area in self.area_to_salary}
+
     def count_area_data(self, area_to_sum: dict, area_to_count: dict) -> None:
         """
         Считает дополнительные данные для графиков и таблиц.
@@ -339,23 +606,38 @@ class Report:
 
     :param data: Посчитанные данные для графиков
     :type data: DataSet
+
+    :param prof: Профессия отчета
+    :type prof: str
     """
-    def __init__(self, data: DataSet):
+    def __init__(self, data: DataSet, prof: str = None):
         """
         Инициализация класса Report. Структурирование данных для графиков и таблиц.
 
         :param data: Посчитанные данные для графиков
         :type data: DataSet
+
+        :param prof: Профессия отчета из data.professions (по умолчанию - первая)
+        :type prof: str
         """
         self.data = data
-        self.years_sheet_headers = ["Год", "Средняя зарплата", "Средняя зарплата - Программист",
-                                "Количество вакансий", "Количество вакансий - Программист"]
+        self.prof = prof or data.prof
+        self.year_to_salary_needed = data.profession_to_salary[self.prof]
+        self.year_to_count_needed = data.profession_to_count[self.prof]
+        self.years_sheet_headers = ["Год", "Средняя зарплата", f"Средняя зарплата - {self.prof}",
+                                "Количество вакансий", f"Количество вакансий - {self.prof}"]
         years_sheet_columns = [list(data.year_to_salary.keys()), list(data.year_to_salary.values()),
-                           list(data.year_to_salary_needed.values()), list(data.year_to_count.values()),
-                           list(data.year_to_count_needed.values())]
+                           list(self.year_to_salary_needed.values()), list(data.year_to_count.values()),
+                           list(self.year_to_count_needed.values())]
+        self.years_sheet_headers += ["Медиана зарплат", "90-й перцентиль зарплат"]
+        years_sheet_columns += [[median for median, p90 in data.year_to_quantiles.values()],
+                                [p90 for median, p90 in data.year_to_quantiles.values()]]
         self.years_sheet_rows = self.get_table_rows(years_sheet_columns)
-        self.city_sheet_headers = ["Город", "Уровень зарплат", " ", "Город", "Доля вакансий"]
+        self.city_sheet_headers = ["Город", "Уровень зарплат", "Медиана зарплат", "90-й перцентиль зарплат", " ",
+                                   "Город", "Доля вакансий"]
         city_sheet_columns = [list(data.area_to_salary.keys()), list(data.area_to_salary.values()),
+                           [median for median, p90 in data.area_to_quantiles.values()],
+                           [p90 for median, p90 in data.area_to_quantiles.values()],
                            ["" for _ in data.area_to_salary.keys()], list(data.area_to_piece.keys()),
                            list(map(self.get_percents, data.area_to_piece.values()))]
         self.city_sheet_rows = self.get_table_rows(city_sheet_columns)
@@ -439,7 +721,10 @@ class Report:
         ax.set_title("Уровень зарплат по городам", fontsize=16)
         ax.grid(axis="x")
         keys = [key.replace(" ", "\n").replace("-", "-\n") for key in list(self.data.area_to_salary.keys())]
-        ax.barh(keys, self.data.area_to_salary.values())
+        ax.barh(keys, self.data.area_to_salary.values(), label="Средняя з/п")
+        ax.plot([median for median, p90 in self.data.area_to_quantiles.values()], keys, "o", color="black",
+                label="Медиана з/п")
+        ax.legend()
         ax.tick_params(axis='y', labelsize=6)
         ax.set_yticks(keys)
         ax.set_yticklabels(labels=keys, verticalalignment="center", horizontalalignment="right")
@@ -457,7 +742,7 @@ class Report:
         """
         ax.set_title("Доля вакансий по городам", fontsize=16)
         plt.rcParams['font.size'] = 8
-        dic = self.data.area_to_piece
+        dic = dict(self.data.area_to_piece)
         dic["Другие"] = 1 - sum([val for val in dic.values()])
         keys = list(dic.keys())
         ax.pie(x=list(dic.values()), labels=keys)
@@ -474,18 +759,62 @@ class Report:
         """
         fig, axis = plt.subplots(2, 2)
         plt.rcParams['font.size'] = 8
-        self.create_regular_schedule(axis[0, 0], self.data.year_to_salary.keys(), self.data.year_to_salary_needed.keys(),
-                                     self.data.year_to_salary.values(), self.data.year_to_salary_needed.values(),
-                          "Средняя з/п", "з/п программист", "Уровень зарплат по годам")
-        self.create_regular_schedule(axis[0, 1], self.data.year_to_count.keys(), self.data.year_to_count_needed.keys(),
-                                     self.data.year_to_count.values(), self.data.year_to_count_needed.values(),
-                          "Количество вакансий", "Количество вакансий программист", "Количество вакансий по годам")
+        self.create_regular_schedule(axis[0, 0], self.data.year_to_salary.keys(), self.year_to_salary_needed.keys(),
+                                     self.data.year_to_salary.values(), self.year_to_salary_needed.values(),
+                          "Средняя з/п", f"з/п {self.prof}", "Уровень зарплат по годам")
+        axis[0, 0].plot(list(self.data.year_to_quantiles.keys()),
+                        [median for median, p90 in self.data.year_to_quantiles.values()], "o-", color="black",
+                        label="Медиана з/п")
+        axis[0, 0].legend()
+        self.create_regular_schedule(axis[0, 1], self.data.year_to_count.keys(), self.year_to_count_needed.keys(),
+                                     self.data.year_to_count.values(), self.year_to_count_needed.values(),
+                          "Количество вакансий", f"Количество вакансий {self.prof}", "Количество вакансий по годам")
         self.create_horizontal_schedule(axis[1, 0])
         self.create_pie_schedule(axis[1, 1], plt)
         fig.set_size_inches(16, 9)
         fig.tight_layout(h_pad=2)
         fig.savefig(file_name)
 
+    def create_months_schedule(self, ax: Axes, windows: dict, title) -> None:
+        """
+        Функция создания линейного графика помесячной статистики со скользящими средними.
+
+        :param ax: Глобальная позиция графика (поле для рисования)
+        :type ax: Axes
+
+        :param windows: Словарь легенда/(месяц/значение) для каждой линии
+        :type windows: dict
+
+        :param title: Название поля
+        :type title: str
+        """
+        for label, month_to_value in windows.items():
+            ax.plot(list(month_to_value.keys()), list(month_to_value.values()), label=label)
+        ax.set_xticks(list(next(iter(windows.values())).keys())[::12])
+        ax.legend()
+        ax.set_title(title, fontsize=16)
+        ax.grid(axis="y")
+        ax.tick_params(axis='x', labelrotation=90)
+
+    def generate_months_schedule(self, file_name: str) -> None:
+        """
+        Функция создания png-файла с графиками зарплат и количества вакансий по месяцам
+        и их скользящих средних за 3 и 12 месяцев.
+
+        :param file_name: Название получившегося файла
+        :type file_name: str
+        """
+        labels = {1: "По месяцам", 3: "Среднее за 3 месяца", 12: "Среднее за 12 месяцев"}
+        windows = {labels[window]: self.data.months.rolling(window) for window in labels}
+        fig, axis = plt.subplots(2, 1)
+        self.create_months_schedule(axis[0], {label: salaries for label, (salaries, counts) in windows.items()},
+                                    "Уровень зарплат по месяцам")
+        self.create_months_schedule(axis[1], {label: counts for label, (salaries, counts) in windows.items()},
+                                    "Количество вакансий по месяцам")
+        fig.set_size_inches(16, 9)
+        fig.tight_layout(h_pad=2)
+        fig.savefig(file_name)
+
     def generate_pdf(self, file_name: str):
         """
         Сгенерировать pdf-файл из получившихся данных, png-графиков, и HTML-шаблона с названием html_template.html.
@@ -495,28 +824,78 @@ class Report:
         """
         image_name = "graph.png"
         self.generate_schedule(image_name)
+        months_image_name = None
+        if self.data.months.get_bounds() is not None:
+            months_image_name = "months_graph.png"
+            self.generate_months_schedule(months_image_name)
         html = open("html_template.html").read()
         template = Template(html)
         keys_to_values = {
-            "prof_name": self.data.prof,
+            "prof_name": self.prof,
             "image_name": image_name,
             "years_headers": self.years_sheet_headers,
             "years_rows": self.years_sheet_rows,
             "cities_headers": self.city_sheet_headers,
             "count_columns": len(self.city_sheet_headers),
-            "cities_rows": self.city_sheet_rows
+            "cities_rows": self.city_sheet_rows,
+            "months_image_name": months_image_name
         }
         pdf_template = template.render(keys_to_values)
         config = pdfkit.configuration(wkhtmltopdf=r"C:/Program Files/wkhtmltopdf/bin/wkhtmltopdf.exe")
         pdfkit.from_string(pdf_template, file_name, configuration=config, options={"enable-local-file-access": True})
 
 
-def create_pdf(csv_dir: str, file_name: str) -> None:
+def create_pdf(csv_dir: str, file_name: str, use_cache: bool = False, backend: str = None,
+               pipeline: bool = False, save_years: bool = False, workers: int = None,
+               heavy_hitters: int = None, batch: bool = False) -> None:
+    """
+    Создает pdf-отчет. В пакетном режиме (batch) профессии вводятся через запятую, статистика по всем
+    считается за один проход, а отчет по каждой профессии сохраняется в <file_name>_<профессия>.pdf.
+
+    :param csv_dir: Папка для csv-файлов по годам
+    :type csv_dir: str
+
+    :param file_name: Название pdf-файла
+    :type file_name: str
+
+    :param use_cache: Считать статистику по кэшу разобранного файла
+    :type use_cache: bool
+
+    :param backend: Способ разбора файла по диапазонам байт (serial, thread, process, shared)
+    :type backend: str
+
+    :param pipeline: Агрегировать строки конвейером
+    :type pipeline: bool
+
+    :param save_years: При работе конвейером сохранить файлы по годам
+    :type save_years: bool
+
+    :param workers: Количество обработчиков
+    :type workers: int
+
+    :param heavy_hitters: Размер счетчиков частых городов, работодателей и названий (None - точный подсчет городов)
+    :type heavy_hitters: int
+
+    :param batch: Пакетный режим: название профессии делится по запятым на несколько профессий
+    :type batch: bool
+    """
     file_csv_name = input("Введите название файла: ")
-    prof = input("Введите название профессии: ")
-    data_set = DataSet(csv_dir, prof, file_csv_name)
-    report = Report(data_set)
-    report.generate_pdf(file_name)
+    if batch:
+        professions = [prof.strip() for prof in input("Введите названия профессий через запятую: ").split(",")]
+    else:
+        professions = input("Введите название профессии: ")
+    data_set = DataSet(csv_dir, professions, file_csv_name, use_cache, backend, pipeline, save_years, workers,
+                       heavy_hitters)
+    if heavy_hitters:
+        if data_set.employers is not None:
+            print_heavy_hitters(data_set.employers, 'Работодатели')
+        print_heavy_hitters(data_set.names, 'Названия вакансий')
+    if len(data_set.professions) == 1:
+        Report(data_set).generate_pdf(file_name)
+        return
+    stem, extension = os.path.splitext(file_name)
+    for prof in data_set.professions:
+        Report(data_set, prof).generate_pdf(f"{stem}_{prof}{extension}")
 
 if __name__ == '__main__':
-    create_pdf("csv", "report_multi.pdf")
\ No newline at end of file
+    create_pdf("csv", "report_multi.pdf", batch="--batch" in sys.argv[1:])
\ No newline at end of file
@@ -47,6 +47,9 @@ class ReportPDFUnitTests(TestCase):
     def test_AZN_currency_in_to_rub(self):
         self.assertEqual(Salary(10, 20, 'AZN').to_rub(10 + 20), 1070.4)
 
+    def test_salary_in_rur_converted_once(self):
+        self.assertEqual(Salary('10', '20', 'EUR').salary_in_rur, 898.5)
+
     def test_clean_html_and_spaces_simple(self):
         self.assertEqual(DataSet.delete_html("abc"), "abc")
 
@@ -67,3 +70,22 @@ class ReportPDFUnitTests(TestCase):
 
     def test_clean_html_and_spaces_with_many_spaces_and_tags_and_incorrect_tag(self):
         self.assertEqual(DataSet.delete_html(" <div> abc <iqewqljl> <  div   > abd <i>"), 'abc abd')
+
+    def test_statistic_aggregator_one_pass(self):
+        vacs = [Vacancy({'name': 'Программист', 'salary_from': '10', 'salary_to': '20', 'salary_currency': 'RUR',
+                         'area_name': 'Москва', 'published_at': '2007-12-03T17:34:36+0300'}),
+                Vacancy({'name': 'Аналитик', 'salary_from': '10', 'salary_to': '20', 'salary_currency': 'EUR',
+                         'area_name': 'Москва', 'published_at': '2008-12-03T17:34:36+0300'})]
+        result = StatisticAggregator('Программист').add_all(iter(vacs)).get_report_statistic()
+        self.assertEqual(result, ({2007: 15, 2008: 898}, {2007: 1, 2008: 1}, {2007: 15, 2008: 0}, {2007: 1, 2008: 0},
+                                  {'Москва': 456}, {'Москва': 1.0}))
+
+    def test_statistic_aggregator_many_professions(self):
+        vacs = [Vacancy({'name': 'Аналитик-программист', 'salary_from': '10', 'salary_to': '20', 'salary_currency': 'RUR',
+                         'area_name': 'Москва', 'published_at': '2007-12-03T17:34:36+0300'}),
+                Vacancy({'name': 'Аналитик', 'salary_from': '30', 'salary_to': '40', 'salary_currency': 'RUR',
+                         'area_name': 'Москва', 'published_at': '2008-12-03T17:34:36+0300'})]
+        aggregator = StatisticAggregator(professions=['Аналитик', 'программист']).add_all(iter(vacs))
+        for profession in ('Аналитик', 'программист'):
+            self.assertEqual(aggregator.get_report_statistic(profession),
+                             StatisticAggregator(profession).add_all(iter(vacs)).get_report_statistic())
@@ -2,6 +2,12 @@ from prettytable import PrettyTable, ALL
 import csv
 import re
 import datetime
+import itertools
+from typing import Iterable, Iterator
+import numpy as np
+from VacancyFrame import VacancyFrame
+from CurrencyConverter import CurrencyConverter
+from DatasetCache import DatasetCache
 
 class DataSet:
     """
@@ -10,15 +16,30 @@ class DataSet:
     :param file: Название считываемого файла
     :type file: str
 
-    :param vacancies: Лист вакансий
-    :type vacancies: list
+    :param vacancies: Вакансии в столбцовом виде
+    :type vacancies: VacancyFrame
     """
-    def __init__(self):
+    def __init__(self, use_cache: bool = False):
         """
         Инициализирует объект класса DataSet.
+
+        :param use_cache: Брать ли очищенные данные из кэша рядом с файлом (и сохранять их туда)
+        :type use_cache: bool
         """
         self.file = input("Введите название файла: ")
-        self.vacancies = [Vacancy(vac) for vac in self.csv_filer(*self.csv_reader(self.file))]
+        if use_cache:
+            self.vacancies = DatasetCache(self.file, "clean").load_or_build(self.read_frame)
+        else:
+            self.vacancies = self.read_frame()
+
+    def read_frame(self) -> VacancyFrame:
+        """
+        Разбирает csv-файл в столбцовое хранилище вакансий.
+
+        :return: Вакансии в столбцовом виде
+        :rtype: VacancyFrame
+        """
+        return VacancyFrame.from_dicts(self.csv_filer(*self.csv_reader(self.file)))
 
     @staticmethod
     def delete_html(new_html) -> str:
@@ -57,34 +78,34 @@ class DataSet:
         :param file: Название считываемого файла
         :type file: str
 
-        :return: Заголовки файла и данные о вакансиях
+        :return: Заголовки файла и итератор по строкам с данными о вакансиях
         :rtype: tuple
         """
         reader = csv.reader(open(file, encoding='utf_8_sig'))
-        new_vacancies = [row for row in reader]
-        if len(new_vacancies) == 0:
+        headers = next(reader, None)
+        if headers is None:
             get_exit("Пустой файл")
-        elif len(new_vacancies[1:]) == 0:
+        first_vacancy = next(reader, None)
+        if first_vacancy is None:
             get_exit("Нет данных")
-        else:
-            return new_vacancies[0], new_vacancies[1:]
+        return headers, itertools.chain([first_vacancy], reader)
 
-    def csv_filer(self, headers, vacancies) -> list:
+    def csv_filer(self, headers, vacancies: Iterable[list]) -> Iterator[dict]:
         """
-        Отчищает лист вакансий от пустых элементов, создает словарь вакансий.
+        Отчищает поток вакансий от пустых элементов, создает словарь для каждой вакансии.
 
         :param headers: Заголовки csv файла
         :type headers: list
 
         :param vacancies: Описания вакансий
-        :type vacancies: list
+        :type vacancies: Iterable[list]
 
-        :return: Лист со словарями для каждой вакансии
-        :rtype: list
+        :return: Генератор словарей для каждой вакансии
+        :rtype: Iterator[dict]
         """
-        vacancies_list = list(filter(lambda vac: (len(vac) == len(headers) and vac.count('') == 0), vacancies))
-        vacanies_dictionary = [dict(zip(headers, map(self.delete_html, vac))) for vac in vacancies_list]
-        return vacanies_dictionary
+        for vac in vacancies:
+            if len(vac) == len(headers) and vac.count('') == 0:
+                yield dict(zip(headers, map(self.delete_html, vac)))
 
 class Salary:
     """
@@ -134,7 +155,7 @@ class Salary:
 
     def to_rub(self, salary: float) -> float:
         """
-        Переводит валюту в рубли при помощи словаря currency_to_rub.
+        Переводит валюту в рубли при помощи конвертера валют.
 
         :param salary: Значение оклада
         :type salary: float
@@ -151,7 +172,7 @@ class Salary:
         >>> Salary(10, 20, True, 'AZN').to_rub(10 + 20)
         1070.4
         """
-        return salary * currency_to_rub[self.salary_currency]
+        return converter.to_rub(salary, self.salary_currency)
 
 class Vacancy:
     """
@@ -206,8 +227,11 @@ class InputConect:
     """
     Сбор входных данных, создание таблицы с вакансиями и вывод ее в консоль.
 
-    :param vacs_list: Лист с вакансиями
-    :type vacs_list: list
+    :param vacancies: Вакансии в столбцовом виде
+    :type vacancies: VacancyFrame
+
+    :param vacs_list: Номера отобранных вакансий в порядке вывода
+    :type vacs_list: np.ndarray or list
 
     :param filter_param: Параметр фильтрации
     :type filter_param: str or list
@@ -224,14 +248,15 @@ class InputConect:
     :param output_columns: Требуемые столбцы таблицы
     :type output_columns: list
     """
-    def __init__(self, vacs_list):
+    def __init__(self, vacancies: VacancyFrame):
         """
         Инициализация объекта InputCorrect.
 
-        :param vacs_list: Лист с вакансиями
-        :type vacs_list: list
+        :param vacancies: Вакансии в столбцовом виде
+        :type vacancies: VacancyFrame
         """
-        self.vacs_list = vacs_list
+        self.vacancies = vacancies
+        self.vacs_list = np.arange(len(vacancies))
         self.filter_param = input("Введите параметр фильтрации: ")
         self.sorting_parameter = input("Введите параметр сортировки: ")
         self.reverse_sort_order = input("Обратный порядок сортировки (Да / Нет): ")
@@ -250,10 +275,11 @@ class InputConect:
         if self.filter_param[0] not in list(translation_dict.values()) and len(self.filter_param) == 2:
             get_exit("Параметр поиска некорректен")
 
-        self.vacs_list = self.vacs_list if len(self.filter_param) != 2 else get_filter(self.vacs_list,
+        self.vacs_list = self.vacs_list if len(self.filter_param) != 2 else get_filter(self.vacancies, self.vacs_list,
                                                                                        self.filter_param)
 
-        self.vacs_list = self.vacs_list if len(self.sorting_parameter) == 0 else get_sorting(self.vacs_list,
+        self.vacs_list = self.vacs_list if len(self.sorting_parameter) == 0 else get_sorting(self.vacancies,
+                                                                                             self.vacs_list,
                                                                                              self.sorting_parameter,
                                                                                              self.reverse_sort_order)
         headers = list(reversed_dict.keys())[:-1]
@@ -264,21 +290,21 @@ class InputConect:
         if len(self.vacs_list) == 0:
             get_exit("Ничего не найдено")
 
-        for i in range(len(self.vacs_list)):
-            vacancies = formatter(self.vacs_list[i])
+        new_start, new_end = get_range(self.vacs_list, self.vacancies_range)
+        for i in range(len(self.vacs_list))[new_start:new_end]:
+            vacancies = formatter(Vacancy(self.vacancies.row(self.vacs_list[i])))
             vacancies = list(map(lambda i: f'{i[:100]}...' if len(i) > 100 else i, vacancies))
             vacancies.insert(0, i + 1)
             table.add_row(vacancies)
 
         table.align = 'l'
         table.max_width = 20
-        new_start, new_end = get_range(self.vacs_list, self.vacancies_range)
 
         if self.output_columns[0] != '':
             self.output_columns.insert(0, field_name)
-            print(table.get_string(start=new_start, end=new_end, fields=self.output_columns))
+            print(table.get_string(fields=self.output_columns))
         else:
-            print(table.get_string(start=new_start, end=new_end))
+            print(table.get_string())
 
 translation_dict = {"name": "Название", "description": "Описание","key_skills": "Навыки","experience_id": "Опыт работы",
                     "premium": "Премиум-вакансия", "employer_name": "Компания",
@@ -300,8 +326,7 @@ reversed_dict = {"Название": "name", "Описание": "description",
                  "Название региона": "area_name", "Дата публикации вакансии": "published_at",
                  "Идентификатор валюты оклада": "salary_currency"}
 
-currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76,
-                   "KZT": 0.13, "RUR": 1, "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
+converter = CurrencyConverter()
 
 exp_values = {"noExperience": 0, "between1And3": 1, "between3And6": 2, "moreThan6": 3}
 
@@ -370,40 +395,47 @@ def formatter(new_vacancy: Vacancy) -> list:
             new_vacancy.employer_name, get_salary(new_vacancy.salary), new_vacancy.area_name,
             get_data(new_vacancy.published_at)]
 
-def get_filter(list_vacs, filter_param) -> list:
+def get_filter(vacancies: VacancyFrame, vacs_list, filter_param) -> np.ndarray:
     """
     Функция для фильтрации данных в зависимости от параметра фильтрации.
 
-    :param list_vacs: Лист вакансий
-    :type list_vacs: list
+    :param vacancies: Вакансии в столбцовом виде
+    :type vacancies: VacancyFrame
+
+    :param vacs_list: Номера вакансий, среди которых идет отбор
+    :type vacs_list: np.ndarray
 
     :param filter_param: Параметр фильтрации
     :type filter_param: list
 
-    :return: Отфильтрованный лист вакансий
-    :rtype: list
+    :return: Номера отфильтрованных вакансий
+    :rtype: np.ndarray
     """
     if filter_param[0] == 'Оклад':
-        list_vacancies = list(filter(lambda item: int(item.salary.salary_from) <= int(filter_param[1]) <= int(item.salary.salary_to),
-                                                            list_vacs))
+        salary = int(filter_param[1])
+        mask = (np.trunc(vacancies.salary_from) <= salary) & (salary <= np.trunc(vacancies.salary_to))
+
     elif filter_param[0] == 'Дата публикации вакансии':
-        list_vacancies = list(filter(lambda item: filter_param[1] == datetime.datetime.strptime(item.published_at,
-                         '%Y-%m-%dT%H:%M:%S%z').strftime('%d.%m.%Y'), list_vacs))
+        try:
+            day = (datetime.datetime.strptime(filter_param[1], '%d.%m.%Y') - datetime.datetime(1970, 1, 1)).days
+        except ValueError:
+            day = None
+        local_days = (vacancies.published_at + vacancies.published_offset.astype(np.int64) * 60) // 86400
+        mask = local_days == day
 
     elif filter_param[0] == 'Навыки':
-        list_vacancies = list(filter(lambda vac: all(item in vac.key_skills for item in filter_param[1].split(', ')),
-                                     list_vacs))
+        skills = filter_param[1].split(', ')
+        mask = vacancies.field_mask('key_skills', lambda vac_skills: all(item in vac_skills.split('\n')
+                                                                         for item in skills))
     elif filter_param[0] == 'Идентификатор валюты оклада':
-        list_vacancies = list(filter(lambda item: filter_param[1] == translation_dict[item.salary.salary_currency],
-                                     list_vacs))
+        mask = vacancies.field_mask('salary_currency', lambda currency: filter_param[1] == translation_dict[currency])
 
     elif filter_param[0] == 'Премиум-вакансия' or filter_param[0] == 'Опыт работы':
-        list_vacancies = list(filter(lambda item: filter_param[1] == translation_dict[item.__getattribute__(reversed_dict[filter_param[0]])],
-                                     list_vacs))
+        mask = vacancies.field_mask(reversed_dict[filter_param[0]], lambda value: filter_param[1] == translation_dict[value])
+
     else:
-        list_vacancies=list(filter(lambda vac: filter_param[1] == vac.__getattribute__(reversed_dict[filter_param[0]]),
-                                     list_vacs))
-    return list_vacancies
+        mask = vacancies.field_mask(reversed_dict[filter_param[0]], lambda value: filter_param[1] == value)
+    return vacs_list[mask[vacs_list]]
 
 def get_range(table, vacancies_range) -> tuple:
     """
@@ -427,12 +459,16 @@ def get_range(table, vacancies_range) -> tuple:
         new_start = int(vacancies_range[0]) - 1
     return new_start, new_end
 
-def get_sorting(list_to_sort, sorting_param, reverse_sort_order) -> list:
+def get_sorting(vacancies: VacancyFrame, list_to_sort, sorting_param, reverse_sort_order) -> list:
     """
     Функция для сортировки данных и проверки входных данных для сортировки.
+    Ключи сортировки считаются один раз по столбцам, а не для каждого сравнения.
 
-    :param list_to_sort: Лист вакансий для сортировки
-    :type list_to_sort: list
+    :param vacancies: Вакансии в столбцовом виде
+    :type vacancies: VacancyFrame
+
+    :param list_to_sort: Номера вакансий для сортировки
+    :type list_to_sort: np.ndarray
 
     :param sorting_param: Парметр сортировки
     :type sorting_param: str
@@ -440,7 +476,7 @@ def get_sorting(list_to_sort, sorting_param, reverse_sort_order) -> list:
     :param reverse_sort_order: Обратный порядок сортировки
     :type reverse_sort_order: str
 
-    :return: Отсортированный лист вакансий
+    :return: Отсортированные номера вакансий
     :rtype: list
     """
     if len(sorting_param) == 0:
@@ -453,24 +489,33 @@ def get_sorting(list_to_sort, sorting_param, reverse_sort_order) -> list:
     reverse = True if reverse_sort_order == "Да" else False
 
     if sorting_param == 'Навыки':
-        return sorted(list_to_sort, key=lambda item: len(item.key_skills), reverse=reverse)
+        keys = vacancies.field_lookup('key_skills', lambda skills: len(skills.split('\n')), np.int64)
 
     elif sorting_param == 'Оклад':
-        return sorted(list_to_sort, key=lambda item: item.salary.to_RUB(float(item.salary.salary_from) + float(item.salary.salary_to)) / 2, reverse=reverse)
+        keys = vacancies.middle_salary_in_rub(converter)
 
     elif sorting_param == 'Опыт работы':
-        return sorted(list_to_sort, key=lambda item: exp_values[item.experience_id], reverse=reverse)
+        keys = vacancies.field_lookup('experience_id', exp_values.__getitem__, np.int64)
+
+    elif reversed_dict[sorting_param] == 'published_at':
+        keys = vacancies.published_at
 
     else:
-        return sorted(list_to_sort,key=lambda item: item.__getattribute__(reversed_dict[sorting_param]),reverse=reverse)
+        keys = vacancies.field_lookup(reversed_dict[sorting_param], str, object)
 
-def create_table() -> None:
+    keys = keys.tolist()
+    return sorted(list_to_sort, key=lambda item: keys[item], reverse=reverse)
+
+def create_table(use_cache: bool = False) -> None:
     """
     Функция для создания и вывода таблицы PrettyTable.
 
+    :param use_cache: Использовать ли кэш разобранного файла
+    :type use_cache: bool
+
     :return: Вывод таблицы в консоль
     """
-    new_data = DataSet()
+    new_data = DataSet(use_cache)
     result = InputConect(new_data.vacancies)
     result.print_vacancies()
 
@@ -0,0 +1,341 @@
+import hashlib
+import json
+import operator
+import os
+from typing import Callable, Dict, Iterable, List
+import numpy as np
+from DatasetCache import DatasetCache
+from GroupBy import GroupBy
+from VacancyFrame import VacancyFrame
+
+CUBE_FIELDS = ('year', 'month', 'area_name', 'salary_currency', 'experience_id')
+TOTALS = ('count', 'salary_count', 'sum', 'square_sum', 'min', 'max')
+
+
+class SalaryCube:
+    """
+    Материализованный куб зарплат: для каждого встретившегося сочетания значений измерений
+    (год, месяц, город, валюта, опыт работы) хранятся количество вакансий, количество известных
+    зарплат, сумма зарплат в рублях, сумма их квадратов, минимум и максимум. Ячеек в кубе на порядки
+    меньше, чем строк, поэтому разрезы по любым измерениям получаются сверткой (roll_up) за миллисекунды.
+
+    :param fields: Измерения куба
+    :type fields: tuple
+
+    :param keys: Значения каждого измерения
+    :type keys: list
+
+    :param codes: Коды значений измерений по ячейкам (ячейка x измерение)
+    :type codes: np.ndarray
+
+    :param totals: Итоги по ячейкам: count, salary_count, sum, square_sum, min, max
+    :type totals: dict
+
+    >>> cube = SalaryCube.from_columns({'year': [2007, 2007, 2008], 'area_name': ['Москва', 'Казань', 'Москва']},
+    ...                                np.array([10.0, 30.0, np.nan]))
+    >>> cube.roll_up('year').count(), cube.roll_up('year').mean(), cube.roll_up('area_name').sum()
+    ({2007: 2, 2008: 1}, {2007: 20.0, 2008: nan}, {'Москва': 10.0, 'Казань': 30.0})
+    >>> cube.roll_up('year', 'area_name', where={'area_name': 'Москва'}).count()
+    {(2007, 'Москва'): 1, (2008, 'Москва'): 1}
+    >>> cube.roll_up('year').std()[2007], cube.total('count'), cube.roll_up('year').to_group_by().groups
+    (10.0, 3, {2007: [2, 40.0, 10.0, 30.0]})
+    """
+    def __init__(self, fields: Iterable[str], keys: List[list], codes: np.ndarray, totals: Dict[str, np.ndarray]):
+        """
+        Инициализирует объект SalaryCube из готовых массивов.
+
+        :param fields: Измерения куба
+        :type fields: Iterable[str]
+
+        :param keys: Значения каждого измерения
+        :type keys: list
+
+        :param codes: Коды значений измерений по ячейкам
+        :type codes: np.ndarray
+
+        :param totals: Итоги по ячейкам
+        :type totals: dict
+        """
+        self.fields = tuple(fields)
+        self.keys = [list(field_keys) for field_keys in keys]
+        self.codes = codes
+        self.totals = totals
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @staticmethod
+    def combine(fields: Iterable[str], keys: List[list], codes: List[np.ndarray],
+                totals: Dict[str, np.ndarray]) -> 'SalaryCube':
+        """
+        Складывает итоги строк (или ячеек другого куба) с одинаковыми сочетаниями кодов измерений.
+
+        :param fields: Измерения
+        :type fields: Iterable[str]
+
+        :param keys: Значения каждого измерения
+        :type keys: list
+
+        :param codes: Коды значений по строкам для каждого измерения
+        :type codes: list
+
+        :param totals: Итоги по строкам
+        :type totals: dict
+
+        :rtype: SalaryCube
+        """
+        dims = [max(len(field_keys), 1) for field_keys in keys]
+        if len(dims) == 0:
+            cells, inverse = np.zeros(1, dtype=np.int64), np.zeros(len(totals['count']), dtype=np.int64)
+        else:
+            cells, inverse = np.unique(np.ravel_multi_index(codes, dims), return_inverse=True)
+        size = len(cells)
+        combined = {name: np.bincount(inverse, weights=totals[name], minlength=size)
+                    for name in ('count', 'salary_count', 'sum', 'square_sum')}
+        for name in ('count', 'salary_count'):
+            combined[name] = combined[name].astype(np.int64)
+        combined['min'] = np.full(size, np.inf)
+        combined['max'] = np.full(size, -np.inf)
+        np.fmin.at(combined['min'], inverse, totals['min'])
+        np.fmax.at(combined['max'], inverse, totals['max'])
+        empty = combined['salary_count'] == 0
+        combined['min'][empty] = np.nan
+        combined['max'][empty] = np.nan
+        cell_codes = np.stack(np.unravel_index(cells, dims), axis=1) if dims else np.zeros((size, 0))
+        return SalaryCube(fields, keys, cell_codes.astype(np.int32), combined)
+
+    @staticmethod
+    def from_codes(fields: Iterable[str], keys: List[list], codes: List[np.ndarray],
+                   salaries: np.ndarray) -> 'SalaryCube':
+        """
+        Строит куб по кодам измерений и зарплатам строк (NaN - зарплата неизвестна).
+
+        :param fields: Измерения
+        :type fields: Iterable[str]
+
+        :param keys: Значения каждого измерения
+        :type keys: list
+
+        :param codes: Коды значений по строкам для каждого измерения
+        :type codes: list
+
+        :param salaries: Зарплаты в рублях по строкам
+        :type salaries: np.ndarray
+
+        :rtype: SalaryCube
+        """
+        salaries = np.asarray(salaries, dtype=np.float64)
+        known = ~np.isnan(salaries)
+        values = np.where(known, salaries, 0)
+        return SalaryCube.combine(fields, keys, codes, {'count': np.ones(len(salaries)), 'salary_count': known,
+                                                        'sum': values, 'square_sum': values * values,
+                                                        'min': salaries, 'max': salaries})
+
+    @staticmethod
+    def from_columns(columns: Dict[str, Iterable], salaries: np.ndarray) -> 'SalaryCube':
+        """
+        Строит куб по столбцам значений измерений (например, прочитанным из SQL-таблицы).
+
+        :param columns: Значения измерений по строкам: измерение/последовательность значений
+        :type columns: dict
+
+        :param salaries: Зарплаты в рублях по строкам (NaN - зарплата неизвестна)
+        :type salaries: np.ndarray
+
+        :rtype: SalaryCube
+        """
+        keys, codes = [], []
+        for values in columns.values():
+            values = list(values)
+            field_keys = list(dict.fromkeys(values))
+            index = {key: code for code, key in enumerate(field_keys)}
+            keys.append(field_keys)
+            codes.append(np.fromiter((index[value] for value in values), dtype=np.int64, count=len(values)))
+        return SalaryCube.from_codes(columns, keys, codes, salaries)
+
+    @staticmethod
+    def from_frame(frame: VacancyFrame, salaries: np.ndarray, mask: np.ndarray = None) -> 'SalaryCube':
+        """
+        Строит куб по вакансиям VacancyFrame. Измерения, которых нет в файле, пропускаются.
+
+        :param frame: Вакансии в столбцовом виде
+        :type frame: VacancyFrame
+
+        :param salaries: Зарплаты в рублях по строкам
+        :type salaries: np.ndarray
+
+        :param mask: Учитываемые строки (например, вакансии одной профессии)
+        :type mask: np.ndarray
+
+        :rtype: SalaryCube
+        """
+        fields = [field for field in CUBE_FIELDS if field in ('year', 'month') or field in frame.categorical]
+        keys, codes = [], []
+        for field in fields:
+            field_keys, field_codes = frame.field_codes(field)
+            keys.append(field_keys)
+            codes.append(field_codes if mask is None else field_codes[mask])
+        return SalaryCube.from_codes(fields, keys, codes, salaries if mask is None else salaries[mask])
+
+    def roll_up(self, *fields: str, where: dict = None) -> 'SalaryCube':
+        """
+        Сворачивает куб до указанных измерений, складывая итоги остальных.
+
+        :param fields: Оставляемые измерения
+        :type fields: str
+
+        :param where: Условия на значения измерений: измерение/значение, набор значений или функция от значения
+        :type where: dict
+
+        :rtype: SalaryCube
+        """
+        mask = None
+        for field, condition in (where or {}).items():
+            field_keys = self.keys[self.fields.index(field)]
+            if callable(condition):
+                allowed = [condition(key) for key in field_keys]
+            elif isinstance(condition, (list, tuple, set, frozenset)):
+                allowed = [key in condition for key in field_keys]
+            else:
+                allowed = [key == condition for key in field_keys]
+            field_mask = np.array(allowed, dtype=bool)[self.codes[:, self.fields.index(field)]]
+            mask = field_mask if mask is None else mask & field_mask
+        indices = [self.fields.index(field) for field in fields]
+        codes, totals = self.codes, self.totals
+        if mask is not None:
+            codes, totals = codes[mask], {name: values[mask] for name, values in totals.items()}
+        return SalaryCube.combine(fields, [self.keys[i] for i in indices], [codes[:, i] for i in indices], totals)
+
+    def get_keys(self) -> list:
+        """
+        Ключи ячеек: значение измерения (для одного измерения) или кортеж значений.
+
+        :rtype: list
+        """
+        if len(self.fields) == 1:
+            return [self.keys[0][code] for code in self.codes[:, 0].tolist()]
+        return [tuple(self.keys[i][code] for i, code in enumerate(codes)) for codes in self.codes.tolist()]
+
+    def get_total(self, name: str) -> dict:
+        """
+        Итог по ячейкам: ключ/итог.
+
+        :param name: Название итога (count, salary_count, sum, square_sum, min или max)
+        :type name: str
+
+        :rtype: dict
+        """
+        return dict(zip(self.get_keys(), self.totals[name].tolist()))
+
+    def total(self, name: str) -> float:
+        """
+        Итог по всему кубу (для count и sum).
+
+        :param name: Название итога
+        :type name: str
+        """
+        return self.totals[name].sum().item()
+
+    def count(self) -> dict:
+        """
+        Количество вакансий по ячейкам.
+
+        :rtype: dict
+        """
+        return self.get_total('count')
+
+    def sum(self) -> dict:
+        """
+        Сумма зарплат по ячейкам.
+
+        :rtype: dict
+        """
+        return self.get_total('sum')
+
+    def mean(self) -> dict:
+        """
+        Средняя зарплата по ячейкам (NaN, если зарплаты неизвестны).
+
+        :rtype: dict
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.totals['sum'] / self.totals['salary_count']
+        return dict(zip(self.get_keys(), means.tolist()))
+
+    def std(self) -> dict:
+        """
+        Стандартное отклонение зарплат по ячейкам.
+
+        :rtype: dict
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.totals['sum'] / self.totals['salary_count']
+            variances = self.totals['square_sum'] / self.totals['salary_count'] - means * means
+        return dict(zip(self.get_keys(), np.sqrt(np.maximum(variances, 0)).tolist()))
+
+    def to_group_by(self) -> GroupBy:
+        """
+        Итоги куба в виде GroupBy (количество известных зарплат, сумма, минимум, максимум по ключам).
+
+        :rtype: GroupBy
+        """
+        group = GroupBy(operator.attrgetter(*self.fields))
+        for key, count, total, low, high in zip(self.get_keys(), *(self.totals[name].tolist() for name in
+                                                                   ('salary_count', 'sum', 'min', 'max'))):
+            if count != 0:
+                group.merge_group(key, [count, total, low, high])
+        return group
+
+    def save(self, directory: str) -> None:
+        """
+        Сохраняет куб в папку: коды и итоги - в .npy, измерения и их значения - в cube.json.
+
+        :param directory: Папка
+        :type directory: str
+        """
+        np.save(os.path.join(directory, 'codes.npy'), self.codes)
+        for name in TOTALS:
+            np.save(os.path.join(directory, f'{name}.npy'), self.totals[name])
+        with open(os.path.join(directory, 'cube.json'), 'w', encoding='utf-8') as file:
+            json.dump({'fields': self.fields, 'keys': self.keys}, file, ensure_ascii=False)
+
+    @staticmethod
+    def load(directory: str) -> 'SalaryCube':
+        """
+        Загружает куб из папки.
+
+        :param directory: Папка
+        :type directory: str
+
+        :rtype: SalaryCube
+        """
+        with open(os.path.join(directory, 'cube.json'), encoding='utf-8') as file:
+            data = json.load(file)
+        totals = {name: np.load(os.path.join(directory, f'{name}.npy')) for name in TOTALS}
+        return SalaryCube(data['fields'], data['keys'], np.load(os.path.join(directory, 'codes.npy')), totals)
+
+
+def get_salary_cube(file_name: str, build: Callable[[], SalaryCube], kind: str, profession: str = None) -> SalaryCube:
+    """
+    Загружает куб зарплат из кэша рядом с файлом данных или строит его и сохраняет в кэш.
+    Куб профессии хранится отдельной записью. Зарплаты в кубе уже переведены в рубли, поэтому
+    kind должен различать способы подсчета зарплат.
+
+    :param file_name: Название файла данных
+    :type file_name: str
+
+    :param build: Функция построения куба (вызывается, только если куба нет в кэше)
+    :type build: Callable
+
+    :param kind: Вид данных и подсчета зарплат (clean, raw и т.д.)
+    :type kind: str
+
+    :param profession: Профессия (None - куб по всем вакансиям)
+    :type profession: str
+
+    :return: Куб зарплат
+    :rtype: SalaryCube
+    """
+    if profession is not None:
+        kind = f"{kind}-{hashlib.blake2b(profession.encode('utf-8'), digest_size=8).hexdigest()}"
+    return DatasetCache(file_name, f"cube-{kind}", SalaryCube.load).load_or_build(build)
@@ -0,0 +1,33 @@
+import tempfile
+from unittest import TestCase
+from SalaryCube import *
+
+class SalaryCubeUnitTests(TestCase):
+    frame = VacancyFrame.from_rows(['salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at'],
+                                   [['10', '20', 'RUR', 'Москва', '2007-12-03T17:34:36+0300'],
+                                    ['30', '40', 'RUR', 'Казань', '2007-12-31T23:34:36+0300'],
+                                    ['50', '60', 'USD', 'Москва', '2008-01-03T17:34:36+0300'],
+                                    ['70', '80', 'RUR', 'Москва', '2008-02-03T17:34:36+0300']])
+    salaries = np.array([15.0, 35.0, 55.0, 75.0])
+
+    def test_roll_up_same_as_group_by(self):
+        cube = SalaryCube.from_frame(self.frame, self.salaries)
+        for field in ('year', 'month', 'area_name', 'salary_currency'):
+            self.assertEqual(cube.roll_up(field).to_group_by().groups, self.frame.group_by(field, self.salaries).groups)
+
+    def test_roll_up_with_where(self):
+        cube = SalaryCube.from_frame(self.frame, self.salaries)
+        where = {'area_name': {'Москва'}, 'salary_currency': 'RUR', 'month': lambda month: month < 12}
+        self.assertEqual(cube.roll_up('year', where=where).count(), {2008: 1})
+
+    def test_month_by_local_time(self):
+        cube = SalaryCube.from_frame(self.frame, self.salaries)
+        self.assertEqual(cube.roll_up('month').count(), {1: 1, 2: 1, 12: 2})
+
+    def test_save_and_load(self):
+        cube = SalaryCube.from_frame(self.frame, self.salaries, np.array([True, False, True, True]))
+        with tempfile.TemporaryDirectory() as directory:
+            cube.save(directory)
+            loaded = SalaryCube.load(directory)
+        self.assertEqual(loaded.roll_up('area_name', 'year').sum(), cube.roll_up('area_name', 'year').sum())
+        self.assertEqual(loaded.total('count'), 3)
@@ -0,0 +1,220 @@
+import itertools
+from collections import Counter
+from typing import Iterable, List
+import numpy as np
+from HeavyHitters import SpaceSaving
+from VacancyFrame import VacancyFrame
+
+SKILL_CAPACITY = 1000
+PAIR_CAPACITY = 10000
+SKILL_BUFFER_SIZE = 10000
+
+
+class SkillStats:
+    """
+    Частоты навыков (key_skills) за один проход по вакансиям. Каждый навык хранится строкой один раз
+    в словаре, в счетчиках используются его номера. Частоты считаются по группам: всего (all), по годам
+    (year), по профессиям (profession) и по парам навыков одной вакансии (pair, ключ - номера двух
+    навыков по возрастанию). Для каждой группы хранится счетчик Space-Saving фиксированного размера
+    (HeavyHitters.SpaceSaving, заведен для top-k навыков и потом используется отчетами для городов,
+    работодателей и названий), поэтому память не растет с количеством вакансий. Частоты копятся в Counter
+    по пачкам из SKILL_BUFFER_SIZE вакансий и добавляются в счетчики пачкой.
+
+    :param skills: Навыки по номерам
+    :type skills: list
+
+    :param skill_ids: Номера навыков
+    :type skill_ids: dict
+
+    :param counters: Счетчики Space-Saving по группам: (вид группы, ключ)/счетчик
+    :type counters: dict
+
+    >>> stats = SkillStats()
+    >>> stats.add("SQL\\nExcel", 2007, ["Аналитик"]); stats.add("SQL\\nPython", 2008, [])
+    >>> stats.top("year", 2007), stats.top("all"), stats.top_pairs()
+    ([('SQL', 1), ('Excel', 1)], [('SQL', 2), ('Excel', 1), ('Python', 1)], [(('SQL', 'Excel'), 1), (('SQL', 'Python'), 1)])
+    """
+    def __init__(self, capacity: int = SKILL_CAPACITY, pair_capacity: int = PAIR_CAPACITY):
+        """
+        Инициализирует пустой объект SkillStats.
+
+        :param capacity: Размер счетчика навыков каждой группы
+        :type capacity: int
+
+        :param pair_capacity: Размер счетчика пар навыков
+        :type pair_capacity: int
+        """
+        self.capacity = capacity
+        self.pair_capacity = pair_capacity
+        self.skills = []
+        self.skill_ids = {}
+        self.counters = {}
+        self.pending = {}
+        self.buffered = 0
+
+    def get_id(self, skill: str) -> int:
+        """
+        Номер навыка (новый навык добавляется в словарь).
+
+        :param skill: Навык
+        :type skill: str
+
+        :rtype: int
+        """
+        skill_id = self.skill_ids.get(skill)
+        if skill_id is None:
+            skill_id = self.skill_ids[skill] = len(self.skills)
+            self.skills.append(skill)
+        return skill_id
+
+    def get_ids(self, key_skills: str) -> List[int]:
+        """
+        Номера навыков вакансии по возрастанию (новые навыки добавляются в словарь).
+
+        :param key_skills: Навыки через перевод строки
+        :type key_skills: str
+
+        :rtype: list
+
+        >>> SkillStats().get_ids("SQL\\nExcel\\nSQL\\n")
+        [0, 1]
+        """
+        return sorted({self.get_id(skill) for skill in key_skills.split('\n') if skill})
+
+    def add(self, key_skills: str, year: int, professions: Iterable[str] = ()) -> None:
+        """
+        Учитывает навыки одной вакансии.
+
+        :param key_skills: Навыки через перевод строки
+        :type key_skills: str
+
+        :param year: Год публикации
+        :type year: int
+
+        :param professions: Профессии, найденные в названии вакансии
+        :type professions: Iterable[str]
+        """
+        ids = self.get_ids(key_skills)
+        if not ids:
+            return
+        pending = self.pending
+        for group in itertools.chain((("all", None), ("year", year)),
+                                     (("profession", profession) for profession in professions)):
+            counter = pending.get(group)
+            if counter is None:
+                counter = pending[group] = Counter()
+            counter.update(ids)
+        if len(ids) > 1:
+            pairs = pending.get(("pair", None))
+            if pairs is None:
+                pairs = pending[("pair", None)] = Counter()
+            pairs.update(itertools.combinations(ids, 2))
+        self.buffered += 1
+        if self.buffered == SKILL_BUFFER_SIZE:
+            self.flush()
+
+    def add_frame(self, frame: VacancyFrame, profession_masks: dict) -> 'SkillStats':
+        """
+        Учитывает навыки всех вакансий VacancyFrame.
+
+        :param frame: Вакансии в столбцовом виде
+        :type frame: VacancyFrame
+
+        :param profession_masks: Словарь профессия/булева маска вакансий профессии
+        :type profession_masks: dict
+
+        :return: Этот же объект SkillStats
+        :rtype: SkillStats
+        """
+        key_skills = frame.text['key_skills']
+        professions = list(profession_masks)
+        masks = np.column_stack(list(profession_masks.values())) if professions else np.zeros((len(frame), 0), bool)
+        for i, (year, row) in enumerate(zip(frame.year.tolist(), masks.tolist())):
+            self.add(key_skills[i], year, itertools.compress(professions, row))
+        return self
+
+    def flush(self) -> None:
+        """
+        Добавляет накопленные частоты в счетчики Space-Saving.
+        """
+        for group, key_to_count in self.pending.items():
+            counter = self.counters.get(group)
+            if counter is None:
+                capacity = self.pair_capacity if group[0] == "pair" else self.capacity
+                counter = self.counters[group] = SpaceSaving(capacity)
+            counter.add_counts(key_to_count)
+        self.pending, self.buffered = {}, 0
+
+    def merge(self, other: 'SkillStats') -> 'SkillStats':
+        """
+        Добавляет статистику другой части потока: номера ее навыков переводятся в номера этого словаря.
+
+        :param other: Статистика навыков
+        :type other: SkillStats
+
+        :return: Этот же объект SkillStats
+        :rtype: SkillStats
+        """
+        self.flush()
+        other.flush()
+        ids = [self.get_id(skill) for skill in other.skills]
+
+        def translate_pair(pair: tuple) -> tuple:
+            return tuple(sorted((ids[pair[0]], ids[pair[1]])))
+
+        for group, counter in other.counters.items():
+            counter = counter.map_keys(translate_pair if group[0] == "pair" else ids.__getitem__)
+            if group in self.counters:
+                self.counters[group].merge(counter)
+            else:
+                self.counters[group] = counter
+        return self
+
+    def top(self, kind: str, key=None, count: int = 10) -> List[tuple]:
+        """
+        Самые частые навыки группы.
+
+        :param kind: Вид группы: all, year или profession
+        :type kind: str
+
+        :param key: Год или профессия
+        :type key: int or str
+
+        :param count: Количество навыков
+        :type count: int
+
+        :return: Пары навык/частота по убыванию частоты
+        :rtype: list
+        """
+        self.flush()
+        counter = self.counters.get((kind, key))
+        return [(self.skills[skill_id], frequency) for skill_id, frequency in counter.top(count)] if counter else []
+
+    def top_pairs(self, count: int = 10) -> List[tuple]:
+        """
+        Самые частые пары навыков, указанных в одной вакансии.
+
+        :param count: Количество пар
+        :type count: int
+
+        :return: Пары (навык, навык)/частота по убыванию частоты
+        :rtype: list
+        """
+        self.flush()
+        counter = self.counters.get(("pair", None))
+        if not counter:
+            return []
+        return [((self.skills[first], self.skills[second]), frequency)
+                for (first, second), frequency in counter.top(count)]
+
+    def keys(self, kind: str) -> list:
+        """
+        Ключи групп одного вида (годы или профессии).
+
+        :param kind: Вид группы
+        :type kind: str
+
+        :rtype: list
+        """
+        self.flush()
+        return [key for group_kind, key in self.counters if group_kind == kind]
@@ -0,0 +1,29 @@
+from unittest import TestCase
+from SkillStats import *
+
+class SkillStatsUnitTests(TestCase):
+    def test_top_by_year_and_profession(self):
+        stats = SkillStats()
+        stats.add("SQL\nExcel\nSQL", 2007, ["Аналитик"])
+        stats.add("SQL\nPython", 2007, [])
+        stats.add("Excel", 2008, ["Аналитик"])
+        self.assertEqual(stats.top("year", 2007), [('SQL', 2), ('Excel', 1), ('Python', 1)])
+        self.assertEqual(stats.top("profession", "Аналитик"), [('Excel', 2), ('SQL', 1)])
+        self.assertEqual(sorted(stats.keys("year")), [2007, 2008])
+
+    def test_skills_interned_once(self):
+        stats = SkillStats()
+        for _ in range(3):
+            stats.add("SQL\nExcel", 2007)
+        self.assertEqual(stats.skills, ['SQL', 'Excel'])
+        self.assertEqual(stats.top_pairs(), [(('SQL', 'Excel'), 3)])
+
+    def test_merge_translates_skill_ids(self):
+        first, second = SkillStats(), SkillStats()
+        first.add("SQL\nExcel", 2007)
+        second.add("Python\nSQL", 2007)
+        second.add("Excel\nPython", 2008)
+        merged = first.merge(second)
+        self.assertEqual(merged.top("all"), [('SQL', 2), ('Excel', 2), ('Python', 2)])
+        self.assertEqual(sorted(merged.top_pairs()), [(('Excel', 'Python'), 1), (('SQL', 'Excel'), 1),
+                                                      (('SQL', 'Python'), 1)])
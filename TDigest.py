@@ -0,0 +1,151 @@
+import math
+from typing import Iterable
+import numpy as np
+
+
+class TDigest:
+    """
+    Скетч t-digest для потоковой оценки квантилей (медиана, 90-й перцентиль) без хранения всех значений.
+    Значения копятся в буфере и периодически сжимаются в центроиды (среднее, вес): соседние центроиды
+    объединяются, пока укладываются в одну единицу шкалы k = compression / (2pi) * asin(2q - 1),
+    поэтому у краев распределения центроиды мелкие и хвостовые квантили точнее.
+    Скетчи объединяются (merge), так что частичные скетчи обработчиков можно сложить в родительском процессе.
+
+    :param compression: Параметр сжатия (примерно вдвое больше количества центроидов)
+    :type compression: int
+
+    :param buffer_size: Размер буфера несжатых значений
+    :type buffer_size: int
+
+    :param means: Средние центроидов по возрастанию
+    :type means: np.ndarray
+
+    :param weights: Веса центроидов
+    :type weights: np.ndarray
+
+    :param min: Наименьшее значение
+    :type min: float
+
+    :param max: Наибольшее значение
+    :type max: float
+
+    >>> digest = TDigest()
+    >>> digest.add_many(range(1, 100))
+    >>> digest.quantile(0.5), digest.quantile(0), digest.quantile(1)
+    (50.0, 1.0, 99.0)
+    >>> TDigest().quantile(0.5)
+    nan
+    """
+    def __init__(self, compression: int = 200, buffer_size: int = None):
+        """
+        Инициализирует пустой TDigest.
+
+        :param compression: Параметр сжатия
+        :type compression: int
+
+        :param buffer_size: Размер буфера несжатых значений (по умолчанию - 5 * compression)
+        :type buffer_size: int
+        """
+        self.compression = compression
+        self.buffer_size = buffer_size or 5 * compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.buffer = []
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __getstate__(self) -> dict:
+        self.compress()
+        return self.__dict__
+
+    def __len__(self) -> int:
+        return int(self.weights.sum()) + len(self.buffer)
+
+    def add(self, value: float) -> None:
+        """
+        Добавляет одно значение.
+
+        :param value: Значение
+        :type value: float
+        """
+        self.buffer.append(value)
+        if len(self.buffer) >= self.buffer_size:
+            self.compress()
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """
+        Добавляет сразу много значений одним сжатием.
+
+        :param values: Значения
+        :type values: Iterable[float]
+        """
+        values = np.asarray(values if isinstance(values, (np.ndarray, list)) else list(values), dtype=float)
+        self.compress(values, np.ones(len(values)))
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """
+        Добавляет к скетчу другой скетч.
+
+        :param other: Другой скетч
+        :type other: TDigest
+
+        :return: Этот же объект TDigest
+        :rtype: TDigest
+        """
+        other.compress()
+        self.compress(other.means, other.weights)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def compress(self, means: np.ndarray = None, weights: np.ndarray = None) -> None:
+        """
+        Сжимает буфер, центроиды и (если переданы) новые центроиды в один отсортированный набор центроидов.
+
+        :param means: Средние новых центроидов
+        :type means: np.ndarray
+
+        :param weights: Веса новых центроидов
+        :type weights: np.ndarray
+        """
+        new_means, new_weights = [self.means], [self.weights]
+        if self.buffer:
+            new_means.append(np.array(self.buffer, dtype=float))
+            new_weights.append(np.ones(len(self.buffer)))
+            self.buffer = []
+        if means is not None and len(means) != 0:
+            new_means.append(np.asarray(means, dtype=float))
+            new_weights.append(np.asarray(weights, dtype=float))
+        if len(new_means) == 1:
+            return
+        means, weights = np.concatenate(new_means), np.concatenate(new_weights)
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        self.min = min(self.min, float(means[0]))
+        self.max = max(self.max, float(means[-1]))
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        boundaries = np.empty(len(k), dtype=bool)
+        boundaries[0] = True
+        np.not_equal(k[1:], k[:-1], out=boundaries[1:])
+        starts = np.flatnonzero(boundaries)
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> float:
+        """
+        Оценка квантиля: линейная интерполяция между центрами центроидов, крайние значения точные.
+
+        :param q: Уровень квантиля от 0 до 1
+        :type q: float
+
+        :return: Оценка квантиля (NaN для пустого скетча)
+        :rtype: float
+        """
+        self.compress()
+        if len(self.means) == 0:
+            return math.nan
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * total, np.r_[0, centers, total], np.r_[self.min, self.means, self.max]))
@@ -0,0 +1,33 @@
+from unittest import TestCase
+import pickle
+import numpy as np
+from TDigest import *
+
+class TDigestUnitTests(TestCase):
+    def test_quantile_of_empty_digest(self):
+        self.assertTrue(np.isnan(TDigest().quantile(0.5)))
+
+    def test_quantile_of_one_value(self):
+        digest = TDigest()
+        digest.add(42.0)
+        self.assertEqual((digest.quantile(0.5), digest.quantile(0.9)), (42.0, 42.0))
+
+    def test_median_and_p90_rank_error(self):
+        values = np.random.default_rng(1).lognormal(11, 0.7, 100000)
+        digest = TDigest()
+        for value in values.tolist():
+            digest.add(value)
+        values.sort()
+        for q in (0.5, 0.9):
+            self.assertLess(abs(np.searchsorted(values, digest.quantile(q)) / len(values) - q), 0.005)
+
+    def test_merge_of_pickled_partials(self):
+        values = np.random.default_rng(2).uniform(0, 1000, 50000)
+        merged = TDigest()
+        for part in np.array_split(values, 4):
+            digest = TDigest()
+            digest.add_many(part)
+            merged.merge(pickle.loads(pickle.dumps(digest)))
+        self.assertEqual(len(merged), len(values))
+        self.assertEqual((merged.min, merged.max), (values.min(), values.max()))
+        self.assertAlmostEqual(merged.quantile(0.5), np.median(values), delta=10)
@@ -0,0 +1,601 @@
+import datetime
+import json
+import os
+from typing import Callable, Iterable, Iterator, List
+import numpy as np
+from AhoCorasick import AhoCorasick
+from GroupBy import GroupBy
+
+TEXT_COLUMNS = ('description', 'key_skills')
+NUMERIC_COLUMNS = ('salary_from', 'salary_to', 'published_at')
+
+
+class CategoricalColumn:
+    """
+    Категориальный столбец: каждая строка хранится целочисленным кодом, уникальные значения - один раз.
+
+    :param codes: Коды значений по строкам
+    :type codes: np.ndarray
+
+    :param categories: Уникальные значения в порядке первого появления
+    :type categories: list
+    """
+    def __init__(self, codes: np.ndarray, categories: list):
+        """
+        Инициализирует объект CategoricalColumn.
+
+        :param codes: Коды значений по строкам
+        :type codes: np.ndarray
+
+        :param categories: Уникальные значения в порядке первого появления
+        :type categories: list
+        """
+        self.codes = codes
+        self.categories = categories
+
+    @staticmethod
+    def encode(values: Iterable[str]) -> 'CategoricalColumn':
+        """
+        Кодирует последовательность строк в категориальный столбец.
+
+        :param values: Значения столбца
+        :type values: Iterable[str]
+
+        :return: Категориальный столбец
+        :rtype: CategoricalColumn
+
+        >>> column = CategoricalColumn.encode(['RUR', 'USD', 'RUR'])
+        >>> column.codes.tolist(), column.categories
+        ([0, 1, 0], ['RUR', 'USD'])
+        """
+        value_to_code = {}
+        codes = [value_to_code.setdefault(value, len(value_to_code)) for value in values]
+        return CategoricalColumn(np.array(codes, dtype=np.int32), list(value_to_code))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def get(self, index: int) -> str:
+        """
+        Возвращает значение столбца в строке index.
+
+        :param index: Номер строки
+        :type index: int
+
+        :return: Значение
+        :rtype: str
+        """
+        return self.categories[self.codes[index]]
+
+    def lookup(self, mapping: Callable, dtype=np.float64) -> np.ndarray:
+        """
+        Вычисляет mapping один раз для каждой категории и раскладывает результат по строкам.
+
+        :param mapping: Функция от значения категории
+        :type mapping: Callable
+
+        :param dtype: Тип результата
+        :type dtype: type
+
+        :return: Массив значений по строкам
+        :rtype: np.ndarray
+
+        >>> CategoricalColumn.encode(['a', 'bb', 'a']).lookup(len, np.int64).tolist()
+        [1, 2, 1]
+        """
+        table = np.array([mapping(category) for category in self.categories], dtype=dtype)
+        return table[self.codes] if len(table) != 0 else np.zeros(0, dtype=dtype)
+
+    def mask(self, predicate: Callable) -> np.ndarray:
+        """
+        Булева маска строк, значение которых удовлетворяет predicate.
+
+        :param predicate: Условие на значение категории
+        :type predicate: Callable
+
+        :return: Булева маска
+        :rtype: np.ndarray
+        """
+        return self.lookup(predicate, bool)
+
+
+class TextColumn:
+    """
+    Текстовый столбец: все строки хранятся одним массивом байт utf-8 и массивом смещений,
+    поэтому столбец можно сохранить на диск и отобразить в память без разбора.
+
+    :param blob: Байты всех строк подряд
+    :type blob: np.ndarray
+
+    :param offsets: Смещения начала каждой строки (последнее - конец массива)
+    :type offsets: np.ndarray
+    """
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        """
+        Инициализирует объект TextColumn.
+
+        :param blob: Байты всех строк подряд
+        :type blob: np.ndarray
+
+        :param offsets: Смещения начала каждой строки (последнее - конец массива)
+        :type offsets: np.ndarray
+        """
+        self.blob = blob
+        self.offsets = offsets
+
+    @staticmethod
+    def encode(values: Iterable[str]) -> 'TextColumn':
+        """
+        Кодирует последовательность строк в текстовый столбец.
+
+        :param values: Значения столбца
+        :type values: Iterable[str]
+
+        :return: Текстовый столбец
+        :rtype: TextColumn
+
+        >>> column = TextColumn.encode(['abc', '', 'Навыки'])
+        >>> len(column), column[2], list(column)
+        (3, 'Навыки', ['abc', '', 'Навыки'])
+        """
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return TextColumn(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        data = bytes(self.blob)
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode('utf-8')
+
+
+class VacancyFrame:
+    """
+    Столбцовое хранилище вакансий на массивах NumPy вместо списков объектов Vacancy/Salary.
+
+    :param salary_from: Нижние границы вилки оклада
+    :type salary_from: np.ndarray
+
+    :param salary_to: Верхние границы вилки оклада
+    :type salary_to: np.ndarray
+
+    :param published_at: Дата публикации в секундах от начала эпохи
+    :type published_at: np.ndarray
+
+    :param published_offset: Часовой пояс даты публикации в минутах
+    :type published_offset: np.ndarray
+
+    :param year: Год публикации
+    :type year: np.ndarray
+
+    :param categorical: Категориальные столбцы (валюта, город, название и т.д.)
+    :type categorical: dict
+
+    :param text: Текстовые столбцы (описание, навыки)
+    :type text: dict
+
+    :param name_index: Индекс триграмм по названиям (NameIndex.TrigramIndex) для поиска профессий
+    :type name_index: TrigramIndex or None
+    """
+    def __init__(self, salary_from: np.ndarray, salary_to: np.ndarray, published_at: np.ndarray,
+                 published_offset: np.ndarray, year: np.ndarray, categorical: dict, text: dict):
+        """
+        Инициализирует объект VacancyFrame из готовых столбцов.
+
+        :param salary_from: Нижние границы вилки оклада
+        :type salary_from: np.ndarray
+
+        :param salary_to: Верхние границы вилки оклада
+        :type salary_to: np.ndarray
+
+        :param published_at: Дата публикации в секундах от начала эпохи
+        :type published_at: np.ndarray
+
+        :param published_offset: Часовой пояс даты публикации в минутах
+        :type published_offset: np.ndarray
+
+        :param year: Год публикации
+        :type year: np.ndarray
+
+        :param categorical: Категориальные столбцы
+        :type categorical: dict
+
+        :param text: Текстовые столбцы
+        :type text: dict
+        """
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.published_at = published_at
+        self.published_offset = published_offset
+        self.year = year
+        self.categorical = categorical
+        self.text = text
+        self.name_index = None
+
+    @staticmethod
+    def parse_date(date: str) -> tuple:
+        """
+        Переводит дату публикации в секунды от начала эпохи и смещение часового пояса в минутах.
+
+        :param date: Дата публикации вакансии
+        :type date: str
+
+        :return: Секунды от начала эпохи и смещение в минутах
+        :rtype: tuple
+
+        >>> VacancyFrame.parse_date('2022-05-31T17:32:49+0300')
+        (1654007569, 180)
+        """
+        new_date = datetime.datetime.fromisoformat(date)
+        return int(new_date.timestamp()), int(new_date.utcoffset().total_seconds()) // 60
+
+    @staticmethod
+    def format_date(seconds: int, offset: int) -> str:
+        """
+        Восстанавливает дату публикации в исходном формате csv-файла.
+
+        :param seconds: Секунды от начала эпохи
+        :type seconds: int
+
+        :param offset: Смещение часового пояса в минутах
+        :type offset: int
+
+        :return: Дата публикации вакансии
+        :rtype: str
+
+        >>> VacancyFrame.format_date(1654007569, 180)
+        '2022-05-31T17:32:49+0300'
+        """
+        zone = datetime.timezone(datetime.timedelta(minutes=int(offset)))
+        return datetime.datetime.fromtimestamp(int(seconds), zone).strftime('%Y-%m-%dT%H:%M:%S%z')
+
+    @classmethod
+    def from_rows(cls, headers: List[str], rows: Iterable[list]) -> 'VacancyFrame':
+        """
+        Собирает VacancyFrame из потока строк csv-файла за один проход.
+
+        :param headers: Заголовки csv-файла
+        :type headers: list
+
+        :param rows: Строки с данными о вакансиях
+        :type rows: Iterable[list]
+
+        :return: Столбцовое хранилище вакансий
+        :rtype: VacancyFrame
+        """
+        columns = {header: [] for header in headers}
+        value_to_code = {header: {} for header in headers
+                         if header not in NUMERIC_COLUMNS and header not in TEXT_COLUMNS}
+
+        def get_appender(header: str) -> Callable:
+            if header not in value_to_code:
+                return columns[header].append
+            codes, header_codes = columns[header], value_to_code[header]
+            return lambda value: codes.append(header_codes.setdefault(value, len(header_codes)))
+
+        appenders = [get_appender(header) for header in headers]
+        for row in rows:
+            for append, value in zip(appenders, row):
+                append(value)
+
+        def to_float(values: list) -> np.ndarray:
+            return np.array([float(value) if value != '' else np.nan for value in values], dtype=np.float64)
+
+        count = len(next(iter(columns.values()), []))
+        dates = [cls.parse_date(date) for date in columns['published_at']] if 'published_at' in columns \
+            else [(0, 0)] * count
+        salary_from = to_float(columns['salary_from']) if 'salary_from' in columns else np.full(count, np.nan)
+        salary_to = to_float(columns['salary_to']) if 'salary_to' in columns else np.full(count, np.nan)
+        published_at = np.array([date[0] for date in dates], dtype=np.int64)
+        published_offset = np.array([date[1] for date in dates], dtype=np.int16)
+        year = np.array([int(date[:4]) for date in columns.get('published_at', ['0000'] * count)], dtype=np.int16)
+        categorical = {header: CategoricalColumn(np.array(columns[header], dtype=np.int32), list(codes))
+                       for header, codes in value_to_code.items()}
+        text = {header: TextColumn.encode(columns[header]) for header in headers if header in TEXT_COLUMNS}
+        return cls(salary_from, salary_to, published_at, published_offset, year, categorical, text)
+
+    @classmethod
+    def from_dicts(cls, dicts: Iterable[dict]) -> 'VacancyFrame':
+        """
+        Собирает VacancyFrame из потока словарей вакансий (например, DataSet.csv_filer).
+
+        :param dicts: Словари вакансий с одинаковыми ключами
+        :type dicts: Iterable[dict]
+
+        :return: Столбцовое хранилище вакансий
+        :rtype: VacancyFrame
+        """
+        dicts = iter(dicts)
+        first = next(dicts, None)
+        if first is None:
+            return cls.from_rows([], [])
+        headers = list(first)
+
+        def rows() -> Iterator[list]:
+            yield list(first.values())
+            for dictionary in dicts:
+                yield [dictionary[header] for header in headers]
+
+        return cls.from_rows(headers, rows())
+
+    def __len__(self) -> int:
+        return len(self.salary_from)
+
+    def middle_salary_in_rub(self, converter, floor: bool = False) -> np.ndarray:
+        """
+        Векторно переводит среднее значение вилки оклада в рубли. В статическом режиме курс
+        находится один раз на каждую валюту, в историческом - по дате публикации.
+
+        :param converter: Конвертер валют
+        :type converter: CurrencyConverter.CurrencyConverter
+
+        :param floor: Округлять ли границы вилки вниз до целых перед подсчетом
+        :type floor: bool
+
+        :return: Средние оклады в рублях
+        :rtype: np.ndarray
+        """
+        currencies = self.categorical['salary_currency']
+        if converter.is_historical:
+            rates = converter.get_rates(currencies.lookup(str, object), self.local_time())
+        else:
+            rates = currencies.lookup(converter.get_rate)
+        if floor:
+            return rates * ((np.floor(self.salary_to) + np.floor(self.salary_from)) / 2)
+        return (self.salary_from + self.salary_to) * rates / 2
+
+    def profession_mask(self, profession: str) -> np.ndarray:
+        """
+        Маска вакансий, в названии которых встречается profession. С индексом названий (name_index)
+        проверяются только названия, содержащие все триграммы profession, без индекса - один раз
+        каждое уникальное название.
+
+        :param profession: Название профессии
+        :type profession: str
+
+        :return: Булева маска
+        :rtype: np.ndarray
+        """
+        if self.name_index is not None:
+            return self.name_index.mask(profession)
+        return self.field_mask('name', lambda name: profession in name)
+
+    def profession_masks(self, professions: List[str]) -> dict:
+        """
+        Маски вакансий сразу для многих профессий: каждое уникальное название проверяется
+        одним проходом автомата Ахо-Корасик по всем профессиям.
+
+        :param professions: Названия профессий
+        :type professions: list
+
+        :return: Словарь профессия/булева маска
+        :rtype: dict
+
+        >>> frame = VacancyFrame.from_rows(['name'], [['Аналитик'], ['Программист'], ['Аналитик-программист']])
+        >>> {name: mask.tolist() for name, mask in frame.profession_masks(['Аналитик', 'программист']).items()}
+        {'Аналитик': [True, False, True], 'программист': [False, False, True]}
+        """
+        if self.name_index is not None:
+            return {profession: self.name_index.mask(profession) for profession in professions}
+        column = self.categorical['name']
+        automaton = AhoCorasick(professions)
+        table = np.zeros((len(column.categories), len(professions)), dtype=bool)
+        for code, name in enumerate(column.categories):
+            table[code, automaton.find(name)] = True
+        masks = table.T[:, column.codes]
+        return {profession: masks[index] for index, profession in enumerate(professions)}
+
+    @staticmethod
+    def group_sum_count(codes: np.ndarray, values: np.ndarray, size: int, mask: np.ndarray = None) -> tuple:
+        """
+        Векторно считает суммы и количества значений по группам.
+
+        :param codes: Номера групп по строкам
+        :type codes: np.ndarray
+
+        :param values: Значения по строкам
+        :type values: np.ndarray
+
+        :param size: Количество групп
+        :type size: int
+
+        :param mask: Учитываемые строки (по умолчанию все)
+        :type mask: np.ndarray
+
+        :return: Массивы сумм и количеств по группам
+        :rtype: tuple
+
+        >>> sums, counts = VacancyFrame.group_sum_count(np.array([0, 1, 0]), np.array([1.0, 2.0, 3.0]), 2)
+        >>> sums.tolist(), counts.tolist()
+        ([4.0, 2.0], [2, 1])
+        """
+        if mask is not None:
+            codes, values = codes[mask], values[mask]
+        return (np.bincount(codes, weights=values, minlength=size),
+                np.bincount(codes, minlength=size).astype(np.int64))
+
+    def local_time(self) -> np.ndarray:
+        """
+        Местное время публикации вакансий (с учетом часового пояса из даты).
+
+        :rtype: np.ndarray
+        """
+        return (self.published_at + self.published_offset.astype(np.int64) * 60).astype('datetime64[s]')
+
+    def month(self) -> np.ndarray:
+        """
+        Месяц публикации вакансий (1-12) по местному времени.
+
+        :rtype: np.ndarray
+        """
+        return (self.local_time().astype('datetime64[M]').astype(np.int64) % 12 + 1).astype(np.int8)
+
+    def field_codes(self, field: str) -> tuple:
+        """
+        Ключи и коды групп по полю: для года и месяца - уникальные значения по возрастанию,
+        для категориального поля - его категории.
+
+        :param field: Название поля (year, month или категориальное поле: area_name, salary_currency, experience_id и т.д.)
+        :type field: str
+
+        :return: Список ключей и массив кодов по строкам
+        :rtype: tuple
+        """
+        if field in ('year', 'month'):
+            values, codes = np.unique(self.year if field == 'year' else self.month(), return_inverse=True)
+            return values.tolist(), codes
+        column = self.categorical[field]
+        return column.categories, column.codes
+
+    def group_by(self, field: str, values: np.ndarray = None, mask: np.ndarray = None,
+                 quantiles: bool = False) -> GroupBy:
+        """
+        Группирует вакансии по полю с векторным подсчетом итогов.
+
+        :param field: Название поля
+        :type field: str
+
+        :param values: Значения по строкам (например, middle_salary_in_rub; None - только количество)
+        :type values: np.ndarray
+
+        :param mask: Учитываемые строки (по умолчанию все)
+        :type mask: np.ndarray
+
+        :param quantiles: Строить ли скетчи для медианы и перцентилей
+        :type quantiles: bool
+
+        :return: Группировка с итогами count/sum/mean/min/max
+        :rtype: GroupBy
+
+        >>> frame = VacancyFrame.from_rows(['salary_currency', 'published_at'],
+        ...                                [['RUR', '2007-12-03T17:34:36+0300'], ['USD', '2008-01-03T17:34:36+0300'],
+        ...                                 ['RUR', '2008-02-03T17:34:36+0300']])
+        >>> frame.group_by('salary_currency').count(), frame.group_by('year').top(1)
+        ({'RUR': 2, 'USD': 1}, [(2008, 2)])
+        """
+        return GroupBy(field, quantiles=quantiles).add_codes(*self.field_codes(field), values, mask)
+
+    def field_lookup(self, field: str, mapping: Callable, dtype=np.float64) -> np.ndarray:
+        """
+        Вычисляет mapping от значения строкового поля по всем строкам. Для категориальных полей
+        mapping вызывается один раз на каждое уникальное значение.
+
+        :param field: Название поля
+        :type field: str
+
+        :param mapping: Функция от значения поля
+        :type mapping: Callable
+
+        :param dtype: Тип результата
+        :type dtype: type
+
+        :return: Массив значений по строкам
+        :rtype: np.ndarray
+        """
+        if field in self.text:
+            return np.array([mapping(value) for value in self.text[field]], dtype=dtype)
+        return self.categorical[field].lookup(mapping, dtype)
+
+    def field_mask(self, field: str, predicate: Callable) -> np.ndarray:
+        """
+        Булева маска строк, у которых значение строкового поля удовлетворяет predicate.
+
+        :param field: Название поля
+        :type field: str
+
+        :param predicate: Условие на значение поля
+        :type predicate: Callable
+
+        :return: Булева маска
+        :rtype: np.ndarray
+        """
+        return self.field_lookup(field, predicate, bool)
+
+    def get_value(self, field: str, index: int):
+        """
+        Возвращает значение поля вакансии в строке index.
+
+        :param field: Название поля
+        :type field: str
+
+        :param index: Номер строки
+        :type index: int
+        """
+        if field == 'published_at':
+            return self.format_date(self.published_at[index], self.published_offset[index])
+        if field in ('salary_from', 'salary_to'):
+            return float(getattr(self, field)[index])
+        if field in self.text:
+            return self.text[field][index]
+        return self.categorical[field].get(index)
+
+    def fields(self) -> list:
+        """
+        Список полей вакансии, хранящихся в VacancyFrame.
+
+        :rtype: list
+        """
+        return ['salary_from', 'salary_to', 'published_at'] + list(self.categorical) + list(self.text)
+
+    def row(self, index: int) -> dict:
+        """
+        Словарь одной вакансии - для создания объектов только у тех строк, которые действительно нужны.
+
+        :param index: Номер строки
+        :type index: int
+
+        :return: Словарь вакансии
+        :rtype: dict
+        """
+        return {field: self.get_value(field, index) for field in self.fields()}
+
+    def save(self, directory: str) -> None:
+        """
+        Сохраняет столбцы в папку: массивы - в отдельные npy-файлы, уникальные значения
+        категориальных столбцов - в columns.json.
+
+        :param directory: Папка для сохранения (должна существовать)
+        :type directory: str
+        """
+        for name in ('salary_from', 'salary_to', 'published_at', 'published_offset', 'year'):
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        for name, column in self.categorical.items():
+            np.save(os.path.join(directory, f'{name}.codes.npy'), column.codes)
+        for name, column in self.text.items():
+            np.save(os.path.join(directory, f'{name}.blob.npy'), column.blob)
+            np.save(os.path.join(directory, f'{name}.offsets.npy'), column.offsets)
+        with open(os.path.join(directory, 'columns.json'), 'w', encoding='utf-8') as file:
+            json.dump({'categorical': {name: column.categories for name, column in self.categorical.items()},
+                       'text': list(self.text)}, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str = 'r') -> 'VacancyFrame':
+        """
+        Загружает VacancyFrame, сохраненный методом save. Массивы по умолчанию отображаются в память.
+
+        :param directory: Папка с сохраненными столбцами
+        :type directory: str
+
+        :param mmap_mode: Режим отображения в память для np.load (None - прочитать целиком)
+        :type mmap_mode: str
+
+        :return: Столбцовое хранилище вакансий
+        :rtype: VacancyFrame
+        """
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+
+        with open(os.path.join(directory, 'columns.json'), encoding='utf-8') as file:
+            columns = json.load(file)
+        categorical = {name: CategoricalColumn(load_array(f'{name}.codes'), categories)
+                       for name, categories in columns['categorical'].items()}
+        text = {name: TextColumn(load_array(f'{name}.blob'), load_array(f'{name}.offsets')) for name in columns['text']}
+        return cls(load_array('salary_from'), load_array('salary_to'), load_array('published_at'),
+                   load_array('published_offset'), load_array('year'), categorical, text)
@@ -1,5 +1,7 @@
+import csv
 import pandas as pd
 import sqlite3
+import CurrencyRates
 
 class ProcessSalaries:
     def __init__(self, file_name: str):
@@ -50,18 +52,112 @@ class ProcessSalaries:
                 return 'nan'
         return round(salary)
 
-    def process_salaries(self) -> None:
+    def get_salaries(self, df: pd.DataFrame) -> tuple:
+        """
+        Векторно генерирует зарплаты для всех рядов по тем же правилам, что и get_salary:
+        таблица currencies читается одним запросом, переводится в вид (месяц, валюта, курс)
+        и соединяется с вакансиями. Ряды без курса за месяц публикации удаляются.
+
+        :param df: Вакансии
+        :type df: DataFrame
+
+        :return: Округленные зарплаты оставшихся рядов и маска рядов, для которых get_salary не вернул бы 'nan'
+        :rtype: tuple
+        """
+        salaries = CurrencyRates.get_salary_sums(df)
+        rates = CurrencyRates.join_rates(df, CurrencyRates.melt_rate_frame(pd.read_sql("SELECT * from currencies",
+                                                                                       self.__con)))
+        converted = (df['salary_currency'] != 'RUR') & df['salary_currency'].isin(self.__available_currencies)
+        keep = salaries.notna() & df['salary_currency'].notna() & ~(converted & rates.isna())
+        salaries = salaries.where(~converted, salaries * rates)
+        return salaries[keep].round().astype('int64'), keep
+
+    def process_salaries(self, vectorized: bool = False) -> None:
         """
         Обрабатывает зарплаты, переводя в рубли в соответствии с нужным курсом.
         Удаляет строки, в которых невозможно посчитать зарплату. Сохраняет в формате CSV.
+
+        :param vectorized: Переводить все зарплаты сразу (get_salaries) вместо запроса к БД на каждый ряд
+        :type vectorized: bool
         """
         df = pd.read_csv(self.file_name)
-        df['salary'] = df[['salary_from', 'salary_to', 'salary_currency', 'published_at']].apply(self.get_salary, axis=1)
+        if vectorized:
+            salaries, keep = self.get_salaries(df)
+            df = df.loc[keep].assign(salary=salaries)
+        else:
+            df['salary'] = df[['salary_from', 'salary_to', 'salary_currency', 'published_at']].apply(self.get_salary, axis=1)
+            df = df.loc[df['salary'] != 'nan']
         df['published_at'] = df['published_at'].apply(lambda x: x[:7])
-        df.drop(labels=['salary_to', 'salary_from', 'salary_currency'], axis=1, inplace=True)
-        df = df.loc[df['salary'] != 'nan']
+        df = df.drop(labels=['salary_to', 'salary_from', 'salary_currency'], axis=1)
         df.to_csv('all.csv', index=False)
 
+    def create_rates_table(self) -> None:
+        """
+        Переводит таблицу currencies (столбец на валюту) во временную таблицу rates (date, currency, rate)
+        с составным индексом, чтобы соединение с вакансиями шло по индексу.
+        """
+        self.__con.execute("DROP TABLE IF EXISTS temp.rates")
+        self.__con.execute("CREATE TEMP TABLE rates (date TEXT, currency TEXT, rate REAL)")
+        self.__con.execute("INSERT INTO rates " + " UNION ALL ".join(
+            f"SELECT date, '{currency}', \"{currency}\" FROM currencies" for currency in self.__available_currencies))
+        self.__con.execute("CREATE INDEX temp.rates_date_currency ON rates (date, currency)")
+
+    def load_staging_table(self) -> list:
+        """
+        Загружает необработанные вакансии из CSV-файла во временную таблицу vacancies_staging.
+        Пустые значения сохраняются как NULL.
+
+        :return: Заголовки CSV-файла
+        :rtype: list
+        """
+        with open(self.file_name, "r", encoding='utf-8-sig', newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            headers = next(reader)
+            columns = ", ".join(f'"{h}" REAL' if h in ('salary_from', 'salary_to') else f'"{h}" TEXT' for h in headers)
+            self.__con.execute("DROP TABLE IF EXISTS temp.vacancies_staging")
+            self.__con.execute(f"CREATE TEMP TABLE vacancies_staging ({columns})")
+            self.__con.executemany(f"INSERT INTO vacancies_staging VALUES ({', '.join('?' * len(headers))})",
+                                   ([None if value == '' else value for value in row] for row in reader))
+        return headers
+
+    def process_salaries_sql(self, db_name: str = 'all_vacancies') -> None:
+        """
+        Переводит зарплаты в рубли внутри SQLite одним запросом INSERT ... SELECT: вакансии из таблицы
+        vacancies_staging соединяются с курсами rates по месяцу и валюте, результат записывается
+        в таблицу all_vacancies БД db_name. Правила те же, что и в get_salary; ряды без курса за месяц
+        публикации удаляются. Округление - как у round в Python.
+
+        :param db_name: Имя БД для обработанных вакансий
+        :type db_name: str
+        """
+        self.create_rates_table()
+        headers = self.load_staging_table()
+        columns = [h for h in headers if h not in ('salary_from', 'salary_to', 'salary_currency')]
+        self.__con.create_function("round_half_even", 1, lambda x: None if x is None else round(x),
+                                   deterministic=True)
+        self.__con.execute("ATTACH DATABASE ? AS result", (db_name,))
+        try:
+            self.__con.execute("DROP TABLE IF EXISTS result.all_vacancies")
+            table_columns = ", ".join(f'"{c}" TEXT' for c in columns)
+            self.__con.execute(f"CREATE TABLE result.all_vacancies ({table_columns}, salary INTEGER)")
+            available = ", ".join("?" * len(self.__available_currencies))
+            select_columns = ", ".join("substr(v.published_at, 1, 7)" if c == 'published_at' else f'v."{c}"'
+                                       for c in columns)
+            self.__con.execute(f"""
+                INSERT INTO result.all_vacancies
+                SELECT {select_columns},
+                       round_half_even(CASE WHEN v.salary_currency != 'RUR' AND v.salary_currency IN ({available})
+                                            THEN v.salary * r.rate ELSE v.salary END)
+                FROM (SELECT *, rowid AS row_id, COALESCE(salary_from + salary_to, salary_from, salary_to) AS salary
+                      FROM vacancies_staging) AS v
+                LEFT JOIN rates AS r ON r.date = substr(v.published_at, 1, 7) AND r.currency = v.salary_currency
+                WHERE v.salary_currency IS NOT NULL AND v.salary IS NOT NULL
+                  AND (v.salary_currency = 'RUR' OR v.salary_currency NOT IN ({available}) OR r.rate IS NOT NULL)
+                ORDER BY v.row_id""", self.__available_currencies * 2)
+            self.__con.commit()
+        finally:
+            self.__con.execute("DETACH DATABASE result")
+
     def CSV_to_sqlite_vacancies(self, file_name: str) -> None:
         """
         Преобразует CSV-файл с обработанными вакансиями в БД.
@@ -78,5 +174,4 @@ class ProcessSalaries:
 
 
 processor = ProcessSalaries('vacancies_dif_currencies.csv')
-processor.process_salaries()
-processor.CSV_to_sqlite_vacancies('all.csv')
+processor.process_salaries_sql('all_vacancies')
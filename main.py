@@ -2,14 +2,18 @@ import ReportTable
 import ReportPDF
 
 def main():
-    """Выбор формирования отчета: в виде pdf или таблицы PrettyTable."""
-    type_of_report = input("Введите тип отчета (Вакансии/Статистика): ")
+    """Выбор формирования отчета: в виде pdf, таблицы PrettyTable или отчетов сразу по нескольким профессиям
+    (профессии вводятся через запятую; Сводка - один xlsx-файл по всем профессиям)."""
+    type_of_report = input("Введите тип отчета (Вакансии/Статистика/Профессии/Сводка): ")
 
     if type_of_report == "Вакансии":
-        ReportTable.create_table()
+        ReportTable.create_table(use_cache=True)
 
     elif type_of_report == "Статистика":
-        ReportPDF.create_report()
+        ReportPDF.create_report(use_cache=True)
+
+    elif type_of_report in ("Профессии", "Сводка"):
+        ReportPDF.create_batch_report(combined=type_of_report == "Сводка", use_cache=True)
 
     else:
         print("Неверный тип отчета!")